@@ -0,0 +1,58 @@
+"""
+Кодирование и разбор команды batch (все цели лотка одним сообщением)
+в сравнении с отдельными командами pick на каждую деталь.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.batch [количество_деталей ...]
+"""
+import sys
+import time
+
+import numpy as np
+
+from pick_protocol import decode_batch, decode_pick, encode_batch, encode_pick
+
+TYPES = ["4_5", "3_4", "1"]
+
+
+def random_targets(count, seed=0, size=(279, 197)):
+    """Цели (cX, cY, orientation, number_type) в пределах рабочей зоны."""
+    rng = np.random.default_rng(seed)
+    xs = rng.integers(0, size[0], count)
+    ys = rng.integers(0, size[1], count)
+    orientations = rng.integers(0, 2, count)
+    types = rng.integers(0, len(TYPES), count)
+    return [(int(x), int(y), "above" if o else "under", TYPES[t])
+            for x, y, o, t in zip(xs, ys, orientations, types)]
+
+
+def encode_single(targets):
+    """Отдельная команда pick на каждую цель (как в режиме без batch)."""
+    return [encode_pick(seq, target) for seq, target in enumerate(targets, 1)]
+
+
+def timed(function, *args, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 300, 1000]
+    for count in counts:
+        targets = random_targets(count)
+
+        encode_time, message = timed(encode_batch, 1, targets)
+        decode_time, (seq, decoded) = timed(decode_batch, message)
+        assert seq == 1 and decoded == targets
+
+        single_time, singles = timed(encode_single, targets)
+        assert [decode_pick(line)[1] for line in singles] == [target[:3] for target in targets]
+        single_size = sum(len(line) for line in singles)
+
+        print(f"Деталей: {count}")
+        print(f"  batch: {len(message):6d} байт, кодирование {encode_time * 1e6:8.1f} мкс, "
+              f"разбор {decode_time * 1e6:8.1f} мкс")
+        print(f"  pick:  {single_size:6d} байт в {len(singles)} сообщениях, "
+              f"кодирование {single_time * 1e6:8.1f} мкс")
@@ -0,0 +1,113 @@
+"""
+Классификация пятен по каталогу деталей: один пакетный вызов
+PartClassifier.classify на кадр против цикла по пятнам и типам каталога.
+Признаки (площадь, отношение сторон, периметр, моменты Ху) генерируются
+вокруг эталонов нескольких типов с шумом; проверяется совпадение результатов.
+Для каталога только из интервалов площади сравниваются np.digitize
+и матрица (n_blobs, n_types).
+
+Запуск из корня репозитория:
+    python -m Benchmarks.classify [--blobs 1000] [--types 8] [--frames 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from part_catalogue import PartClassifier, hu_log
+
+
+def make_catalogue(count, rng):
+    """Каталог из count типов с интервалами признаков и эталонными моментами Ху."""
+    types = []
+    for index in range(count):
+        area = 60 + 40 * index
+        aspect = 1.0 + 0.15 * (index % 4)
+        perimeter = 4 * np.sqrt(area) * (1 + 0.1 * (index % 3))
+        hu = np.abs(rng.normal(0.1, 0.03, 7)) * 10.0 ** -np.arange(7)
+        types.append({
+            'name': f"type_{index}",
+            'area': [area * 0.8, area * 1.2],
+            'aspect': [aspect - 0.2, aspect + 0.2],
+            'perimeter': [perimeter * 0.85, perimeter * 1.15],
+            'hu': hu.tolist(),
+            'hu_tolerance': 2.0,
+            'orientations': ['above', 'under'],
+        })
+    return types
+
+
+def make_blobs(types, count, rng):
+    """Признаки пятен: шум вокруг эталонов случайных типов, часть — мусор."""
+    chosen = rng.integers(0, len(types), count)
+    areas = np.array([np.mean(types[i]['area']) for i in chosen]) * rng.normal(1, 0.12, count)
+    aspects = np.array([np.mean(types[i]['aspect']) for i in chosen]) + rng.normal(0, 0.1, count)
+    perimeters = np.array([np.mean(types[i]['perimeter']) for i in chosen]) * rng.normal(1, 0.08, count)
+    hu = np.array([types[i]['hu'] for i in chosen]) * rng.normal(1, 0.3, (count, 7))
+    return areas, aspects, perimeters, hu
+
+
+def classify_loop(types, codes, areas, aspects, perimeters, hu):
+    """Прежний подход: проверка каждого пятна по каждой записи каталога."""
+    result = np.zeros(len(areas), np.uint8)
+    for blob in range(len(areas)):
+        features = (areas[blob], aspects[blob], perimeters[blob])
+        reference = hu_log(hu[blob])
+        best, best_distance = 0, np.inf
+        for entry, code in zip(types, codes):
+            if not all(low < value < high for value, (low, high)
+                       in zip(features, (entry['area'], entry['aspect'], entry['perimeter']))):
+                continue
+            distance = np.abs(reference - hu_log(entry['hu'])).sum()
+            if distance <= entry['hu_tolerance'] and distance < best_distance:
+                best, best_distance = code, distance
+        result[blob] = best
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blobs', type=int, default=1000)
+    parser.add_argument('--types', type=int, default=8)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    types = make_catalogue(args.types, rng)
+    classifier = PartClassifier(types)
+    frames = [make_blobs(types, args.blobs, rng) for _ in range(args.frames)]
+
+    start = time.perf_counter()
+    batched = [classifier.classify(*features) for features in frames]
+    batched_time = (time.perf_counter() - start) / args.frames
+
+    loop_frames = frames[:max(1, args.frames // 20)]
+    start = time.perf_counter()
+    looped = [classify_loop(types, classifier.codes, *features) for features in loop_frames]
+    loop_time = (time.perf_counter() - start) / len(loop_frames)
+
+    mismatches = sum(int(np.count_nonzero(a != b)) for a, b in zip(batched, looped))
+    recognised = np.mean([np.count_nonzero(codes) / len(codes) for codes in batched])
+    print(f"Типов: {args.types}, пятен на кадр: {args.blobs}, распознано: {recognised:.0%}, "
+          f"расхождений с циклом: {mismatches}")
+    print(f"Пакетно: {batched_time * 1e3:8.3f} мс/кадр ({args.blobs / batched_time / 1e6:.2f} млн пятен/с)")
+    print(f"Цикл:    {loop_time * 1e3:8.3f} мс/кадр")
+    print(f"Ускорение: x{loop_time / batched_time:.0f}")
+
+    # Непересекающиеся интервалы вокруг тех же эталонных площадей
+    area_types = [{'name': entry['name'], 'area': [np.mean(entry['area']) - 15,
+                                                   np.mean(entry['area']) + 15]}
+                  for entry in types]
+    binned = PartClassifier(area_types)
+    matrix = PartClassifier(area_types)
+    matrix.area_edges = None
+    areas = [features[0] for features in frames]
+    timings = []
+    for classifier in (binned, matrix):
+        start = time.perf_counter()
+        results = [classifier.classify(frame_areas) for frame_areas in areas]
+        timings.append(((time.perf_counter() - start) / args.frames, results))
+    mismatches = sum(int(np.count_nonzero(a != b)) for a, b in zip(timings[0][1], timings[1][1]))
+    print(f"Только площадь ({len(area_types)} интервалов): digitize {timings[0][0] * 1e3:.3f} мс/кадр, "
+          f"матрица {timings[1][0] * 1e3:.3f} мс/кадр, расхождений: {mismatches}")
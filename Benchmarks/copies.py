@@ -0,0 +1,49 @@
+"""
+Подсчёт полнокадровых записей и выделений памяти на пути
+захват -> преобразование зоны -> коррекция -> маска.
+
+После первых кадров число выделений в буферах Image не должно расти,
+а на стороне камеры кадр должен записываться не больше одного раза.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.copies <видео_или_изображение> [количество_кадров]
+"""
+import sys
+
+from Camera_std import Camera
+from capture import CaptureThread
+from image import Image
+from pixel_format import PixelFormat
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Укажите путь к видеофайлу или изображению.")
+        sys.exit(1)
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    pixel_format = PixelFormat(PixelFormat.GRAY)
+    capture = CaptureThread(Camera(sys.argv[1], pixel_format),
+                            stop_on_empty=True).start()
+    image = Image()
+
+    processed = 0
+    warmup = None
+    while processed < count:
+        frame = capture.get_image()
+        if frame is None:
+            break
+        frame = image.transform_zone(frame)
+        frame = image.image_correction(frame)
+        image.detect(frame)
+        processed += 1
+        if processed == 1:
+            warmup = dict(image.allocations)
+    capture.stop()
+
+    print(f"Кадров обработано: {processed}")
+    print(f"Камера: {pixel_format.statistics()}")
+    print(f"Захват: {capture.statistics()}")
+    for name, allocations in image.allocations.items():
+        extra = allocations - warmup.get(name, 0) if warmup else allocations
+        print(f"Image.{name}: выделений {allocations}, после первого кадра {extra}")
@@ -0,0 +1,70 @@
+"""
+Стоимость подготовки кадров для окна в потоке обработки.
+
+Прежний путь: каждый кадр рисуются контуры, кадр увеличивается в 2 раза
+через cv2.resize и отправляется в интерфейс. Новый путь: DisplayBuffer,
+который интерфейс опрашивает с частотой --rate; кадр копируется и
+размечается только для показываемых кадров, масштабирует Qt.
+Без Qt: таймер интерфейса моделируется в том же цикле.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.display [--frames 300] [--rate 30] [--parts 30]
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from Benchmarks.synthetic import synthetic_frames
+from display_buffer import DisplayBuffer
+from image import Image
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=30.0)
+    parser.add_argument('--parts', type=int, default=30)
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+    image = Image()
+    image.set_parameters(parameters)
+    frames = list(synthetic_frames(args.frames, args.parts))
+
+    # Прежний путь: разметка и увеличение каждого кадра
+    legacy = 0.0
+    for frame in frames:
+        zone = image.image_correction(image.transform_zone(frame))
+        image.detect(zone)
+        start = time.perf_counter()
+        cv2.resize(image.draw_contours(zone), None, fx=2, fy=2, interpolation=cv2.INTER_AREA)
+        legacy += time.perf_counter() - start
+
+    # DisplayBuffer: интерфейс забирает кадр по таймеру
+    display = DisplayBuffer(delay=0.75 / args.rate)
+    publish = 0.0
+    latency = []
+    next_tick = time.perf_counter()
+    for frame in frames:
+        zone = image.image_correction(image.transform_zone(frame))
+        image.detect(zone)
+        start = time.perf_counter()
+        display.publish(zone, image.draw_contours, start)
+        publish += time.perf_counter() - start
+        if time.perf_counter() >= next_tick:
+            next_tick += 1 / args.rate
+            latest = display.acquire()
+            if latest is not None:
+                latency.append(time.perf_counter() - latest[1])
+
+    print(f"Кадров: {len(frames)}, показано: {display.shown}, пропущено без затрат: {display.skipped}")
+    print(f"Прежний путь:   {legacy / len(frames) * 1e3:7.3f} мс/кадр в потоке обработки")
+    print(f"DisplayBuffer:  {publish / len(frames) * 1e3:7.3f} мс/кадр в потоке обработки")
+    if latency:
+        print(f"Возраст кадра при показе: {np.mean(latency) * 1e3:.1f} мс в среднем")
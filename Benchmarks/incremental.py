@@ -0,0 +1,82 @@
+"""
+Инкрементальная обработка кадра: с лотка убирается по --changes деталей
+(по одной — типичный случай между захватами; несколько — изменения
+в разных концах лотка), кадр обрабатывается целиком и только
+в изменившихся участках. Проверяется совпадение найденных деталей и
+сравнивается время detect.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.incremental [--parts 30] [--size 279 197] [--changes 1]
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from Benchmarks.synthetic import render_tray
+from image import Image
+
+
+def removal_sequence(parts, size, seed=0, background=200, changes=1):
+    """Кадры, на каждом из которых убрано ещё changes деталей (кадр повторяется дважды)."""
+    frame, placed = render_tray(parts, size=size, seed=seed, background=background)
+    frames = [frame.copy()]
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(placed))
+    for start in range(0, len(order), changes):
+        for index in order[start:start + changes]:
+            x, y, _ = placed[index]
+            cv2.circle(frame, (x, y), 14, background, -1)
+        frames.append(frame.copy())
+        frames.append(frame.copy())
+    return frames
+
+
+def run(image, frames):
+    """
+    Returns:
+        tuple: Суммарное время detect и детали каждого кадра.
+    """
+    busy = 0.0
+    results = []
+    for frame in frames:
+        zone = image.image_correction(frame)
+        start = time.perf_counter()
+        detection = image.detect(zone)
+        busy += time.perf_counter() - start
+        results.append(sorted((part.cX, part.cY, part.angle, part.number_type, part.area)
+                              for part in detection.parts))
+    return busy, results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, default=30)
+    parser.add_argument('--size', type=int, nargs=2, default=(279, 197))
+    parser.add_argument('--changes', type=int, default=1, help="Деталей убирается за шаг")
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+    frames = removal_sequence(args.parts, tuple(args.size), changes=args.changes)
+
+    full = Image()
+    full.change_detector = None
+    incremental = Image()
+    for image in (full, incremental):
+        image.set_parameters(parameters)
+        image.tracker = None
+
+    full_time, full_results = run(full, frames)
+    incremental_time, incremental_results = run(incremental, frames)
+    mismatches = sum(a != b for a, b in zip(full_results, incremental_results))
+
+    print(f"Кадров: {len(frames)}, деталей на первом кадре: {len(full_results[0])}, "
+          f"кадров с расхождением: {mismatches}")
+    print(f"Весь кадр:       {full_time / len(frames) * 1e3:7.3f} мс/кадр")
+    print(f"Инкрементально:  {incremental_time / len(frames) * 1e3:7.3f} мс/кадр")
+    print(f"Ускорение: x{full_time / incremental_time:.1f}")
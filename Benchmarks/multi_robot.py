@@ -0,0 +1,100 @@
+"""
+Проверка сервера Robot с несколькими контроллерами: каждый имитатор
+представляется своим именем, сразу подтверждает (ACK) и выполняет (DONE)
+полученные команды, а цели с высокой частотой распределяются между
+роботами по зонам рабочей области.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.multi_robot [--robots 3] [--seconds 5] [--rate 500]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from fake_robot import FakeRobotClient
+from pick_protocol import PickProtocol, decode_batch
+from robot import Robot, ZoneRouter
+
+WIDTH = 279
+
+
+class AckingRobot(FakeRobotClient):
+    """Имитатор контроллера, который сразу отвечает ACK и DONE."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = b''
+        self.picks = []
+
+    def on_data(self, data):
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b'\n')
+        replies = []
+        for line in lines:
+            seq, targets = decode_batch(line.decode())
+            self.picks.extend(targets)
+            replies.append(f"ack;{seq}\ndone;{seq}\n")
+        if replies:
+            self.send("".join(replies))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--robots', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--rate', type=float, default=500.0, help="Наборов целей в секунду")
+    parser.add_argument('--parts', type=int, default=30)
+    parser.add_argument('--port', type=int, default=48600)
+    args = parser.parse_args()
+
+    edges = np.linspace(0, WIDTH, args.robots + 1)
+    zones = {f"arm{index}": (edges[index], edges[index + 1]) for index in range(args.robots)}
+    robot = Robot('127.0.0.1', args.port, queue_size=64,
+                  protocol_factory=lambda: PickProtocol(batch=True, max_outstanding=1,
+                                                        settle_time=0.0),
+                  router=ZoneRouter(zones))
+    server = threading.Thread(target=lambda: asyncio.run(robot.start_server()), daemon=True)
+    server.start()
+
+    clients = {name: AckingRobot('127.0.0.1', args.port, name=name).connect() for name in zones}
+    for client in clients.values():
+        client.send("ready\n")
+
+    rng = np.random.default_rng(0)
+    offers = 0
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    while time.perf_counter() < deadline:
+        xs = rng.integers(0, WIDTH, args.parts)
+        ys = rng.integers(0, 197, args.parts)
+        robot.offer_targets([(int(x), int(y), "under", "1") for x, y in zip(xs, ys)])
+        offers += 1
+        time.sleep(1 / args.rate)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.5)
+
+    print(f"Наборов целей: {offers} за {elapsed:.1f} с ({offers / elapsed:.0f}/с)")
+    statistics = robot.statistics()
+    for name, client in clients.items():
+        x_min, x_max = zones[name]
+        wrong = sum(not x_min <= x < x_max for x, *_ in client.picks)
+        stats = statistics[name]
+        print(f"{name}: команд {stats['sent']}, целей {len(client.picks)}, "
+              f"не из своей зоны {wrong}, выброшено {stats['dropped']}, "
+              f"повторов {stats['protocol']['retransmits']}, healthy={stats['healthy']}")
+
+    # Отключение одного контроллера отражается в состоянии его сессии
+    name = next(iter(clients))
+    clients[name].close()
+    time.sleep(0.3)
+    print(f"{name} после отключения: connected={robot.statistics()[name]['connected']}, "
+          f"остальные: {[robot.statistics()[other]['connected'] for other in clients if other != name]}")
+
+    for client in clients.values():
+        client.close()
+    robot.close_socket()
+    server.join(timeout=2.0)
@@ -0,0 +1,96 @@
+"""
+Сравнение векторизованного chord_orientation с прежним попиксельным
+обходом увеличенного ROI: совпадение решений и время на одну деталь.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.orientation [количество_деталей]
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from image import chord_orientation
+
+
+def legacy_orientation(frame, contour):
+    """Прежняя реализация Image.orientation_detection (без отрисовки)."""
+    dist_result = [0, 0, 0]
+    x, y, w, h = cv2.boundingRect(contour)
+    if x <= 0:
+        x = 5
+    if y <= 0:
+        y = 5
+    roi = frame[y-5:y+5+h, x-5:x+w+5]
+    if roi.size == 0:
+        return "under"
+    height, width, _ = roi.shape
+    roi = cv2.resize(roi, (int(width*10), int(height*10)))
+    height, width, _ = roi.shape
+    coord = []
+    for y in range(0, height, 15):
+        for x in range(0, width, 1):
+            color = roi[y, x]
+            if color[1] > 240:
+                coord.append([x, y])
+                if len(coord) == 2:
+                    dist = coord[1][0] - coord[0][0]
+                    if coord[1][1] != coord[0][1]:
+                        coord = []
+                    elif dist < 50:
+                        coord.pop(1)
+                    else:
+                        if dist > dist_result[0]:
+                            dist_result = [dist, coord[0], coord[1]]
+                        coord = []
+    if dist_result[0] != 0 and dist_result[1][1] >= int(height/2):
+        return "above"
+    return "under"
+
+
+def synthetic_parts(count, shape=(197, 279), seed=0):
+    """Трапеции случайного размера и поворота, по одной на кадр."""
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    for _ in range(count):
+        top, bottom = rng.uniform(3, 14, 2)
+        tall = rng.uniform(6, 20)
+        points = np.array([[-top / 2, -tall / 2], [top / 2, -tall / 2],
+                           [bottom / 2, tall / 2], [-bottom / 2, tall / 2]])
+        angle = rng.uniform(-np.pi, np.pi)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                             [np.sin(angle), np.cos(angle)]])
+        center = rng.uniform((15, 15), (width - 15, height - 15))
+        polygon = (points @ rotation.T + center).astype(np.int32)
+
+        mask = np.zeros(shape, np.uint8)
+        cv2.fillPoly(mask, [polygon], 255)
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            continue
+        contour = contours[0]
+        canvas = np.zeros((height, width, 3), np.uint8)
+        cv2.drawContours(canvas, [contour], -1, (0, 255, 0), 1)
+        yield canvas, contour
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    parts = list(synthetic_parts(count))
+
+    start = time.perf_counter()
+    legacy = [legacy_orientation(canvas, contour) for canvas, contour in parts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = [chord_orientation(contour, canvas.shape[:2])[0]
+                  for canvas, contour in parts]
+    vectorized_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(legacy, vectorized))
+    print(f"Деталей: {len(parts)}, расхождений: {mismatches}")
+    print(f"Попиксельный обход: {legacy_time / len(parts) * 1e6:9.1f} мкс/деталь")
+    print(f"Векторизованный:    {vectorized_time / len(parts) * 1e6:9.1f} мкс/деталь")
+    print(f"Ускорение: x{legacy_time / vectorized_time:.1f}")
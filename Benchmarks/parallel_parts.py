@@ -0,0 +1,71 @@
+"""
+Масштабирование стадии "по деталям" (ориентация) по числу потоков.
+
+Лоток из --parts деталей (по умолчанию 200) обрабатывается Image.detect
+без сопровождения и инкрементальной обработки, чтобы ориентация каждой
+детали вычислялась на каждом кадре. Для 1..--workers потоков печатаются
+время стадии orientation_detection, время detect целиком и ускорение;
+проверяется, что результат совпадает с однопоточным, включая порядок деталей.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.parallel_parts [--parts 200] [--workers 8] [--size 600 420]
+"""
+import argparse
+import json
+import os
+import time
+
+from Benchmarks.synthetic import render_tray
+from image import Image
+from profiler import profiler
+
+
+def run(image, frame, repeats):
+    """
+    Returns:
+        tuple: Время detect и стадии ориентации на кадр, детали последнего кадра.
+    """
+    profiler.reset()
+    busy = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        detection = image.detect(frame)
+        busy += time.perf_counter() - start
+    orientation = profiler.summary()['orientation_detection']['mean_ms'] / 1e3
+    parts = list(zip(detection.centers, detection.orientations, detection.types))
+    return busy / repeats, orientation, parts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--size', type=int, nargs=2, default=(600, 420))
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+    tray, _ = render_tray(args.parts, size=tuple(args.size))
+
+    image = Image()
+    image.set_parameters(parameters)
+    image.tracker = None
+    image.change_detector = None
+    frame = image.image_correction(tray).copy()
+
+    print(f"Процессоров: {os.cpu_count()}")
+    reference = None
+    for workers in range(1, max(args.workers, 1) + 1):
+        image.workers = workers
+        run(image, frame, 3)
+        detect_time, orientation_time, parts = run(image, frame, args.repeats)
+        if reference is None:
+            reference = parts, orientation_time
+            print(f"Деталей найдено: {len(parts)}")
+        print(f"потоков {workers}: detect {detect_time * 1e3:7.2f} мс, "
+              f"ориентация {orientation_time * 1e3:7.2f} мс, "
+              f"ускорение ориентации x{reference[1] / orientation_time:.2f}, "
+              f"совпадает: {parts == reference[0]}")
@@ -0,0 +1,98 @@
+"""
+Перетаскивание ползунка: частые изменения параметров во время обработки.
+
+Прежний путь: каждое изменение синхронно переписывает файл и меняет общий
+словарь, который поток обработки читает по полям. ParameterStore: снимки,
+которые поток обработки берёт один раз на кадр, и отложенная запись файла.
+Изменение задаёт одинаковое значение двум ключам; поток обработки считает
+наборы, в которых значения разошлись (наполовину применённые изменения).
+
+Запуск из корня репозитория:
+    python -m Benchmarks.parameters [--updates 500] [--interval 0.002]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from parameter_store import ParameterStore
+
+
+def drag(update, updates, interval):
+    """Серия изменений; возвращает суммарное время вызовов update."""
+    busy = 0.0
+    for value in range(updates):
+        start = time.perf_counter()
+        update(value)
+        busy += time.perf_counter() - start
+        time.sleep(interval)
+    return busy
+
+
+def watch(read, stop):
+    """Поток обработки: читает параметры по полям, считает разошедшиеся наборы."""
+    frames = torn = 0
+    while not stop.is_set():
+        parameters = read()
+        threshold = parameters['threshold_3']
+        time.sleep(0)
+        if parameters['dilate'] != threshold:
+            torn += 1
+        frames += 1
+    return frames, torn
+
+
+def run(read, update, updates, interval):
+    stop = threading.Event()
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(zip(('frames', 'torn'), watch(read, stop))))
+    worker.start()
+    busy = drag(update, updates, interval)
+    stop.set()
+    worker.join()
+    return busy, result['frames'], result['torn']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--interval', type=float, default=0.002)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'video_parametrs.json')
+    shutil.copy('video_parametrs.json', path)
+    try:
+        # Прежний путь: общий словарь и запись файла на каждое изменение
+        shared = {'threshold_3': 0, 'dilate': 0}
+        writes = 0
+
+        def legacy_update(value):
+            global writes
+            shared['threshold_3'] = value
+            time.sleep(0)
+            shared['dilate'] = value
+            with open(path, 'w') as json_file:
+                json.dump(shared, json_file)
+            writes += 1
+
+        busy, frames, torn = run(lambda: shared, legacy_update, args.updates, args.interval)
+        print(f"Прежний путь:   {busy / args.updates * 1e6:7.1f} мкс на изменение, "
+              f"записей файла: {writes}, разошедшихся наборов: {torn} из {frames}")
+
+        store = ParameterStore(path, debounce=0.5)
+        busy, frames, torn = run(store.snapshot,
+                                 lambda value: store.update(threshold_3=value, dilate=value),
+                                 args.updates, args.interval)
+        store.close()
+        with open(path, 'r') as json_file:
+            saved = json.load(json_file)
+        print(f"ParameterStore: {busy / args.updates * 1e6:7.1f} мкс на изменение, "
+              f"записей файла: {store.writes}, разошедшихся наборов: {torn} из {frames}, "
+              f"в файле последнее значение: {saved['threshold_3'] == args.updates - 1}")
+    finally:
+        shutil.rmtree(directory)
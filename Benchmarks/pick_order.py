@@ -0,0 +1,107 @@
+"""
+Моделирование времени цикла захвата при разном порядке деталей:
+порядок обнаружения (findContours), ближайший сосед, ближайший сосед + 2-opt
+и группировка по типу (месту сброса).
+
+Модель робота: трапецеидальный профиль скорости между точками захвата,
+постоянное время захвата и дополнительное время на смену места сброса
+при переходе к детали другого типа.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.pick_order [--parts 30] [--speed 400] [--acceleration 2000]
+    python -m Benchmarks.pick_order --parts 150 --size 560 400
+"""
+import argparse
+import time
+
+import numpy as np
+
+from Benchmarks.synthetic import render_tray
+from image import Image
+from pick_planner import PickPlanner, nearest_neighbour, route_length
+
+TYPES = ["4_5", "3_4", "1"]
+
+
+def travel_time(distance, speed, acceleration):
+    """Время перехода с трапецеидальным профилем скорости."""
+    if distance <= 0:
+        return 0.0
+    if distance > speed ** 2 / acceleration:
+        return distance / speed + speed / acceleration
+    return 2 * np.sqrt(distance / acceleration)
+
+
+def cycle_time(targets, start, args):
+    """Время выполнения всех захватов в заданном порядке, с."""
+    total = 0.0
+    position = np.asarray(start, np.float64)
+    previous_type = None
+    for cX, cY, _, number_type in targets:
+        point = np.array([cX, cY], np.float64)
+        distance = float(np.hypot(*(point - position))) * args.scale
+        total += travel_time(distance, args.speed, args.acceleration) + args.pick_time
+        if previous_type is not None and number_type != previous_type:
+            total += args.type_change_time
+        previous_type = number_type
+        position = point
+    return total
+
+
+def detected_targets(parts, seed, size=(279, 197)):
+    """Цели синтетического лотка в порядке, в котором их вернул findContours."""
+    frame, _ = render_tray(parts, size=size, seed=seed)
+    image = Image()
+    detection = image.detect(frame)
+    return [(part.cX, part.cY, part.angle, part.number_type) for part in detection.parts]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, default=30, help="Деталей на лотке")
+    parser.add_argument('--trays', type=int, default=20, help="Количество лотков")
+    parser.add_argument('--size', type=int, nargs=2, default=(279, 197),
+                        help="Размер лотка в пикселях зоны (для 100+ деталей нужен больше)")
+    parser.add_argument('--scale', type=float, default=1.0, help="мм на пиксель зоны")
+    parser.add_argument('--speed', type=float, default=400.0, help="Скорость робота, мм/с")
+    parser.add_argument('--acceleration', type=float, default=2000.0, help="Ускорение, мм/с^2")
+    parser.add_argument('--pick-time', type=float, default=0.4, help="Время захвата, с")
+    parser.add_argument('--type-change-time', type=float, default=0.5,
+                        help="Доп. время при смене места сброса, с")
+    args = parser.parse_args()
+
+    strategies = {
+        'обнаружение': None,
+        'ближайший сосед': 'nn',
+        'ближайший сосед + 2-opt': PickPlanner(),
+        'по типам + 2-opt': PickPlanner(group_by_type=True, type_order=TYPES),
+    }
+    totals = {name: [0.0, 0.0, 0.0, 0] for name in strategies}
+    start = (0.0, 0.0)
+    for seed in range(args.trays):
+        targets = detected_targets(args.parts, seed, tuple(args.size))
+        points = np.array([target[:2] for target in targets], np.float64).reshape(-1, 2)
+        for name, strategy in strategies.items():
+            begin = time.perf_counter()
+            if strategy is None:
+                ordered = targets
+            elif strategy == 'nn':
+                ordered = [targets[i] for i in nearest_neighbour(points, start)]
+            else:
+                ordered = strategy.plan(targets, start)
+            planning = time.perf_counter() - begin
+            order_points = np.array([target[:2] for target in ordered], np.float64).reshape(-1, 2)
+            totals[name][0] += cycle_time(ordered, start, args)
+            totals[name][1] += route_length(order_points, range(len(ordered)), start) * args.scale
+            totals[name][2] += planning
+            totals[name][3] += len(ordered)
+
+    print(f"Лотков: {args.trays}, деталей на лотке: {args.parts}, "
+          f"обнаружено в среднем: {totals['обнаружение'][3] / args.trays:.0f}")
+    if not totals['обнаружение'][3]:
+        raise SystemExit("Детали не обнаружены: увеличьте --size")
+    for name, (seconds, distance, planning, picks) in totals.items():
+        print(f"{name:26s} путь {distance / args.trays:8.0f} мм, цикл {seconds / args.trays:6.2f} с, "
+              f"{picks / seconds * 60:6.1f} захв./мин, планирование "
+              f"{planning / args.trays * 1e3:6.2f} мс")
@@ -0,0 +1,159 @@
+"""
+Многопроцессный конвейер (pipeline.Pipeline) против обработки в одном потоке.
+
+Источник — синтетическая камера, отдающая кадры в координатах камеры
+с заданной частотой (--camera-fps, по умолчанию 30 — частота камеры
+линии; 0 — без ограничения, тогда однопоточный режим не получает GIL
+у потока захвата и сравнение теряет смысл). Однопоточный
+режим повторяет gui.FrameProcessor: CaptureThread и цепочка
+transform_zone -> image_correction -> detect в одном потоке. Конвейер
+запускается с 1..--detectors процессами обнаружения. Печатаются кадры
+в секунду и задержка от захвата до результата (p50/p95), проверяется, что
+результаты пришли по порядку и совпадают с последовательной обработкой
+тех же кадров камеры. Оба режима пропускают кадры, которые не успевают
+обработать (в конвейере новый кадр занимает буфер самого старого
+ожидающего), поэтому задержка не растёт с числом буферов (--slots).
+
+Запуск из корня репозитория:
+    python -m Benchmarks.pipeline [--frames 300] [--parts 30] [--detectors 2]
+        [--camera-fps 30] [--slots 4]
+"""
+import argparse
+import functools
+import json
+import time
+
+import numpy as np
+
+from Benchmarks.synthetic import synthetic_frames
+from capture import CaptureThread
+from image import Image
+from pipeline import Pipeline
+
+
+class SyntheticCamera:
+    """Камера с синтетическими кадрами; после count кадров get_image возвращает None."""
+
+    def __init__(self, count, parts, fps=0.0):
+        self.count = count
+        self.parts = parts
+        self.fps = fps
+        self._frames = None
+        self._index = 0
+        self._next = 0.0
+
+    def get_image(self, dst=None):
+        if self._frames is None:
+            self._frames = list(synthetic_frames(min(self.count, 8), self.parts))
+        if self._index >= self.count:
+            return None
+        if self.fps:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next = max(self._next, time.monotonic()) + 1 / self.fps
+        frame = self._frames[self._index % len(self._frames)]
+        self._index += 1
+        if dst is not None and dst.shape == frame.shape and dst.dtype == frame.dtype:
+            np.copyto(dst, frame)
+            return dst
+        return frame.copy()
+
+    def end(self):
+        pass
+
+
+def signature(rows):
+    return sorted(zip(rows['cX'].tolist(), rows['cY'].tolist(),
+                      rows['orientation'].tolist(), rows['type'].tolist()))
+
+
+def sequential(args, parameters):
+    """Эталон: каждый кадр источника по порядку, без пропусков."""
+    camera = SyntheticCamera(args.frames, args.parts)
+    image = Image()
+    image.set_parameters(parameters)
+    results = []
+    while True:
+        frame = camera.get_image()
+        if frame is None:
+            return results
+        detection = image.detect(image.image_correction(image.transform_zone(frame)))
+        results.append(signature(detection.table.rows))
+
+
+def single_thread(args, parameters):
+    """
+    Режим gui.FrameProcessor. CaptureThread отдаёт последний кадр, поэтому
+    задержка — время обработки кадра (без ожидания в кольце захвата).
+    """
+    capture = CaptureThread(SyntheticCamera(args.frames, args.parts, args.camera_fps),
+                            stop_on_empty=True).start()
+    image = Image()
+    image.set_parameters(parameters)
+    latencies = []
+    start = time.perf_counter()
+    while True:
+        frame = capture.get_image()
+        if frame is None:
+            break
+        began = time.perf_counter()
+        image.detect(image.image_correction(image.transform_zone(frame)))
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    capture.stop()
+    return len(latencies) / elapsed, latencies
+
+
+def pipelined(args, parameters, detectors, reference):
+    camera_factory = functools.partial(SyntheticCamera, args.frames, args.parts, args.camera_fps)
+    pipeline = Pipeline(camera_factory, parameters, slots=args.slots, detectors=detectors,
+                        stop_on_empty=True).start()
+    latencies, matched, sequences = [], [], []
+    start = None
+    while True:
+        result = pipeline.get(timeout=10.0)
+        if result is None:
+            break
+        if start is None:
+            # Отсчёт с первого результата: запуск процессов в замер не входит
+            start = time.perf_counter()
+        latencies.append(result.latency)
+        sequences.append(result.sequence)
+        matched.append(signature(result.rows) == reference[result.number])
+        pipeline.release(result)
+    elapsed = time.perf_counter() - start
+    pipeline.stop()
+    in_order = sequences == sorted(sequences)
+    return (len(matched) - 1) / elapsed, latencies, all(matched), in_order, pipeline.dropped
+
+
+def report(name, fps, latencies):
+    p50, p95 = np.percentile(np.array(latencies) * 1e3, [50, 95])
+    print(f"{name:24s} {fps:7.1f} кадров/с   задержка p50 {p50:6.2f}  p95 {p95:6.2f} мс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--parts', type=int, default=30)
+    parser.add_argument('--detectors', type=int, default=2)
+    parser.add_argument('--camera-fps', type=float, default=30.0)
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+
+    reference = sequential(args, parameters)
+    fps, latencies = single_thread(args, parameters)
+    report("Один поток", fps, latencies)
+    print(f"{'':24s} обработано кадров {len(latencies)} из {args.frames}")
+    for detectors in range(1, args.detectors + 1):
+        fps, latencies, matches, in_order, dropped = pipelined(args, parameters, detectors,
+                                                               reference)
+        report(f"Конвейер, обнаружение x{detectors}", fps, latencies)
+        print(f"{'':24s} обработано кадров {len(latencies)} из {args.frames}, "
+              f"пропущено {dropped}, по порядку: {in_order}, совпадает с эталоном: {matches}")
@@ -0,0 +1,55 @@
+"""
+Переподключение camera.Camera после ошибок захвата без камеры и SDK.
+
+Camera получает fake_camera.FakeHikCamera, у которой каждый --fail-every-й
+захват завершается ошибкой. Проверяется, что на каждую ошибку приходится
+ровно одно переподключение (reconnects), поток открывается заново
+на следующем захвате, а остальные кадры выдаются без пропусков.
+Печатается время на кадр с учётом переподключений.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.reconnect [--frames 1000] [--fail-every 7]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+
+from Benchmarks.synthetic import synthetic_frames
+from camera import Camera
+from fake_camera import FakeHikCamera
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--fail-every', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        for index, frame in enumerate(synthetic_frames(4, 30)):
+            cv2.imwrite(os.path.join(folder, f"{index:03d}.png"), frame)
+
+        device = FakeHikCamera(folder, fail_every=args.fail_every)
+        camera = Camera(device=device, reconnect_delay=0.0)
+        missing = 0
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            if camera.get_image() is None:
+                missing += 1
+        elapsed = time.perf_counter() - start
+        camera.close()
+
+    failures = args.frames // args.fail_every if args.fail_every else 0
+    assert missing == failures, (missing, failures)
+    assert camera.reconnects == failures, (camera.reconnects, failures)
+    # После ошибки на последнем захвате поток уже не открывается заново
+    last_failed = bool(args.fail_every) and args.frames % args.fail_every == 0
+    assert device.opens == camera.reconnects + 1 - last_failed, (device.opens, camera.reconnects)
+    assert device.frames == args.frames - failures, (device.frames, args.frames - failures)
+    print(f"Захватов: {args.frames}, ошибок: {missing}, переподключений: {camera.reconnects}, "
+          f"открытий потока: {device.opens}, кадров: {device.frames}")
+    print(f"{elapsed / args.frames * 1e3:.3f} мс на захват")
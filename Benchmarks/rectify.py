@@ -0,0 +1,50 @@
+"""
+Сравнение Rectifier (один cv2.remap) с двухшаговым путём
+warpPerspective + undistort: время на кадр и расхождение результатов.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.rectify [путь_к_видео_или_изображению]
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from rectifier import Rectifier
+
+
+def load_frame(path=None, size=(1024, 1280)):
+    if path is None:
+        noise = np.random.default_rng(0).integers(0, 256, size, np.uint8)
+        return cv2.GaussianBlur(noise, (15, 15), 5)
+    capture = cv2.VideoCapture(path)
+    ret, frame = capture.read()
+    capture.release()
+    if not ret:
+        raise RuntimeError(f"Не удалось прочитать кадр: {path}")
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def measure(function, frame, repeats=300):
+    function(frame)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(frame)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+if __name__ == '__main__':
+    frame = load_frame(sys.argv[1] if len(sys.argv) > 1 else None)
+    rectifier = Rectifier()
+
+    mean_diff, max_diff = rectifier.compare(frame)
+    fused = measure(rectifier.rectify, frame)
+    two_step = measure(rectifier.two_step, frame)
+
+    print(f"Кадр: {frame.shape[1]}x{frame.shape[0]}")
+    print(f"Расхождение с двухшаговым путём: среднее {mean_diff:.3f}, "
+          f"максимум {max_diff:.0f}")
+    print(f"warpPerspective + undistort: {two_step:8.1f} мкс/кадр")
+    print(f"remap (Rectifier):           {fused:8.1f} мкс/кадр")
+    print(f"Ускорение: x{two_step / fused:.2f}")
@@ -0,0 +1,174 @@
+"""
+Headless-бенчмарк конвейера обнаружения на записанных видео, папках
+с изображениями или синтетических кадрах.
+
+Каждый кадр проходит полную цепочку transform_zone -> image_correction ->
+detect (порог, морфология, контуры, ориентация, классификация) с
+максимальной скоростью, без окон. Печатается FPS, задержки стадий
+(p50/p95/p99) и деталей в секунду; результаты сохраняются в JSON, чтобы
+сравнивать изменения image.py между собой.
+
+Примеры (из корня репозитория):
+    python -m Benchmarks.replay Video_20241202174919002.mp4
+    python -m Benchmarks.replay frames/ --frames 500 --output results.json
+    python -m Benchmarks.replay --synthetic 300 --parts 40
+    python -m Benchmarks.replay --synthetic 300 --stable [--no-tracking]
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+
+from Camera_std import Camera
+from image import Image
+from profiler import profiler
+from Benchmarks.synthetic import synthetic_frames
+
+
+def video_frames(path, limit):
+    camera = Camera(path)
+    try:
+        for _ in range(limit):
+            frame = camera.get_image()
+            if frame is None:
+                break
+            yield frame
+    finally:
+        if not camera.is_image:
+            camera.camera.release()
+
+
+def folder_frames(path, limit):
+    names = sorted(name for name in os.listdir(path)
+                   if name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+    if not names:
+        raise RuntimeError(f"В папке нет изображений: {path}")
+    # Кадры загружаются заранее, чтобы чтение с диска не попадало в замер
+    frames = [Camera(os.path.join(path, name)).get_image() for name in names]
+    for index in range(limit):
+        yield frames[index % len(frames)]
+
+
+def source_frames(source, limit):
+    if os.path.isdir(source):
+        return folder_frames(source, limit)
+    return video_frames(source, limit)
+
+
+def run(name, frames, image):
+    """
+    Прогоняет кадры через конвейер.
+
+    Returns:
+        dict: Результаты прогона для одного источника.
+    """
+    profiler.reset()
+    tracker = image.tracker
+    if tracker is not None:
+        tracker.reset()
+        tracker.reused = tracker.computed = 0
+    processed = 0
+    parts = 0
+    busy = 0.0
+    for frame in frames:
+        start = time.perf_counter()
+        zone = image.transform_zone(frame)
+        zone = image.image_correction(zone)
+        detection = image.detect(zone)
+        end = time.perf_counter()
+        profiler.record('frame', end - start)
+        busy += end - start
+        processed += 1
+        parts += len(detection.parts)
+
+    return {
+        'source': name,
+        'frames': processed,
+        'fps': processed / busy if busy else 0.0,
+        'parts': parts,
+        'parts_per_frame': parts / processed if processed else 0.0,
+        'parts_per_second': parts / busy if busy else 0.0,
+        'tracking': {'reused': tracker.reused, 'computed': tracker.computed}
+        if tracker is not None else None,
+        'stages': profiler.summary(),
+    }
+
+
+def print_result(result):
+    print(f"\n{result['source']}: кадров {result['frames']}, "
+          f"FPS {result['fps']:.1f}, деталей/кадр {result['parts_per_frame']:.1f}, "
+          f"деталей/с {result['parts_per_second']:.0f}")
+    if result['tracking'] is not None:
+        print(f"  сопровождение: из трека {result['tracking']['reused']}, "
+              f"вычислено {result['tracking']['computed']}")
+    for stage, stats in result['stages'].items():
+        print(f"  {stage:28s} p50 {stats['p50_ms']:7.3f}  p95 {stats['p95_ms']:7.3f}  "
+              f"p99 {stats['p99_ms']:7.3f} мс")
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк конвейера обнаружения деталей.")
+    parser.add_argument('sources', nargs='*',
+                        help="Видеофайлы, изображения или папки с изображениями.")
+    parser.add_argument('--synthetic', type=int, default=0, metavar='КАДРОВ',
+                        help="Добавить синтетический источник из указанного числа кадров.")
+    parser.add_argument('--parts', type=int, default=30,
+                        help="Деталей на синтетическом кадре.")
+    parser.add_argument('--stable', action='store_true',
+                        help="Синтетический лоток не меняется между кадрами.")
+    parser.add_argument('--no-tracking', action='store_true',
+                        help="Обрабатывать каждый кадр с нуля (без PartTracker).")
+    parser.add_argument('--components', action='store_true',
+                        help="Искать детали через connectedComponentsWithStats.")
+    parser.add_argument('--frames', type=int, default=1000,
+                        help="Максимум кадров на источник.")
+    parser.add_argument('--parameters', default='video_parametrs.json',
+                        help="Файл параметров обработки.")
+    parser.add_argument('--output', default='bench_results.json',
+                        help="Куда записать результаты в JSON.")
+    args = parser.parse_args()
+
+    if not args.sources and not args.synthetic:
+        parser.error("Укажите источники или --synthetic.")
+
+    image = Image()
+    if args.no_tracking:
+        image.tracker = None
+    image.components = args.components
+    with open(args.parameters, 'r') as json_file:
+        image.set_parameters(json.load(json_file))
+
+    results = []
+    for source in args.sources:
+        results.append(run(source, source_frames(source, args.frames), image))
+        print_result(results[-1])
+    if args.synthetic:
+        frames = synthetic_frames(min(args.synthetic, args.frames), args.parts,
+                                  variants=1 if args.stable else 8)
+        results.append(run(f"synthetic:{args.parts}", frames, image))
+        print_result(results[-1])
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'parameters': {key: getattr(image, attribute)
+                       for key, attribute in Image.PARAMETERS.items()},
+        'results': results,
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(report, json_file, indent=4)
+    print(f"\nРезультаты записаны в {args.output}")
+
+
+if __name__ == '__main__':
+    main()
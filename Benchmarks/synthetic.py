@@ -0,0 +1,105 @@
+"""
+Синтетические кадры с деталями для бенчмарков без записей с линии.
+
+Детали рисуются тёмными трапециями на светлом фоне в координатах рабочей
+зоны; при необходимости кадр переводится в координаты камеры обратной
+матрицей трансформации, чтобы через конвейер проходил полный путь
+transform_zone -> image_correction -> detect.
+"""
+import cv2
+import numpy as np
+
+from calibration_store import calibration_store
+
+# Примерные размеры (длина, ширина у основания, ширина у вершины) деталей
+# трёх классов: "4_5", "3_4", "1"
+PART_SHAPES = [(22, 14, 9), (17, 11, 7), (13, 9, 5)]
+
+
+def render_tray(count, size=(279, 197), seed=0, background=200, foreground=60,
+                spacing=None):
+    """
+    Рисует лоток с деталями в координатах рабочей зоны.
+
+    Args:
+        count (int): Количество деталей.
+        size (tuple): Ширина и высота зоны.
+        seed (int): Зерно генератора случайных чисел.
+        background (int): Яркость фона.
+        foreground (int): Яркость деталей.
+        spacing (int | None): Шаг сетки, по которой расставляются детали.
+            По умолчанию подбирается под количество деталей.
+
+    Returns:
+        tuple: Кадр (оттенки серого) и список (x, y, класс) центров деталей.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    frame = np.full((height, width), background, np.uint8)
+
+    if spacing is None:
+        spacing = max(int(np.sqrt(width * (height - 30) / max(count, 1))), 12)
+    xs = np.arange(spacing // 2, width - spacing // 2, spacing)
+    ys = np.arange(30 + spacing // 2, height - spacing // 2, spacing)
+    cells = [(x, y) for y in ys for x in xs]
+    rng.shuffle(cells)
+
+    placed = []
+    for x, y in cells[:count]:
+        kind = int(rng.integers(len(PART_SHAPES)))
+        length, base, top = PART_SHAPES[kind]
+        scale = min(1.0, (spacing - 3) / length)
+        length, base, top = length * scale, base * scale, top * scale
+        points = np.array([[-base / 2, length / 2], [base / 2, length / 2],
+                           [top / 2, -length / 2], [-top / 2, -length / 2]])
+        angle = rng.choice([0.0, np.pi]) + rng.uniform(-0.2, 0.2)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                             [np.sin(angle), np.cos(angle)]])
+        polygon = np.round(points @ rotation.T + (x, y)).astype(np.int32)
+        cv2.fillPoly(frame, [polygon], foreground)
+        placed.append((int(x), int(y), kind))
+    return frame, placed
+
+
+def to_camera(zone_frame, calibration=calibration_store):
+    """
+    Переводит кадр рабочей зоны в координаты камеры (обратная трансформация).
+
+    Args:
+        zone_frame (np.ndarray): Кадр рабочей зоны.
+        calibration (CalibrationStore): Источник матрицы трансформации.
+
+    Returns:
+        np.ndarray: Кадр камеры, из которого transform_zone восстановит зону.
+    """
+    M, (width, height) = calibration.transformation()
+    corners = np.array([[[0, 0]], [[width, 0]], [[width, height]], [[0, height]]],
+                       dtype=np.float32)
+    camera_corners = cv2.perspectiveTransform(
+        corners, np.linalg.inv(M.astype(np.float64)))
+    camera_width, camera_height = np.ceil(camera_corners.max(axis=(0, 1))).astype(int) + 1
+    return cv2.warpPerspective(zone_frame, M, (int(camera_width), int(camera_height)),
+                               flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                               borderValue=int(zone_frame[0, 0]))
+
+
+def synthetic_frames(frames, parts, seed=0, camera=True, variants=8):
+    """
+    Генерирует последовательность синтетических кадров.
+
+    Args:
+        frames (int): Количество кадров.
+        parts (int): Количество деталей на кадре.
+        seed (int): Зерно генератора.
+        camera (bool): Возвращать кадры в координатах камеры, а не зоны.
+        variants (int): Сколько разных лотков чередуется (1 — неподвижный лоток).
+
+    Yields:
+        np.ndarray: Кадр в оттенках серого.
+    """
+    trays = []
+    for index in range(min(frames, variants)):
+        tray, _ = render_tray(parts, seed=seed + index)
+        trays.append(to_camera(tray) if camera else tray)
+    for index in range(frames):
+        yield trays[index % len(trays)]
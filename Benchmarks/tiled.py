@@ -0,0 +1,84 @@
+"""
+Обработка большой рабочей зоны по полосам (Image.strips) против всего кадра.
+
+Лоток рисуется в зоне --size (по умолчанию 2232x1576 — в 8 раз больше
+нынешней 279x197 по каждой стороне); поверх деталей добавляются длинная
+полоса и кольцо, пересекающие границы полос. Для каждого числа полос
+проверяется, что маска совпадает бит в бит, контуры — вместе с порядком,
+а детали detect — полностью, и печатается время маски и поиска контуров.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.tiled [--size 2232 1576] [--parts 1500] [--strips 2 4 8] [--workers 4]
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from Benchmarks.synthetic import render_tray
+from image import Image
+
+
+def make_image(parameters, strips, workers):
+    image = Image()
+    image.set_parameters(parameters)
+    image.tracker = None
+    image.change_detector = None
+    image.strips = strips
+    image.workers = workers
+    return image
+
+
+def run(image, frame, repeats):
+    """
+    Returns:
+        tuple: Время маски и контуров на кадр, маска, контуры, детали.
+    """
+    busy = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        mask = image.threshold(frame)
+        contours = image._find_contours(mask)
+        busy += time.perf_counter() - start
+    detection = image.detect(frame)
+    parts = list(zip(detection.centers, detection.orientations, detection.types))
+    return busy / repeats, mask.copy(), contours, parts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, nargs=2, default=(2232, 1576))
+    parser.add_argument('--parts', type=int, default=1500)
+    parser.add_argument('--strips', type=int, nargs='+', default=(2, 4, 8))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+    width, height = args.size
+    tray, _ = render_tray(args.parts, size=(width, height))
+    cv2.rectangle(tray, (50, 100), (60, height - 50), 60, -1)
+    cv2.circle(tray, (width // 2, height // 2), height // 4, 60, 6)
+
+    reference = make_image(parameters, 1, 1)
+    frame = reference.image_correction(tray).copy()
+    full_time, full_mask, full_contours, full_parts = run(reference, frame, args.repeats)
+    print(f"Процессоров: {os.cpu_count()}, зона {width}x{height}, "
+          f"контуров {len(full_contours)}, деталей {len(full_parts)}")
+    print(f"весь кадр:           {full_time * 1e3:8.2f} мс")
+
+    for strips in args.strips:
+        image = make_image(parameters, strips, args.workers)
+        elapsed, mask, contours, parts = run(image, frame, args.repeats)
+        same_contours = (len(contours) == len(full_contours)
+                         and all(np.array_equal(a, b) for a, b in zip(contours, full_contours)))
+        print(f"полос {len(image._strip_bounds(height)):2d}, потоков {args.workers}: "
+              f"{elapsed * 1e3:8.2f} мс, ускорение x{full_time / elapsed:.2f}, "
+              f"маска {np.array_equal(mask, full_mask)}, контуры {same_contours}, "
+              f"детали {parts == full_parts}")
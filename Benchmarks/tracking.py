@@ -0,0 +1,125 @@
+"""
+Проверка сопровождения деталей (PartTracker): результаты detect с трекером
+должны совпадать с обработкой каждого кадра с нуля.
+
+Лоток меняется случайно: детали убираются, добавляются, сдвигаются на
+1-3 пикселя, переворачиваются на месте, к ним прилипают мелкие пятна
+(контур меняется на несколько пикселей); между изменениями кадр
+повторяется, чтобы трекер мог использовать сохранённые результаты.
+Каждый кадр обрабатывается с нуля (без трекера и поиска изменений),
+с трекером и с трекером вместе с поиском изменений (Image() по умолчанию).
+Печатаются кадры с расхождением, доля деталей, взятых из треков, и время detect.
+
+Запуск из корня репозитория:
+    python -m Benchmarks.tracking [--frames 1800] [--parts 30] [--seed 0]
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+from Benchmarks.synthetic import PART_SHAPES
+from image import Image
+
+SIZE = (279, 197)
+BACKGROUND, FOREGROUND = 200, 60
+
+
+def draw(parts, specks):
+    frame = np.full((SIZE[1], SIZE[0]), BACKGROUND, np.uint8)
+    for x, y, kind, angle in parts:
+        length, base, top = PART_SHAPES[kind]
+        points = np.array([[-base / 2, length / 2], [base / 2, length / 2],
+                           [top / 2, -length / 2], [-top / 2, -length / 2]])
+        rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                             [np.sin(angle), np.cos(angle)]])
+        cv2.fillPoly(frame, [np.round(points @ rotation.T + (x, y)).astype(np.int32)], FOREGROUND)
+    for x, y, w, h in specks:
+        frame[y:y + h, x:x + w] = FOREGROUND
+    return frame
+
+
+def random_part(rng):
+    return (float(rng.uniform(20, SIZE[0] - 20)), float(rng.uniform(50, SIZE[1] - 20)),
+            int(rng.integers(len(PART_SHAPES))),
+            float(rng.choice([0.0, np.pi]) + rng.uniform(-0.3, 0.3)))
+
+
+def random_sequence(frames, parts, seed=0):
+    """Кадры со случайными изменениями лотка; каждое состояние повторяется 1-3 раза."""
+    rng = np.random.default_rng(seed)
+    state = [random_part(rng) for _ in range(parts)]
+    specks = []
+    result = []
+    while len(result) < frames:
+        frame = draw(state, specks)
+        result.extend([frame] * int(rng.integers(1, 4)))
+        for _ in range(int(rng.integers(1, 4))):
+            action = rng.integers(5)
+            index = int(rng.integers(len(state))) if state else None
+            if action == 0 and state:
+                del state[index]
+            elif action == 1 or not state:
+                state.append(random_part(rng))
+            elif action == 2:
+                x, y, kind, angle = state[index]
+                state[index] = (x + rng.integers(-3, 4), y + rng.integers(-3, 4), kind, angle)
+            elif action == 3:
+                x, y, kind, angle = state[index]
+                state[index] = (x, y, kind, angle + np.pi)
+            else:
+                x, y, kind, _ = state[index]
+                length = PART_SHAPES[kind][0]
+                specks.append((int(x + rng.integers(-length, length) // 2),
+                               int(y + rng.integers(-length, length) // 2),
+                               int(rng.integers(2, 5)), int(rng.integers(2, 5))))
+    return result[:frames]
+
+
+def make_image(parameters, tracking, changes):
+    image = Image()
+    image.set_parameters(parameters)
+    if not tracking:
+        image.tracker = None
+    if not changes:
+        image.change_detector = None
+    return image
+
+
+def run(image, frames):
+    busy = 0.0
+    results = []
+    for frame in frames:
+        zone = image.image_correction(frame)
+        start = time.perf_counter()
+        detection = image.detect(zone)
+        busy += time.perf_counter() - start
+        results.append(sorted(zip(detection.centers, detection.orientations, detection.types)))
+    return busy / len(frames), results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=1800)
+    parser.add_argument('--parts', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parameters', default='video_parametrs.json')
+    args = parser.parse_args()
+
+    with open(args.parameters, 'r') as json_file:
+        parameters = json.load(json_file)
+    frames = random_sequence(args.frames, args.parts, args.seed)
+
+    fresh_time, reference = run(make_image(parameters, False, False), frames)
+    print(f"Кадров: {len(frames)}, с нуля: {fresh_time * 1e3:.3f} мс/кадр")
+    for name, changes in (("трекер", False), ("трекер и поиск изменений", True)):
+        image = make_image(parameters, True, changes)
+        elapsed, results = run(image, frames)
+        mismatches = sum(a != b for a, b in zip(results, reference))
+        tracker = image.tracker
+        reused = tracker.reused / max(tracker.reused + tracker.computed, 1)
+        print(f"{name}: кадров с расхождением {mismatches}, из треков {reused:.0%}, "
+              f"{elapsed * 1e3:.3f} мс/кадр")
@@ -3,6 +3,7 @@ import numpy as np
 from typing import Optional, Any
 from hik_camera.hik_camera import HikCamera
 import json
+import time
 
 
 class Marker:
@@ -26,6 +27,7 @@ class Camera:
             raise RuntimeError("Не удалось найти доступные камеры.")
 
         self.camera = HikCamera(ip=self.ip)
+        self.is_open = False
         self._configure_camera()
 
     def _get_first_camera_ip(self) -> Optional[str]:
@@ -48,16 +50,33 @@ class Camera:
             self.camera["Gain"] = 0
         print(f"Камера с IP {self.ip} настроена.")
 
+    def close(self) -> None:
+        """
+        Закрывает поток камеры.
+        """
+        if not self.is_open:
+            return
+        self.is_open = False
+        try:
+            self.camera.__exit__(None, None, None)
+        except Exception as e:
+            print(f"Ошибка закрытия камеры: {e}")
+
     def get_image(self) -> Optional[Any]:
         """
-        Получает изображение с камеры.
+        Получает изображение с камеры. Поток открывается один раз
+        и переоткрывается только после ошибки захвата.
         """
         try:
-            with self.camera:
-                frame = self.camera.robust_get_frame()
-                return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if not self.is_open:
+                self.camera.__enter__()
+                self.is_open = True
+            frame = self.camera.robust_get_frame()
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         except Exception as e:
             print(f"Ошибка получения изображения: {e}")
+            self.close()
+            time.sleep(1.0)
             return None
 
     def show(self, frame: Any) -> None:
@@ -74,6 +93,7 @@ class Camera:
         """
         Завершает работу с камерой и закрывает окна отображения.
         """
+        self.close()
         cv2.destroyAllWindows()
 
 
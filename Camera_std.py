@@ -1,5 +1,6 @@
 import cv2
 from typing import Optional, Any
+from pixel_format import PixelFormat
 
 
 class Camera:
@@ -9,16 +10,20 @@ class Camera:
     Attributes:
         source (cv2.VideoCapture | str): Объект для захвата кадров из видео или путь к изображению.
         is_image (bool): Флаг, указывающий, является ли источник изображением.
+        pixel_format (PixelFormat): Формат кадров, которые отдаёт get_image.
     """
 
-    def __init__(self, source_path: str) -> None:
+    def __init__(self, source_path: str, pixel_format: Optional[PixelFormat] = None) -> None:
         """
         Инициализация объекта Camera.
 
         Args:
             source_path (str): Путь к видеофайлу или изображению.
+            pixel_format (Optional[PixelFormat]): Нужный конвейеру формат кадра.
+                По умолчанию — оттенки серого.
         """
         self.source_path = source_path
+        self.pixel_format = pixel_format if pixel_format else PixelFormat()
         self.is_image = source_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp'))
 
         if self.is_image:
@@ -34,24 +39,27 @@ class Camera:
                 raise RuntimeError(
                     f"Не удалось открыть видеофайл: {self.source_path}")
 
-    def get_image(self) -> Optional[Any]:
+    def get_image(self, dst: Optional[Any] = None) -> Optional[Any]:
         """
         Получает следующий кадр из видео или возвращает изображение.
 
+        Args:
+            dst (Optional[Any]): Буфер для результата (например, из кольца CaptureThread).
+                Используется, если совпадает по размеру и типу с кадром.
+
         Returns:
             Optional[Any]: Кадр в формате NumPy массива или None, если видео закончилось.
         """
         if self.is_image:
-            # Если это изображение, возвращаем его
-            GRAY_frame = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
-            return GRAY_frame
+            # Если это изображение, возвращаем его в нужном формате, не изменяя оригинал
+            frame = self.image if self.pixel_format.color == PixelFormat.GRAY else self.image.copy()
+            return self.pixel_format.convert(frame, dst)
         else:
             # Если это видео, захватываем следующий кадр
             try:
                 ret, frame = self.camera.read()
                 if ret:
-                    GRAY_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    return GRAY_frame
+                    return self.pixel_format.convert(frame, dst)
                 else:
                     print("Кадры в видеофайле закончились.")
                     return None
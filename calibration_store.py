@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class CalibrationFile:
+    """
+    JSON-файл калибровки, кэшируемый в памяти.
+
+    Файл читается один раз и перечитывается только при изменении его
+    времени модификации (mtime), поэтому правки калибровки применяются
+    "на лету" без чтения диска на каждом кадре.
+
+    Attributes:
+        path (str): Путь к JSON-файлу.
+        version (int): Номер версии данных, увеличивается при каждой перезагрузке.
+    """
+
+    def __init__(self, path: str, parser: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Инициализация объекта CalibrationFile.
+
+        Args:
+            path (str): Путь к JSON-файлу.
+            parser (Callable): Функция, превращающая словарь из JSON в готовые данные.
+        """
+        self.path = path
+        self.version = 0
+        self._parser = parser
+        self._mtime: Optional[int] = None
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """
+        Возвращает данные файла, перечитывая его только при изменении mtime.
+
+        Returns:
+            Any: Результат функции parser для текущего содержимого файла.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return self._value
+
+        with self._lock:
+            if mtime != self._mtime:
+                self._reload(mtime)
+        return self._value
+
+    def _reload(self, mtime: int) -> None:
+        """
+        Перечитывает файл. Если файл повреждён (например, записан не до конца),
+        сохраняются предыдущие данные, а при их отсутствии выбрасывается ошибка.
+        """
+        try:
+            with open(self.path, 'r') as json_file:
+                value = self._parser(json.load(json_file))
+        except (json.JSONDecodeError, KeyError, ValueError):
+            if self._value is None:
+                raise ValueError(
+                    f"Ошибка при чтении файла калибровки: {self.path}")
+            print(f"Ошибка при чтении файла {self.path}, "
+                  f"используются предыдущие данные.")
+            return
+
+        self._value = value
+        self._mtime = mtime
+        self.version += 1
+
+
+def _parse_transformation(data: Dict[str, Any]) -> Tuple[np.ndarray, Tuple[int, int]]:
+    M = np.asarray(data['M'], dtype=np.float32).reshape(3, 3)
+    size = (int(data.get('maxWidth', 0)), int(data.get('maxHeight', 0)))
+    M.flags.writeable = False
+    return M, size
+
+
+def _parse_camera(data: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    camera_matrix = np.asarray(
+        data['camera_matrix'], dtype=np.float32).reshape(3, 3)
+    dist_coefficients = np.asarray(
+        data['dist_coefficients'], dtype=np.float32).reshape(1, -1)
+    camera_matrix.flags.writeable = False
+    dist_coefficients.flags.writeable = False
+    return camera_matrix, dist_coefficients
+
+
+class CalibrationStore:
+    """
+    Общее хранилище калибровочных данных.
+
+    Attributes:
+        transformation_file (CalibrationFile): Данные перспективного преобразования зоны.
+        camera_file (CalibrationFile): Матрица камеры и коэффициенты дисторсии.
+    """
+
+    def __init__(self,
+                 transformation_path: str = 'transformation_data.json',
+                 calibration_path: str = 'calibration_result.json') -> None:
+        """
+        Инициализация объекта CalibrationStore.
+
+        Args:
+            transformation_path (str): Путь к файлу с матрицей трансформации.
+            calibration_path (str): Путь к файлу с результатами калибровки камеры.
+        """
+        self.transformation_file = CalibrationFile(
+            transformation_path, _parse_transformation)
+        self.camera_file = CalibrationFile(calibration_path, _parse_camera)
+
+    def transformation(self) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Возвращает матрицу трансформации и размер рабочей зоны.
+
+        Returns:
+            Tuple[np.ndarray, Tuple[int, int]]: Матрица M (3x3, float32) и (maxWidth, maxHeight).
+        """
+        return self.transformation_file.get()
+
+    def camera(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает параметры калибровки камеры.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: camera_matrix (3x3) и dist_coefficients (1xN), float32.
+        """
+        return self.camera_file.get()
+
+
+calibration_store = CalibrationStore()
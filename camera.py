@@ -1,29 +1,57 @@
 from typing import Optional, Any
-from hik_camera.hik_camera import HikCamera
+from pixel_format import PixelFormat
 import cv2
+import time
 
 
 class Camera:
     """
     Класс для работы с IP-камерой Hikvision.
 
+    Поток камеры открывается один раз при первом захвате и остаётся открытым;
+    при ошибке захвата сессия закрывается и переоткрывается на следующем кадре.
+
     Attributes:
-        camera (HikCamera): Объект камеры для захвата изображений.
+        camera (HikCamera): Объект камеры для захвата изображений
+            (hik_camera импортируется только при поиске настоящей камеры).
         ip (str): IP-адрес подключенной камеры.
+        pixel_format (PixelFormat): Формат кадров, которые отдаёт get_image.
+        is_open (bool): Открыт ли поток камеры.
+        reconnects (int): Количество переподключений после ошибок.
     """
 
-    def __init__(self, ip: Optional[str] = None) -> None:
+    def __init__(self, ip: Optional[str] = None, device: Optional[Any] = None,
+                 reconnect_delay: float = 1.0,
+                 pixel_format: Optional[PixelFormat] = None) -> None:
         """
         Инициализация объекта Camera.
 
         Args:
             ip (Optional[str]): IP-адрес камеры. Если не указан, автоматически выбирается первая доступная камера.
+            device (Optional[Any]): Готовый объект камеры с интерфейсом HikCamera
+                (например, fake_camera.FakeHikCamera). Если указан, поиск камер не выполняется.
+            reconnect_delay (float): Пауза в секундах перед повторным открытием потока после ошибки.
+            pixel_format (Optional[PixelFormat]): Нужный конвейеру формат кадра.
+                По умолчанию — инвертированные оттенки серого.
         """
-        self.ip = ip if ip else self._get_first_camera_ip()
-        if not self.ip:
-            raise RuntimeError("Не удалось найти доступные камеры.")
-
-        self.camera = HikCamera(ip=self.ip)
+        self.pixel_format = pixel_format if pixel_format else PixelFormat(
+            PixelFormat.GRAY, inverted=True)
+        self.is_open = False
+        self.reconnects = 0
+        self.reconnect_delay = reconnect_delay
+
+        if device is not None:
+            self.camera = device
+            self.ip = ip if ip else getattr(device, 'ip', None)
+        else:
+            # SDK камеры нужен только для настоящего устройства: с device=FakeHikCamera
+            # модуль импортируется без него
+            from hik_camera.hik_camera import HikCamera
+
+            self.ip = ip if ip else self._get_first_camera_ip()
+            if not self.ip:
+                raise RuntimeError("Не удалось найти доступные камеры.")
+            self.camera = HikCamera(ip=self.ip)
         self._configure_camera()
 
     def _get_first_camera_ip(self) -> Optional[str]:
@@ -33,6 +61,8 @@ class Camera:
         Returns:
             Optional[str]: IP-адрес первой камеры или None, если камеры не найдены.
         """
+        from hik_camera.hik_camera import HikCamera
+
         ips = HikCamera.get_all_ips()
         if ips:
             print(f"Найдены камеры: {ips}")
@@ -65,26 +95,56 @@ class Camera:
         # except AssertionError as e:
         #     print(f"Ошибка настройки камеры: {e}")
 
-    def get_image(self) -> Optional[Any]:
+    def open(self) -> None:
+        """
+        Открывает поток камеры, если он ещё не открыт.
+        """
+        if not self.is_open:
+            self.camera.__enter__()
+            self.is_open = True
+
+    def close(self) -> None:
+        """
+        Закрывает поток камеры. Ошибки закрытия не пробрасываются:
+        после сбоя связи устройство может быть уже недоступно.
+        """
+        if not self.is_open:
+            return
+        self.is_open = False
+        try:
+            self.camera.__exit__(None, None, None)
+        except Exception as e:
+            print(f"Ошибка закрытия камеры: {e}")
+
+    def _reconnect(self) -> None:
+        """
+        Закрывает сессию после ошибки; поток будет открыт заново при следующем захвате.
+        """
+        self.close()
+        self.reconnects += 1
+        time.sleep(self.reconnect_delay)
+
+    def get_image(self, dst: Optional[Any] = None) -> Optional[Any]:
         """
         Получает изображение с камеры.
 
+        Args:
+            dst (Optional[Any]): Буфер для результата (например, из кольца CaptureThread).
+                Используется, если совпадает по размеру и типу с кадром.
+
         Returns:
             Optional[Any]: Изображение в формате NumPy массива или None, если произошла ошибка.
         """
         try:
-            with self.camera:
-                frame = self.camera.robust_get_frame()
-                if len(frame.shape) == 2:
-                    GRAY_frame = frame
-                else:
-                    GRAY_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                inverted_GRAY_frame = cv2.bitwise_not(GRAY_frame)
-                return inverted_GRAY_frame
+            self.open()
+            frame = self.camera.robust_get_frame()
         except Exception as e:
             print(f"Ошибка получения изображения: {e}")
+            self._reconnect()
             return None
 
+        return self.pixel_format.convert(frame, dst)
+
     def show(self, frame: Any) -> None:
         """
         Отображает изображение.
@@ -108,6 +168,7 @@ class Camera:
         Returns:
             None
         """
+        self.close()
         cv2.destroyAllWindows()
 
 
@@ -0,0 +1,176 @@
+import threading
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+
+from profiler import profiler
+
+
+class CaptureThread:
+    """
+    Фоновый захват кадров с камеры в кольцо заранее выделенных буферов.
+
+    Поток-производитель захватывает кадры прямо в свободный буфер кольца
+    (camera.get_image(dst=...)), поэтому экспозиция и передача кадра
+    перекрываются с обработкой предыдущего. Потребитель всегда получает
+    самый свежий кадр без копирования; кадры, которые никто не успел забрать,
+    отбрасываются (политика "только последний").
+
+    Подходит для camera.Camera и Camera_std.Camera: у объекта должен быть
+    метод get_image(dst=None).
+
+    Attributes:
+        camera (Any): Источник кадров.
+        frames (int): Количество захваченных кадров.
+        dropped (int): Количество кадров, перезаписанных до того, как их забрал потребитель.
+        duplicates (int): Сколько раз потребитель получил уже выданный ранее кадр.
+        failures (int): Количество неудачных захватов (get_image вернул None).
+        finished (bool): Источник закончился (для записей при stop_on_empty=True).
+    """
+
+    def __init__(self, camera: Any, slots: int = 3, stop_on_empty: bool = False) -> None:
+        """
+        Инициализация объекта CaptureThread.
+
+        Args:
+            camera (Any): Объект камеры с методом get_image(dst=None).
+            slots (int): Размер кольца буферов, не меньше 3.
+            stop_on_empty (bool): Останавливать захват, когда get_image вернул None
+                (конец видеофайла). Для живой камеры None означает временную ошибку.
+        """
+        if slots < 3:
+            raise ValueError("Кольцу нужно не меньше трёх буферов.")
+        self.camera = camera
+        self.stop_on_empty = stop_on_empty
+
+        self.frames = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.failures = 0
+        self.finished = False
+
+        self._slots: List[Optional[np.ndarray]] = [None] * slots
+        self._latest: Optional[int] = None
+        self._reading: Optional[int] = None
+        self._latest_number = 0
+        self._read_number = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'CaptureThread':
+        """
+        Запускает поток захвата.
+        """
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Останавливает поток захвата и дожидается его завершения.
+        """
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _free_slot(self) -> int:
+        with self._condition:
+            for index in range(len(self._slots)):
+                if index != self._latest and index != self._reading:
+                    return index
+        raise RuntimeError("Нет свободного буфера в кольце.")
+
+    def _run(self) -> None:
+        while self._running:
+            index = self._free_slot()
+            slot = self._slots[index]
+            start = time.perf_counter()
+            frame = self.camera.get_image(dst=slot)
+            profiler.record('camera.get_image', time.perf_counter() - start)
+
+            if frame is None:
+                self.failures += 1
+                if self.stop_on_empty:
+                    break
+                continue
+
+            if slot is None or not np.shares_memory(frame, slot):
+                # Первый кадр или смена формата: буфер подстраивается под кадр
+                if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+                    slot = np.empty_like(frame)
+                    self._slots[index] = slot
+                np.copyto(slot, frame)
+
+            with self._condition:
+                if self._latest is not None and self._latest_number > self._read_number:
+                    self.dropped += 1
+                self._latest = index
+                self.frames += 1
+                self._latest_number = self.frames
+                self._condition.notify_all()
+
+        with self._condition:
+            self.finished = True
+            self._running = False
+            self._condition.notify_all()
+
+    def get_image(self, timeout: Optional[float] = 1.0) -> Optional[np.ndarray]:
+        """
+        Возвращает самый свежий кадр без копирования.
+
+        Кадр принадлежит потребителю до следующего вызова get_image:
+        производитель не пишет в этот буфер, поэтому кадр можно менять на месте.
+
+        Args:
+            timeout (Optional[float]): Сколько ждать нового кадра. Если новый кадр
+                не появился, возвращается предыдущий (считается дубликатом).
+
+        Returns:
+            Optional[np.ndarray]: Кадр или None, если кадров ещё не было
+            либо источник закончился.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._latest_number > self._read_number or not self._running,
+                timeout)
+
+            if self._latest is None or (self.finished and self._latest_number == self._read_number):
+                return None
+
+            if self._latest_number == self._read_number:
+                self.duplicates += 1
+            self._reading = self._latest
+            self._read_number = self._latest_number
+            return self._slots[self._reading]
+
+    def statistics(self) -> dict:
+        """
+        Возвращает счётчики захвата.
+
+        Returns:
+            dict: frames, dropped, duplicates, failures.
+        """
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'duplicates': self.duplicates,
+            'failures': self.failures,
+        }
+
+    def show(self, frame: Any) -> None:
+        self.camera.show(frame)
+
+    def end(self) -> None:
+        """
+        Останавливает захват и завершает работу с камерой.
+        """
+        self.stop()
+        self.camera.end()
@@ -0,0 +1,136 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Поиск изменившихся участков кадра рабочей зоны.
+
+    Новый кадр сравнивается с опорным (по нему построена текущая маска).
+    Кадр делится на плитки tile x tile; плитка грязная, если в ней есть
+    пиксели, отличающиеся от опорных больше чем на threshold. Соседние
+    грязные плитки объединяются в участки; участки, которые после
+    расширения на margin оказываются ближе gap друг к другу, сливаются.
+    Опорный кадр обновляется только в грязных плитках, поэтому медленный
+    дрейф яркости в чистых плитках накапливается и в конце концов тоже
+    помечает плитку.
+
+    Attributes:
+        tile (int): Размер плитки, пиксели.
+        threshold (int): Изменение яркости, которое считается изменением.
+        max_dirty (float): Доля грязных плиток, после которой выгоднее
+            обработать кадр целиком.
+        refresh_every (int): Через сколько кадров обрабатывать кадр целиком
+            независимо от изменений (0 — никогда).
+        dirty_tiles (int): Грязных плиток на последнем кадре.
+    """
+
+    def __init__(self, tile=16, threshold=10, max_dirty=0.5, refresh_every=100):
+        self.tile = tile
+        self.threshold = threshold
+        self.max_dirty = max_dirty
+        self.refresh_every = refresh_every
+
+        self.dirty_tiles = 0
+        self.frames = 0
+        self._reference = None
+        self._difference = None
+        self._padded = None
+
+    def reset(self):
+        """Следующий кадр будет обработан целиком."""
+        self._reference = None
+
+    def update(self, frame: np.ndarray, margin: int,
+               gap: int = 0) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Сравнивает кадр с опорным.
+
+        Args:
+            frame (np.ndarray): Скорректированный кадр рабочей зоны.
+            margin (int): На сколько пикселей изменение пикселя влияет на маску.
+            gap (int): Участки, между которыми не больше gap пикселей, сливаются
+                (чтобы одна деталь не попала в два участка).
+
+        Returns:
+            None — кадр нужно обработать целиком (опорный кадр обновлён);
+            [(x0, y0, x1, y1), ...] — непересекающиеся участки маски, которые
+            нужно пересчитать; [] — кадр не изменился.
+        """
+        self.frames += 1
+        reference = self._reference
+        if (reference is None or reference.shape != frame.shape
+                or (self.refresh_every and self.frames % self.refresh_every == 0)):
+            self._reference = frame.copy()
+            self._difference = np.empty_like(frame)
+            self.dirty_tiles = -1
+            return None
+
+        height, width = frame.shape[:2]
+        tile = self.tile
+        rows, columns = -(-height // tile), -(-width // tile)
+        if self._padded is None or self._padded.shape != (rows * tile, columns * tile):
+            self._padded = np.zeros((rows * tile, columns * tile), np.uint8)
+
+        cv2.absdiff(frame, reference, dst=self._difference)
+        cv2.threshold(self._difference, self.threshold, 1, cv2.THRESH_BINARY,
+                      dst=self._padded[:height, :width])
+        dirty = self._padded.reshape(rows, tile, columns, tile).max(axis=(1, 3))
+        self.dirty_tiles = int(np.count_nonzero(dirty))
+        if self.dirty_tiles == 0:
+            return []
+        if self.dirty_tiles > self.max_dirty * dirty.size:
+            np.copyto(reference, frame)
+            return None
+
+        # Пиксели грязных плиток: опорный кадр обновляется только в них
+        dirty_pixels = np.broadcast_to(dirty[:, None, :, None], (rows, tile, columns, tile))
+        dirty_pixels = dirty_pixels.reshape(rows * tile, columns * tile)[:height, :width]
+
+        regions = []
+        for tx0, ty0, tx1, ty1 in self._clusters(dirty, margin, gap):
+            x0, x1 = tx0 * tile, min(tx1 * tile, width)
+            y0, y1 = ty0 * tile, min(ty1 * tile, height)
+            np.copyto(reference[y0:y1, x0:x1], frame[y0:y1, x0:x1],
+                      where=dirty_pixels[y0:y1, x0:x1].astype(bool))
+            regions.append((max(x0 - margin, 0), max(y0 - margin, 0),
+                            min(x1 + margin, width), min(y1 + margin, height)))
+        return regions
+
+    def _clusters(self, dirty: np.ndarray, margin: int, gap: int) -> List[List[int]]:
+        """
+        Рамки (x0, y0, x1, y1) групп грязных плиток в единицах плиток.
+        Группы, рамки которых после расширения на margin пикселей ближе
+        gap пикселей друг к другу, объединяются.
+        """
+        count, labels = cv2.connectedComponents(dirty, connectivity=8)
+        ys, xs = np.nonzero(dirty)
+        groups = labels[ys, xs]
+        boxes = np.zeros((count, 4), np.int64)
+        boxes[:, :2] = np.iinfo(np.int64).max
+        np.minimum.at(boxes[:, 0], groups, xs)
+        np.minimum.at(boxes[:, 1], groups, ys)
+        np.maximum.at(boxes[:, 2], groups, xs + 1)
+        np.maximum.at(boxes[:, 3], groups, ys + 1)
+        boxes = boxes[1:].tolist()
+
+        # Рамки ближе distance плиток сливаются, пока таких пар нет
+        distance = (2 * margin + gap) / self.tile
+        merged = True
+        while merged and len(boxes) > 1:
+            merged = False
+            for i in range(len(boxes)):
+                for j in range(i + 1, len(boxes)):
+                    a, b = boxes[i], boxes[j]
+                    if (max(a[0], b[0]) - min(a[2], b[2]) <= distance
+                            and max(a[1], b[1]) - min(a[3], b[3]) <= distance):
+                        boxes[i] = [min(a[0], b[0]), min(a[1], b[1]),
+                                    max(a[2], b[2]), max(a[3], b[3])]
+                        del boxes[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return boxes
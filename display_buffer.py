@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+
+class DisplayBuffer:
+    """
+    Двойной буфер кадра для отображения, принадлежащий потоку обработки.
+
+    Поток обработки готовит кадр для показа (копия и отрисовка контуров)
+    только когда интерфейс забрал предыдущий: кадры, которые всё равно не
+    будут показаны, ничего не стоят. Интерфейс забирает последний кадр по
+    своему таймеру (acquire) без копирования; пока он строит из него
+    изображение, поток обработки пишет в другой буфер.
+
+    Чтобы на экран попадал свежий кадр, а не первый после предыдущего
+    показа, следующий кадр готовится не раньше чем через delay секунд
+    после acquire (немного меньше периода таймера интерфейса).
+
+    Attributes:
+        delay (float): Пауза после acquire перед подготовкой следующего кадра.
+        published (int): Кадров подготовлено для показа.
+        shown (int): Кадров забрано интерфейсом.
+        skipped (int): Кадров обработки, не попавших на экран.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.published = 0
+        self.shown = 0
+        self.skipped = 0
+
+        self._buffers = [None, None]
+        self._front: Optional[int] = None
+        self._info: Any = None
+        self._new = False
+        self._requested = True
+        self._due = 0.0
+        self._lock = threading.Lock()
+
+    def wanted(self) -> bool:
+        """Интерфейс ждёт новый кадр."""
+        return self._requested and time.perf_counter() >= self._due
+
+    def publish(self, frame: np.ndarray, draw: Optional[Callable[[np.ndarray], Any]] = None,
+                info: Any = None) -> bool:
+        """
+        Копирует кадр в задний буфер, если интерфейс ждёт новый кадр.
+
+        Args:
+            frame (np.ndarray): Кадр после обработки.
+            draw (Callable | None): Отрисовка поверх копии кадра (например,
+                Image.draw_contours); вызывается только для показываемых кадров.
+            info (Any): Данные для интерфейса вместе с кадром.
+
+        Returns:
+            bool: Кадр подготовлен для показа.
+        """
+        if not self.wanted():
+            self.skipped += 1
+            return False
+
+        index = 0 if self._front is None else 1 - self._front
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != frame.shape or buffer.dtype != frame.dtype:
+            buffer = np.empty_like(frame)
+            self._buffers[index] = buffer
+        np.copyto(buffer, frame)
+        if draw is not None:
+            draw(buffer)
+
+        with self._lock:
+            self._front = index
+            self._info = info
+            self._new = True
+            self._requested = False
+        self.published += 1
+        return True
+
+    def acquire(self) -> Optional[Tuple[np.ndarray, Any]]:
+        """
+        Последний подготовленный кадр без копирования.
+
+        Кадр не меняется до следующего вызова acquire, поэтому его можно
+        передать в QImage, не копируя.
+
+        Returns:
+            Optional[Tuple[np.ndarray, Any]]: Кадр и данные к нему или None,
+            если нового кадра нет.
+        """
+        with self._lock:
+            if not self._new:
+                return None
+            self._new = False
+            self._requested = True
+            self._due = time.perf_counter() + self.delay
+            self.shown += 1
+            return self._buffers[self._front], self._info
@@ -0,0 +1,120 @@
+import os
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+class FakeHikCamera:
+    """
+    Замена HikCamera для проверки без камеры: отдаёт кадры из папки
+    с изображениями или из видеофайла.
+
+    Повторяет используемую часть интерфейса HikCamera: get_all_ips,
+    контекстный менеджер (открытие/закрытие потока), get_frame,
+    robust_get_frame и доступ к параметрам через [].
+
+    Attributes:
+        source (str): Папка с изображениями или путь к видеофайлу.
+        loop (bool): Начинать источник сначала, когда кадры закончились.
+        fail_every (int): Каждый N-й захват завершается ошибкой (0 — без ошибок).
+        is_open (bool): Открыт ли поток.
+        opens (int): Количество открытий потока.
+        frames (int): Количество выданных кадров.
+    """
+
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+    def __init__(self, source: str, ip: str = '127.0.0.1', loop: bool = True,
+                 fail_every: int = 0) -> None:
+        """
+        Инициализация объекта FakeHikCamera.
+
+        Args:
+            source (str): Папка с изображениями или путь к видеофайлу.
+            ip (str): IP-адрес, который сообщает камера.
+            loop (bool): Начинать источник сначала, когда кадры закончились.
+            fail_every (int): Каждый N-й захват завершается ошибкой (0 — без ошибок).
+        """
+        self.source = source
+        self.ip = ip
+        self.loop = loop
+        self.fail_every = fail_every
+
+        self.is_open = False
+        self.opens = 0
+        self.frames = 0
+        self.parameters: Dict[str, Any] = {}
+
+        self._images: Optional[List[np.ndarray]] = None
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._index = 0
+        self._attempts = 0
+
+        if os.path.isdir(source):
+            names = sorted(name for name in os.listdir(source)
+                           if name.lower().endswith(self.IMAGE_EXTENSIONS))
+            self._images = [cv2.imread(os.path.join(source, name), cv2.IMREAD_UNCHANGED)
+                            for name in names]
+            if not self._images:
+                raise RuntimeError(f"В папке нет изображений: {source}")
+
+    @classmethod
+    def get_all_ips(cls) -> List[str]:
+        return ['127.0.0.1']
+
+    def __enter__(self) -> 'FakeHikCamera':
+        if self._images is None:
+            self._capture = cv2.VideoCapture(self.source)
+            if not self._capture.isOpened():
+                raise RuntimeError(f"Не удалось открыть видеофайл: {self.source}")
+        self.is_open = True
+        self.opens += 1
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        self.is_open = False
+
+    def __getitem__(self, key: str) -> Any:
+        return self.parameters[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.parameters[key] = value
+
+    def get_frame(self) -> np.ndarray:
+        """
+        Возвращает следующий кадр источника.
+
+        Returns:
+            np.ndarray: Кадр (оттенки серого или BGR, как в файле).
+        """
+        if not self.is_open:
+            raise RuntimeError("Поток камеры не открыт.")
+
+        self._attempts += 1
+        if self.fail_every and self._attempts % self.fail_every == 0:
+            raise RuntimeError("Имитация ошибки захвата кадра.")
+
+        if self._images is not None:
+            if self._index >= len(self._images):
+                if not self.loop:
+                    raise RuntimeError("Кадры закончились.")
+                self._index = 0
+            frame = self._images[self._index].copy()
+            self._index += 1
+        else:
+            ret, frame = self._capture.read()
+            if not ret and self.loop:
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self._capture.read()
+            if not ret:
+                raise RuntimeError("Кадры закончились.")
+
+        self.frames += 1
+        return frame
+
+    def robust_get_frame(self) -> np.ndarray:
+        return self.get_frame()
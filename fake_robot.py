@@ -0,0 +1,112 @@
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class FakeRobotClient:
+    """
+    Замена контроллера робота для проверки без оборудования.
+
+    Подключается к серверу Robot по TCP, как это делает контроллер,
+    записывает все полученные данные с временем приёма и при необходимости
+    отправляет серверу ответы.
+
+    Attributes:
+        host (str): Адрес сервера.
+        port (int): Порт сервера.
+        name (str | None): Имя контроллера; если задано, после подключения
+            отправляется приветствие hello;<name>.
+        received (List[Tuple[float, bytes]]): Полученные данные и время приёма (perf_counter).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 48569,
+                 name: Optional[str] = None) -> None:
+        self.host = host
+        self.port = port
+        self.name = name
+        self.received: List[Tuple[float, bytes]] = []
+
+        self._socket: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def connect(self, timeout: float = 5.0) -> 'FakeRobotClient':
+        """
+        Подключается к серверу, повторяя попытки, пока сервер не начнёт слушать порт.
+
+        Args:
+            timeout (float): Сколько секунд пытаться подключиться.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._socket = socket.create_connection((self.host, self.port), timeout=1.0)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        if self.name is not None:
+            self.send(f"hello;{self.name}\n")
+        self._running = True
+        self._thread = threading.Thread(target=self._receive, name="fake-robot", daemon=True)
+        self._thread.start()
+        return self
+
+    def _receive(self) -> None:
+        while self._running:
+            try:
+                data = self._socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+            with self._lock:
+                self.received.append((time.perf_counter(), data))
+            self.on_data(data)
+        self._running = False
+
+    def on_data(self, data: bytes) -> None:
+        """
+        Вызывается для каждой порции полученных данных. Переопределяется
+        в наследниках, чтобы имитировать ответы контроллера.
+        """
+
+    def send(self, message: str) -> None:
+        self._socket.sendall(message.encode())
+
+    def data(self) -> bytes:
+        """
+        Возвращает все полученные данные одной строкой байтов.
+        """
+        with self._lock:
+            return b''.join(chunk for _, chunk in self.received)
+
+    def wait_for(self, size: int, timeout: float = 5.0) -> bool:
+        """
+        Ждёт, пока не будет получено не меньше size байт.
+
+        Returns:
+            bool: True, если данные получены до истечения времени.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if len(self.data()) >= size:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self) -> None:
+        self._running = False
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
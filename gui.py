@@ -1,76 +1,118 @@
+import functools
 import sys
 from PyQt6.QtCore import QTimer, Qt, QObject, pyqtSignal, QThread
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtWidgets import QApplication, QLabel, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QSlider
-import cv2
-import json
 from image import Image
 from robot import Robot
+from pick_protocol import PickProtocol
+from pick_planner import PickPlanner
 from camera import Camera
+from capture import CaptureThread
+from pixel_format import PixelFormat
+from profiler import profiler
+from display_buffer import DisplayBuffer
+from parameter_store import ParameterStore
+from pipeline import Pipeline
+import time
+from calibration_store import calibration_store
 import threading
 import asyncio
 
 
+# Частота обновления изображения в окне, Гц
+DISPLAY_RATE = 30
+
+
 class FrameProcessor(QObject):
-    # Signals to emit processed frame and data
-    frame_processed = pyqtSignal(QImage, int)
-    robot_message_ready = pyqtSignal(str)
+    # Signal to emit robot targets; кадр для показа интерфейс забирает сам из display
+    targets_ready = pyqtSignal(list)
 
     def __init__(self, camera, parameters):
         super().__init__()
         self.camera = camera
         self.parameters = parameters
+        self.calibration = calibration_store
+        self.image = Image(calibration=self.calibration)
+        self.display = DisplayBuffer(delay=0.75 / DISPLAY_RATE)
         self.running = True
-        self.num_of_frame = 0
 
     def process_frames(self):
         while self.running:
             frame = self.camera.get_image()
-            frame = 255 - frame
-            image = Image(frame)
+            if frame is None:
+                continue
+            frame_start = time.perf_counter()
+            image = self.image
 
-            # Set parameters
-            image.brightness_factor = self.parameters['brigh']
-            image.threshold_3 = self.parameters['threshold_3']
-            image.threshold_2 = self.parameters['threshold_2']
-            image.dilate = self.parameters['dilate']
-            image.blur = self.parameters['blur']
+            # Set parameters: снимок берётся один раз на кадр
+            image.set_parameters(self.parameters.snapshot())
 
             # Image processing
             frame = image.transform_zone(frame)
             frame = image.image_correction(frame)
             frame, coordinates, orientation = image.detect_contours(frame)
-            frame = image.draw_contours(frame)
-            frame = cv2.resize(frame, None, fx=2, fy=2,
-                               interpolation=cv2.INTER_AREA)
-            height_frame, width_frame = frame.shape
-
-            # Convert frame to QImage
-            bytes_per_line = width_frame
-            q_image = QImage(frame.data, width_frame, height_frame,
-                             bytes_per_line, QImage.Format.Format_Grayscale8)
-
-            # Emit the processed frame
-            self.frame_processed.emit(q_image, len(coordinates))
-            self.num_of_frame += 1
-
-            # Robot communication
-            if coordinates and self.num_of_frame == 20:
-                self.num_of_frame = 0
-                message = ";".join(("move", str(coordinates[0][1]), str(
-                    coordinates[0][0]), str(orientation[0])))
-                self.robot_message_ready.emit(message)
+
+            # Кадр для показа готовится, только если интерфейс забрал предыдущий
+            display_start = time.perf_counter()
+            if self.display.publish(frame, image.draw_contours, len(coordinates)):
+                profiler.record('gui.publish', time.perf_counter() - display_start)
+            profiler.record('frame', time.perf_counter() - frame_start)
+
+            # Robot communication: следующая цель уходит, когда робот готов
+            targets = image.targets()
+            self.targets_ready.emit(targets)
+
+    def stop(self):
+        self.running = False
+
+
+class PipelineProcessor(QObject):
+    # Тот же интерфейс, что у FrameProcessor, но кадры обрабатывает Pipeline
+    # в отдельных процессах; поток Qt только забирает результаты по порядку
+    targets_ready = pyqtSignal(list)
+
+    def __init__(self, pipeline, parameters):
+        super().__init__()
+        self.pipeline = pipeline
+        self.parameters = parameters
+        self.display = DisplayBuffer(delay=0.75 / DISPLAY_RATE)
+        self.running = True
+
+    def process_frames(self):
+        self.pipeline.start()
+        version = None
+        while self.running:
+            parameters = self.parameters.snapshot()
+            if parameters.version != version:
+                self.pipeline.set_parameters(parameters)
+                version = parameters.version
+
+            result = self.pipeline.get(timeout=0.5)
+            if result is None:
+                continue
+            self.display.publish(result.frame, result.draw, len(result.rows))
+            self.targets_ready.emit(result.targets)
+            self.pipeline.release(result)
+        self.pipeline.stop()
 
     def stop(self):
         self.running = False
 
 
 class VideoPlayer(QMainWindow):
-    def __init__(self):
+    def __init__(self, pipeline=False):
         super().__init__()
-        self.camera = Camera()
+        # Обработка в отдельных процессах (Pipeline) вместо одного потока
+        self.pipeline = pipeline
+        # Конвейеру нужен прямой (не инвертированный) серый кадр
+        self.camera = Camera(pixel_format=PixelFormat(PixelFormat.GRAY))
 
-        self.robot = Robot('127.0.0.1', 48569)
+        # Все цели лотка уходят роботу одной командой batch в порядке,
+        # сокращающем путь робота
+        self.robot = Robot('127.0.0.1', 48569, policy=Robot.COALESCE,
+                           protocol=PickProtocol(batch=True, max_outstanding=1,
+                                                 planner=PickPlanner()))
 
         self.width_frame = None
         self.height_frame = None
@@ -88,6 +130,7 @@ class VideoPlayer(QMainWindow):
 
         # Start frame processor thread
         self.start_frame_processing()
+        self.start_profiler()
 
     def __init_main_window(self):
         self.central_widget = QWidget(self)
@@ -97,7 +140,9 @@ class VideoPlayer(QMainWindow):
         self.setStyleSheet("background-color: rgba(255, 255, 255, 150);")
 
     def __init_widgets(self):
+        # Масштабирование кадра под размер окна выполняет Qt при отрисовке
         self.video_label = QLabel()
+        self.video_label.setScaledContents(True)
 
         self.brigh_fac_slider = QSlider(Qt.Orientation.Horizontal)
         self.sat_fac_slider = QSlider(Qt.Orientation.Horizontal)
@@ -116,6 +161,7 @@ class VideoPlayer(QMainWindow):
         self.dilate_label = QLabel("Настройка заполнения")
 
         self.detect_detail_label = QLabel("Обнаружено деталей:")
+        self.timing_label = QLabel(profiler.format())
 
     def __init_layouts(self):
         self.main_layout = QHBoxLayout(self.central_widget)
@@ -143,6 +189,7 @@ class VideoPlayer(QMainWindow):
         self.calibration_layout.addWidget(self.dilate_slider)
 
         self.info_layout.addWidget(self.detect_detail_label)
+        self.info_layout.addWidget(self.timing_label)
 
     def __setting_layers(self):
         self.video_and_info_layout.addLayout(self.video_layout)
@@ -167,28 +214,16 @@ class VideoPlayer(QMainWindow):
             slider.setMaximum(255)
             slider.valueChanged.connect(self.on_slider_value_changed)
 
-        if self.start_flag:
-            with open('video_parametrs.json', 'r') as json_file:
-                try:
-                    data = json.load(json_file)
-                except json.JSONDecodeError:
-                    raise ValueError("Ошибка при чтении файла с данными.")
-
-        self.parameters = {
-            'brigh': data.get('brigh', []),
-            'sat': data.get('sat', []),
-            'threshold_3': data.get('threshold_3', []),
-            'threshold_2': data.get('threshold_2', []),
-            'blur': data.get('blur', []),
-            'dilate': data.get('dilate', [])
-        }
+        # Параметры обработки: снимки для потока обработки и отложенная запись файла
+        self.parameters = ParameterStore('video_parametrs.json')
+        parameters = self.parameters.snapshot()
 
-        self.brigh_fac_slider.setValue(int(self.parameters['brigh'] * 255 / 3))
-        self.sat_fac_slider.setValue(self.parameters['sat'])
-        self.threshold_3_slider.setValue(self.parameters['threshold_3'])
-        self.threshold_2_slider.setValue(self.parameters['threshold_2'])
-        self.blur_slider.setValue(self.parameters['blur'])
-        self.dilate_slider.setValue(self.parameters['dilate'])
+        self.brigh_fac_slider.setValue(int(parameters['brigh'] * 255 / 3))
+        self.sat_fac_slider.setValue(parameters['sat'])
+        self.threshold_3_slider.setValue(parameters['threshold_3'])
+        self.threshold_2_slider.setValue(parameters['threshold_2'])
+        self.blur_slider.setValue(parameters['blur'])
+        self.dilate_slider.setValue(parameters['dilate'])
         self.start_flag = False
 
     def __init_style(self):
@@ -196,10 +231,8 @@ class VideoPlayer(QMainWindow):
 
     def __init_sizes(self):
         frame = self.camera.get_image()
-        frame = 255 - frame
         image = Image(frame)
-        frame = image.transform_zone(frame)
-        frame = image.transform_chees(frame)
+        frame = image.transform(frame)
         frame = image.image_correction(frame)
         self.height_frame, self.width_frame = frame.shape
         self.video_label.setMinimumSize(
@@ -208,31 +241,79 @@ class VideoPlayer(QMainWindow):
     def start_frame_processing(self):
         # Create a thread and a worker object
         self.thread = QThread()
-        self.worker = FrameProcessor(self.camera, self.parameters)
+        if self.pipeline:
+            # Камеру открывает процесс захвата конвейера
+            self.camera.end()
+            self.capture = None
+            camera_factory = functools.partial(
+                Camera, pixel_format=PixelFormat(PixelFormat.GRAY))
+            self.worker = PipelineProcessor(
+                Pipeline(camera_factory, self.parameters.snapshot(), slots=2),
+                self.parameters)
+        else:
+            self.capture = CaptureThread(self.camera).start()
+            self.worker = FrameProcessor(self.capture, self.parameters)
         self.worker.moveToThread(self.thread)
 
         # Connect signals and slots
         self.thread.started.connect(self.worker.process_frames)
-        self.worker.frame_processed.connect(self.update_frame)
-        self.worker.robot_message_ready.connect(self.robot_communication)
+        self.worker.targets_ready.connect(self.robot_communication)
 
         # Start the thread
         self.thread.start()
 
-    def update_frame(self, q_image, num_details):
+        # Интерфейс забирает последний кадр с ограниченной частотой
+        self.display_timer = QTimer(self)
+        self.display_timer.timeout.connect(self.update_frame)
+        self.display_timer.start(int(1000 / DISPLAY_RATE))
+
+    def start_profiler(self):
+        # Локальный эндпоинт /metrics и обновление таблицы времени стадий
+        try:
+            profiler.serve()
+        except OSError as e:
+            print(f"Не удалось запустить эндпоинт метрик: {e}")
+        self.timing_timer = QTimer(self)
+        self.timing_timer.timeout.connect(self.update_timing)
+        self.timing_timer.start(1000)
+
+    def update_timing(self):
+        self.timing_label.setText(profiler.format())
+
+    def update_frame(self):
+        latest = self.worker.display.acquire()
+        if latest is None:
+            return
+        start = time.perf_counter()
+        frame, num_details = latest
+
+        # QImage ссылается на буфер кадра без копирования; буфер не меняется
+        # до следующего acquire, а QPixmap.fromImage копирует данные сам
+        height_frame, width_frame = frame.shape[:2]
+        image_format = (QImage.Format.Format_Grayscale8 if frame.ndim == 2
+                        else QImage.Format.Format_BGR888)
+        q_image = QImage(frame.data, width_frame, height_frame,
+                         frame.strides[0], image_format)
+
         # Update the video label
         self.video_label.setPixmap(QPixmap.fromImage(q_image))
         self.detect_detail_label.setText(f"Обнаружено деталей: {num_details}")
+        profiler.record('gui.qimage', time.perf_counter() - start)
 
-    def robot_communication(self, message):
-        print(message)
-        self.robot.send_message(message)
+    def robot_communication(self, targets):
+        self.robot.offer_targets(targets)
 
     def closeEvent(self, event):
         # Stop the worker and thread properly
+        self.display_timer.stop()
         self.worker.stop()
         self.thread.quit()
         self.thread.wait()
+        if self.capture is not None:
+            self.capture.end()
+        profiler.export('profiler_stats.json')
+        profiler.shutdown()
+        self.parameters.close()
         self.robot.close_socket()
         event.accept()
 
@@ -244,30 +325,32 @@ class VideoPlayer(QMainWindow):
         corresponding_label = self.slider_label_mapping.get(sender_slider)
 
         if sender_slider == self.brigh_fac_slider:
-            self.parameters['brigh'] = value / 255 * 3
+            changes = {'brigh': value / 255 * 3}
             description = "Яркость"
+        elif sender_slider == self.sat_fac_slider:
+            changes = {'sat': value}
+            description = "Насыщение"
         elif sender_slider == self.threshold_3_slider:
-            self.parameters['threshold_3'] = value
+            changes = {'threshold_3': value}
             description = "Настройка чувствительность обнаружения № 3"
         elif sender_slider == self.threshold_2_slider:
-            self.parameters['threshold_2'] = value + 1
+            changes = {'threshold_2': value + 1}
             description = "Настройка чувствительность обнаружения № 2"
         elif sender_slider == self.blur_slider:
-            self.parameters['blur'] = value
+            changes = {'blur': value}
             description = "Настройка размытия"
         elif sender_slider == self.dilate_slider:
-            self.parameters['dilate'] = value
+            changes = {'dilate': value}
             description = "Настройка заполнения"
+        else:
+            return
 
         if corresponding_label is not None:
             corresponding_label.setText(f"{description}: {value}")
 
-        # Save parameters to JSON
-        with open('video_parametrs.json', 'w') as json_file:
-            json.dump(self.parameters, json_file)
-
-        # Update worker parameters
-        self.worker.parameters = self.parameters
+        # Новый снимок подхватывается потоком обработки на границе кадра,
+        # файл записывается в фоне после паузы в изменениях
+        self.parameters.update(**changes)
 
 
 def run_server(player):
@@ -276,7 +359,7 @@ def run_server(player):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
-    player = VideoPlayer()
+    player = VideoPlayer(pipeline='--pipeline' in sys.argv)
 
     player.show()
 
@@ -1,20 +1,364 @@
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
 import cv2
 import numpy as np
-from part import Part
+from part import ORIENTATION_CODE, TYPES, Part, PartTable
+from part_catalogue import part_catalogue
+from parameter_store import ParameterSnapshot
+from tracker import PartTracker
+from change_detector import ChangeDetector
+from calibration_store import calibration_store
+from rectifier import Rectifier
+from profiler import profiler
+
+ORIENTATION_SCALE = 10
+ORIENTATION_ROW_STEP = 15
+ORIENTATION_MIN_CHORD = 50
+ORIENTATION_LEVEL = 240 / 255
+
+
+@lru_cache(maxsize=256)
+def _upscale_weights(size: int) -> np.ndarray:
+    """
+    Матрица билинейной интерполяции (size*ORIENTATION_SCALE x size), совпадающая
+    с cv2.resize(..., interpolation=cv2.INTER_LINEAR) при целом масштабе.
+    """
+    scale = ORIENTATION_SCALE
+    target = np.arange(size * scale)
+    position = (target + 0.5) / scale - 0.5
+    left = np.floor(position).astype(np.intp)
+    fraction = position - left
+
+    fraction[left < 0] = 0
+    left[left < 0] = 0
+    edge = left >= size - 1
+    fraction[edge] = 0
+    left[edge] = size - 1
+
+    weights = np.zeros((size * scale, size), dtype=np.float32)
+    weights[target, left] += 1 - fraction
+    weights[target, np.minimum(left + 1, size - 1)] += fraction
+    weights.flags.writeable = False
+    return weights
+
+
+def chord_orientation(contour: np.ndarray, frame_shape: Tuple[int, int]
+                      ) -> Tuple[str, Tuple[int, int, int, int], Optional[Tuple[int, int, int]]]:
+    """
+    Определяет ориентацию детали по самой широкой горизонтальной хорде контура.
+
+    Работает с маской контура в исходном разрешении. Строки, которые прежний
+    алгоритм просматривал в увеличенном в ORIENTATION_SCALE раз ROI (каждая
+    ORIENTATION_ROW_STEP-я строка), восстанавливаются билинейными весами,
+    поэтому решение "above"/"under" совпадает с попиксельным обходом.
+
+    Args:
+        contour (np.ndarray): Контур детали.
+        frame_shape (Tuple[int, int]): Высота и ширина кадра, в котором найден контур.
+
+    Returns:
+        Tuple: Ориентация ("above"/"under"), границы ROI (x0, y0, x1, y1) в кадре
+        и самая широкая хорда (строка, левый x, правый x) в координатах
+        увеличенного ROI или None.
+    """
+    frame_height, frame_width = frame_shape
+    x, y, w, h = cv2.boundingRect(contour)
+    if x <= 0:
+        x = 5
+    if y <= 0:
+        y = 5
+    # Границы ROI вычисляются так же, как срез frame[y-5:y+5+h, x-5:x+w+5]
+    y0, y1, _ = slice(y - 5, y + 5 + h).indices(frame_height)
+    x0, x1, _ = slice(x - 5, x + w + 5).indices(frame_width)
+    bounds = (x0, y0, x1, y1)
+    height, width = y1 - y0, x1 - x0
+    if height <= 0 or width <= 0:
+        return "under", bounds, None
+
+    mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.drawContours(mask, [contour], -1, 1, 1, offset=(-x0, -y0))
+
+    scaled_height = height * ORIENTATION_SCALE
+    rows = np.arange(0, scaled_height, ORIENTATION_ROW_STEP)
+    row_weights = _upscale_weights(height)[rows]
+    levels = (row_weights @ mask) @ _upscale_weights(width).T
+    row_index, columns = np.nonzero(levels > ORIENTATION_LEVEL)
+    if columns.size == 0:
+        return "under", bounds, None
+
+    # Повторяет конечный автомат прежнего обхода: точка, оставшаяся без пары
+    # в конце строки, сбрасывается первой точкой следующей строки.
+    splits = np.flatnonzero(np.diff(row_index)) + 1
+    starts = np.concatenate(([0], splits))
+    ends = np.concatenate((splits, [columns.size]))
+
+    best = None
+    best_dist = 0
+    pending = False
+    for start, end in zip(starts, ends):
+        xs = columns[start:end]
+        i = 0
+        if pending:
+            i = 1
+            pending = False
+        while i < xs.size:
+            j = i + int(np.searchsorted(xs[i:], xs[i] + ORIENTATION_MIN_CHORD))
+            if j >= xs.size:
+                pending = True
+                break
+            dist = int(xs[j] - xs[i])
+            if dist > best_dist:
+                best_dist = dist
+                best = (int(rows[row_index[start]]), int(xs[i]), int(xs[j]))
+            i = j + 1
+
+    if best is None or best[0] < int(scaled_height / 2):
+        return "under", bounds, best
+    return "above", bounds, best
+
+
+def draw_parts(frame: np.ndarray, contours, rows: np.ndarray) -> np.ndarray:
+    """
+    Рисует контуры и центры деталей (цвет центра — по ориентации).
+
+    Args:
+        frame (np.ndarray): Кадр, на котором рисовать (меняется на месте).
+        contours (Sequence[np.ndarray]): Контуры кадра.
+        rows (np.ndarray): Строки таблицы деталей (PART_DTYPE).
+
+    Returns:
+        np.ndarray: Тот же кадр.
+    """
+    cv2.drawContours(frame, contours, -1, (0, 255, 0), 1)
+    above = ORIENTATION_CODE["above"]
+    for cX, cY, orientation in zip(rows['cX'].tolist(), rows['cY'].tolist(),
+                                   rows['orientation'].tolist()):
+        color = (0, 0, 255) if orientation == above else (255, 0, 0)
+        cv2.circle(frame, (cX, cY), 2, color, -1)
+    return frame
+
+
+class Detection:
+    """
+    Результат обнаружения деталей на одном кадре.
+
+    Детали хранятся в таблице PartTable; parts — представления её строк
+    для кода, работающего с объектами Part. Таблиц две, они меняются
+    местами на каждом кадре, поэтому строки прошлого кадра (previous)
+    доступны, пока строится новый.
+
+    Attributes:
+        mask (np.ndarray): Бинарная маска, по которой искались контуры.
+        contours (list): Все внешние контуры маски.
+        table (PartTable): Детали, прошедшие фильтр по площади и положению.
+        previous (PartTable): Таблица прошлого кадра.
+        parts (list[Part]): Представления строк table.
+        part_contours (list[np.ndarray]): Контуры деталей в том же порядке, что и parts.
+    """
+
+    def __init__(self, mask=None, contours=()):
+        self.mask = mask
+        self.contours = contours
+        self.table = PartTable()
+        self.previous = PartTable()
+        self.parts = []
+        self.part_contours = []
+
+    def reset(self, mask, contours):
+        """Подготавливает объект к новому кадру без создания новых списков."""
+        self.mask = mask
+        self.contours = contours
+        self.table, self.previous = self.previous, self.table
+        self.table.clear()
+        self.parts.clear()
+        self.part_contours.clear()
+
+    def add(self, contour, cX, cY, area, angle, number_type, track_id=None, contour_index=-1):
+        index = self.table.append(cX, cY, area, angle, number_type, track_id, contour_index)
+        self.parts.append(Part.view(self.table, index))
+        self.part_contours.append(contour)
+
+    def add_row(self, row, contour, contour_index=-1):
+        """Добавляет строку таблицы прошлого кадра (деталь вне изменившегося участка)."""
+        index = self.table.append_row(row)
+        self.table.rows[index]['contour'] = contour_index
+        self.parts.append(Part.view(self.table, index))
+        self.part_contours.append(contour)
+
+    @property
+    def centers(self):
+        rows = self.table.rows
+        return list(zip(rows['cX'].tolist(), rows['cY'].tolist()))
+
+    @property
+    def coordinates(self):
+        return self.table.centers().tolist()
+
+    @property
+    def areas(self):
+        return self.table.rows['area'].tolist()
+
+    @property
+    def orientations(self):
+        return self.table.angles()
+
+    @property
+    def types(self):
+        return self.table.types()
+
+    def targets(self):
+        """Цели для робота (cX, cY, orientation, number_type)."""
+        return self.table.targets()
 
 
 class Image:
+    """
+    Конвейер обработки кадров рабочей зоны.
+
+    Объект создаётся один раз и используется для всех кадров: рабочие буферы
+    (преобразование, коррекция, маска) выделяются под размер зоны и
+    переиспользуются, ядро морфологии пересоздаётся только при изменении dilate,
+    а списки результатов очищаются в начале каждого кадра.
+    Результаты кадра (маска, detection, возвращаемые изображения) действительны
+    до следующего вызова.
+    """
+
+    # Запас вокруг изменившегося участка при поиске контуров: больше любой детали
+    PART_MARGIN = 32
+    # Отбор контуров: MIN_AREA < площадь < MAX_AREA, центр ниже MIN_Y
+    MIN_AREA = 50
+    MAX_AREA = 400
+    MIN_Y = 25
+    # Меньше деталей на кадре — ориентация без пула потоков (накладные расходы больше выигрыша)
+    PARALLEL_MIN_PARTS = 16
+
+    PARAMETERS = {
+        'brigh': 'brightness_factor',
+        'threshold_3': 'threshold_3',
+        'threshold_2': 'threshold_2',
+        'blur': 'blur',
+        'dilate': 'dilate',
+    }
+
+    def __init__(self, frame=None, calibration=calibration_store):
+        self.calibration = calibration
+        self.profiler = profiler
+        self.rectifier = Rectifier(calibration)
 
-    def __init__(self, frame):
         self.brightness_factor = 2.0
         self.threshold_3 = 17
         self.threshold_2 = 65
         self.blur = 1
         self.dilate = 9
 
+        self.debug = False
+
         self.coordinates = []
         self.counters = []
+        self.centers = []
+        self.angels = []
+        self.parts = []
+        self.contours_3 = ()
+        self.detection = Detection()
+        # Сопровождение деталей между кадрами; None — каждый кадр с нуля
+        self.tracker = PartTracker()
+        # Каталог типов деталей (перечитывается при изменении файла) и поиск
+        # контуров через connectedComponentsWithStats
+        self.catalogue = part_catalogue
+        self._catalogue_version = None
+        self.components = False
+        # Потоков для ориентации деталей и полос маски (1 — без пула) и
+        # количество горизонтальных полос, на которые делится кадр (1 — без деления)
+        self.workers = 1
+        self.strips = 1
+        self._pool = None
+        self._pool_workers = None
+        # Пересчёт только изменившихся участков кадра; None — весь кадр
+        self.change_detector = ChangeDetector()
+        self._entries = []
+        self._entry_rows = None
+        self._boxes = None
+
+        self._buffers = {}
+        self.allocations = {}
+        self._kernel = None
+        self._kernel_size = None
+        self._parameters_version = None
+        # Последние применённые значения параметров: image_correction делает
+        # blur и threshold_2 нечётными, поэтому атрибуты с ними не сравниваются
+        self._applied = {}
+
+        _, (width, height) = self.calibration.transformation()
+        for name in ('zone', 'correction', 'correction_blur', 'mask', 'mask_tmp'):
+            self._buffer(name, (height, width))
+
+    def set_parameters(self, parameters):
+        """
+        Применяет параметры обработки из словаря настроек (video_parametrs.json).
+
+        Снимок ParameterSnapshot применяется по версиям: если версия не
+        изменилась, вызов ничего не делает, иначе применяются только
+        изменившиеся ключи. Обычный словарь сравнивается по значениям
+        с последним применённым.
+
+        Args:
+            parameters (dict | ParameterSnapshot): Словарь с ключами brigh,
+                threshold_3, threshold_2, blur, dilate.
+        """
+        if isinstance(parameters, ParameterSnapshot):
+            if parameters.version == self._parameters_version:
+                return
+            keys = parameters.changed_since(self._parameters_version)
+            self._parameters_version = parameters.version
+        else:
+            keys = parameters.keys()
+            self._parameters_version = None
+
+        changed = False
+        for key in keys:
+            attribute = self.PARAMETERS.get(key)
+            if attribute is None:
+                continue
+            value = parameters[key]
+            if key not in self._applied or self._applied[key] != value:
+                self._applied[key] = value
+                setattr(self, attribute, value)
+                changed = True
+        # Маска при других параметрах другая: сохранённые результаты недействительны
+        if changed and self.tracker is not None:
+            self.tracker.reset()
+        if changed and self.change_detector is not None:
+            self.change_detector.reset()
+
+    def _buffer(self, name, shape, dtype=np.uint8):
+        """
+        Возвращает рабочий буфер, выделяя его заново только при смене размера или типа.
+        Число выделений по каждому буферу хранится в self.allocations.
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype)
+            self._buffers[name] = buffer
+            self.allocations[name] = self.allocations.get(name, 0) + 1
+        return buffer
+
+    def _morphology_kernel(self):
+        if self._kernel_size != self.dilate:
+            self._kernel = np.ones((self.dilate, self.dilate), np.uint8)
+            self._kernel_size = self.dilate
+        return self._kernel
+
+    def reset(self):
+        """Очищает результаты предыдущего кадра."""
+        self.coordinates.clear()
+        self.counters.clear()
+        self.centers.clear()
+        self.angels.clear()
+        self.parts.clear()
+        self.contours_3 = ()
 
     def transform_zone(self, frame: np.ndarray) -> np.ndarray:
         """
@@ -26,17 +370,11 @@ class Image:
         Returns:
             np.ndarray: Преобразованное изображение.
         """
-        with open('transformation_data.json', 'r') as json_file:
-            try:
-                data = json.load(json_file)
-            except json.JSONDecodeError:
-                raise ValueError(
-                    "Ошибка при чтении файла с данными трансформации.")
+        M, (maxWidth, maxHeight) = self.calibration.transformation()
+        zone = self._buffer('zone', (maxHeight, maxWidth) + frame.shape[2:])
 
-        M = np.array(data.get('M', []))
-        maxWidth, maxHeight = data.get('maxWidth', 0), data.get('maxHeight', 0)
-
-        return cv2.warpPerspective(frame, M, (maxWidth, maxHeight))
+        with self.profiler.stage('transform_zone'):
+            return cv2.warpPerspective(frame, M, (maxWidth, maxHeight), dst=zone)
 
     def transform_chees(self, frame: np.ndarray) -> np.ndarray:
         """
@@ -48,21 +386,28 @@ class Image:
         Returns:
             np.ndarray: Исправленное изображение.
         """
-        with open('calibration_result.json', 'r') as json_file:
-            try:
-                data = json.load(json_file)
-            except json.JSONDecodeError:
-                raise ValueError(
-                    "Ошибка при чтении файла с результатами калибровки.")
-
-        camera_matrix = np.array(data.get('camera_matrix', []))
-        dist_coefficients = np.array(data.get('dist_coefficients', []))
+        camera_matrix, dist_coefficients = self.calibration.camera()
 
         return cv2.undistort(frame, camera_matrix, dist_coefficients)
 
+    def transform(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Выполняет transform_zone и transform_chees за один проход cv2.remap.
+
+        Args:
+            frame (np.ndarray): Входное изображение в формате NumPy.
+
+        Returns:
+            np.ndarray: Преобразованное и исправленное изображение.
+        """
+        with self.profiler.stage('transform'):
+            return self.rectifier.rectify(frame)
+
     def image_correction(self, frame):
+        start = time.perf_counter()
         frame = cv2.convertScaleAbs(
-            frame, alpha=self.brightness_factor, beta=0)
+            frame, alpha=self.brightness_factor, beta=0,
+            dst=self._buffer('correction', frame.shape))
 
         if self.blur % 2 == 0:
             self.blur = self.blur + 1
@@ -71,94 +416,542 @@ class Image:
         if self.threshold_3 == 1:
             self.threshold_3 = self.threshold_3 + 2
 
-        frame = cv2.medianBlur(frame, 3)
+        frame = cv2.medianBlur(
+            frame, 3, dst=self._buffer('correction_blur', frame.shape))
 
+        self.profiler.record('image_correction', time.perf_counter() - start)
         return frame
 
-    def detect_contours(self, frame):
-        # if frame is None or len(frame.shape) != 3:
-        #     print("Ошибка: некорректное изображение!")
-        #     print(len(frame.shape))
-        #     return frame, [], []
+    def threshold(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Строит бинарную маску деталей.
 
-        self.centers = []
-        self.angels = []
-        # GRAY_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        Args:
+            frame (np.ndarray): Скорректированное изображение рабочей зоны (оттенки серого).
 
-        H, W = frame.shape
-        width, height = int(W), int(H)
-        WHITE_frame = np.ones((height, width, 3), np.uint8) * 0
-        olny_white = WHITE_frame.copy()
+        Returns:
+            np.ndarray: Маска после порогового преобразования и морфологии.
+        """
+        mask = self._buffer('mask', frame.shape)
+        bounds = self._strip_bounds(frame.shape[0])
+        if len(bounds) > 1:
+            return self._threshold_strips(frame, mask, bounds)
+        return self._threshold(frame, mask, self._buffer('mask_tmp', frame.shape))
+
+    def _strip_bounds(self, height):
+        """
+        Строки [y0, y1) полос, на которые делится кадр (strips > 1).
+        Полоса не уже двух запасов context_margin, иначе разбиение не окупается.
+        """
+        margin = max(self.context_margin(), 1)
+        count = min(self.strips, max(height // (2 * margin), 1))
+        if count <= 1:
+            return [(0, height)]
+        edges = [height * index // count for index in range(count + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def _threshold_strips(self, frame, mask, bounds):
+        """
+        Маска по горизонтальным полосам кадра (в пуле потоков при workers > 1).
 
-        thead_2 = cv2.adaptiveThreshold(
-            frame, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, self.threshold_2, self.threshold_3)
+        Каждая полоса обрабатывается с запасом context_margin строк сверху
+        и снизу, поэтому её центральная часть не зависит от границы полосы
+        и совпадает с маской всего кадра бит в бит.
+        """
+        start = time.perf_counter()
+        height = frame.shape[0]
+        margin = self.context_margin()
+        self._morphology_kernel()
+
+        def threshold_strip(index):
+            y0, y1 = bounds[index]
+            cy0, cy1 = max(y0 - margin, 0), min(y1 + margin, height)
+            roi = np.ascontiguousarray(frame[cy0:cy1])
+            strip = self._threshold(roi, self._buffer(f'strip_{index}', roi.shape),
+                                    self._buffer(f'strip_tmp_{index}', roi.shape),
+                                    profile=False)
+            mask[y0:y1] = strip[y0 - cy0:y1 - cy0]
+
+        self._map(threshold_strip, range(len(bounds)))
+        self.profiler.record('detect.threshold_strips', time.perf_counter() - start)
+        return mask
+
+    def _threshold(self, frame, mask, tmp, profile=True):
+        # Два буфера используются поочерёдно: ни одна операция не работает на месте
+        record = self.profiler.record if profile else (lambda name, seconds: None)
+
+        start = time.perf_counter()
+        cv2.adaptiveThreshold(
+            frame, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, self.threshold_2, self.threshold_3, dst=tmp)
+        end = time.perf_counter()
+        record('detect.adaptive_threshold', end - start)
+
+        cv2.medianBlur(tmp, self.blur, dst=mask)
+        start, end = end, time.perf_counter()
+        record('detect.median_blur', end - start)
+
+        cv2.equalizeHist(mask, dst=tmp)
+        start, end = end, time.perf_counter()
+        record('detect.equalize_hist', end - start)
+
+        kernel = self._morphology_kernel()
+        cv2.dilate(tmp, kernel, dst=mask, iterations=1)
+
+        cv2.erode(mask, kernel, dst=tmp, iterations=1)
+        cv2.morphologyEx(tmp, cv2.MORPH_CLOSE, kernel, dst=mask)
+        record('detect.morphology', time.perf_counter() - end)
+        return mask
+
+    def context_margin(self) -> int:
+        """
+        На сколько пикселей изменение кадра влияет на маску: сумма радиусов
+        адаптивного порога, медианного фильтра и четырёх проходов морфологии.
+        (equalizeHist бинарную маску не меняет.)
+        """
+        return self.threshold_2 // 2 + self.blur // 2 + 4 * (self.dilate // 2)
+
+    def _update_region(self, frame, region):
+        """
+        Пересчитывает маску внутри region и ищет контуры только рядом с ним.
 
-        thead_2 = cv2.medianBlur(thead_2, self.blur)
-        thead_2 = cv2.equalizeHist(thead_2)
+        Returns:
+            list | None: Новые контуры, пересекающие region, или None, если
+                деталь выходит за участок поиска и нужен поиск по всей маске.
+        """
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = region
+        margin = self.context_margin()
+        cx0, cy0 = max(x0 - margin, 0), max(y0 - margin, 0)
+        cx1, cy1 = min(x1 + margin, width), min(y1 + margin, height)
+        roi = np.ascontiguousarray(frame[cy0:cy1, cx0:cx1])
+        roi_mask = self._threshold(roi, np.empty_like(roi), np.empty_like(roi))
+        mask = self._buffer('mask', frame.shape)
+        mask[y0:y1, x0:x1] = roi_mask[y0 - cy0:y1 - cy0, x0 - cx0:x1 - cx0]
+
+        contours_start = time.perf_counter()
+        rx0, ry0 = max(x0 - self.PART_MARGIN, 0), max(y0 - self.PART_MARGIN, 0)
+        rx1, ry1 = min(x1 + self.PART_MARGIN, width), min(y1 + self.PART_MARGIN, height)
+        found, _ = cv2.findContours(
+            np.ascontiguousarray(mask[ry0:ry1, rx0:rx1]), cv2.RETR_EXTERNAL,
+            cv2.CHAIN_APPROX_SIMPLE, offset=(rx0, ry0))
+        contours = []
+        for contour in found:
+            bx, by, bw, bh = cv2.boundingRect(contour)
+            if bx > x1 or by > y1 or bx + bw < x0 or by + bh < y0:
+                continue
+            # Пятно обрезано границей участка поиска (а не кадра)
+            if ((bx == rx0 and rx0 > 0) or (by == ry0 and ry0 > 0)
+                    or (bx + bw == rx1 and rx1 < width) or (by + bh == ry1 and ry1 < height)):
+                contours = None
+                break
+            contours.append(contour)
+        self.profiler.record('detect.find_contours', time.perf_counter() - contours_start)
+        return contours
+
+    def _find_contours(self, mask):
+        """
+        Внешние контуры маски.
+
+        При components=True пятна сначала размечаются
+        connectedComponentsWithStats, по их рамкам отбрасываются заведомо
+        не подходящие (площадь контура не больше (w - 1) * (h - 1), центр
+        не ниже нижнего края рамки), и контуры извлекаются только для
+        оставшихся пятен. Пятна в дырках других пятен отбрасываются, как
+        у RETR_EXTERNAL: если рамка пятна лежит внутри рамки другого пятна,
+        проверяется, попадает ли фон слева от его верхней точки в дырку
+        этого пятна. Контуры деталей те же, что и у findContours по всей маске,
+        но Detection.contours содержит только прошедшие отбор пятна.
+        """
+        if not self.components:
+            bounds = self._strip_bounds(mask.shape[0])
+            if len(bounds) > 1:
+                return self._find_contours_strips(mask, bounds)
+            contours, hierarchy = cv2.findContours(
+                mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            return contours
+
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        x, y, w, h = stats[1:, :4].T
+        candidates = np.flatnonzero(((w - 1) * (h - 1) > self.MIN_AREA)
+                                    & (y + h - 1 > self.MIN_Y))
+        cx, cy = x[candidates, None], y[candidates, None]
+        enclosing = ((cx > x) & (cy > y) & (cx + w[candidates, None] < x + w)
+                     & (cy + h[candidates, None] < y + h))
+        holes = {}
+        contours = []
+        for label, row in zip((candidates + 1).tolist(), enclosing):
+            left, top, width, height = stats[label, :4].tolist()
+            blob = (labels[top:top + height, left:left + width] == label).astype(np.uint8)
+            if row.any() and self._in_hole(labels, stats, holes, np.flatnonzero(row) + 1,
+                                           left + int(np.argmax(blob[0])) - 1, top):
+                continue
+            found, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                        offset=(left, top))
+            contours.extend(found)
+        return contours
+
+    @staticmethod
+    def _in_hole(labels, stats, holes, others, px, py):
+        """
+        Лежит ли фоновая точка (px, py) в дырке одного из пятен others.
+        Дырки пятна (фон внутри его рамки, 4-связно не соединённый с краем
+        рамки) вычисляются один раз на кадр и хранятся в holes.
+        """
+        for other in others.tolist():
+            left, top, width, height = stats[other, :4].tolist()
+            if other not in holes:
+                fill = np.zeros((height + 2, width + 2), np.uint8)
+                fill[1:-1, 1:-1] = (labels[top:top + height, left:left + width] == other) * 255
+                cv2.floodFill(fill, None, (0, 0), 1)
+                holes[other] = fill[1:-1, 1:-1] == 0
+            if holes[other][py - top, px - left]:
+                return True
+        return False
+
+    def _find_contours_strips(self, mask, bounds):
+        """
+        Внешние контуры маски по полосам bounds.
+
+        Контуры ищутся в каждой полосе отдельно. Пятна, касающиеся строк
+        у границ полос, ищутся заново в окнах вокруг границ, которые
+        расширяются, пока ни один контур окна не касается его края. Контуры
+        полос, пересекающие окна, отбрасываются, поэтому каждое пятно
+        попадает в результат один раз. Контуры упорядочиваются так же, как
+        у findContours по всей маске (по начальной точке, снизу вверх).
+        """
+        def strip_contours(index):
+            y0, y1 = bounds[index]
+            found, _ = cv2.findContours(mask[y0:y1], cv2.RETR_EXTERNAL,
+                                        cv2.CHAIN_APPROX_SIMPLE, offset=(0, y0))
+            return found
+
+        per_strip = self._map(strip_contours, range(len(bounds)))
+
+        windows = []
+        for border, _ in bounds[1:]:
+            wy0, wy1 = border - 1, border + 1
+            while windows and windows[-1][1] >= wy0:
+                previous = windows.pop()
+                wy0, wy1 = min(wy0, previous[0]), max(wy1, previous[1])
+            windows.append(self._window_contours(mask, wy0, wy1))
+            # Окно могло вырасти до предыдущего: тогда они объединяются
+            while len(windows) > 1 and windows[-2][1] >= windows[-1][0]:
+                last, previous = windows.pop(), windows.pop()
+                windows.append(self._window_contours(
+                    mask, min(last[0], previous[0]), max(last[1], previous[1])))
+
+        # Строка кадра -> строка внутри какого-либо окна
+        in_window = np.zeros(mask.shape[0] + 1, np.int32)
+        for wy0, wy1, _ in windows:
+            in_window[wy0:wy1] = 1
+        in_window = np.concatenate(([0], np.cumsum(in_window)))
+        contours = []
+        for found in per_strip:
+            for contour in found:
+                _, top, _, rows = cv2.boundingRect(contour)
+                if in_window[top + rows] == in_window[top]:
+                    contours.append(contour)
+        for _, _, found in windows:
+            contours.extend(found)
+        contours.sort(key=lambda contour: (int(contour[0, 0, 1]), int(contour[0, 0, 0])),
+                      reverse=True)
+        return contours
+
+    @staticmethod
+    def _window_contours(mask, wy0, wy1):
+        """
+        Контуры в строках [wy0, wy1) маски; окно расширяется, пока какой-либо
+        контур касается его края (кроме краёв кадра).
 
-        kernel = np.ones((self.dilate, self.dilate), np.uint8)
-        thead_2 = cv2.dilate(thead_2, kernel, iterations=1)
+        Returns:
+            tuple: (wy0, wy1, контуры).
+        """
+        height = mask.shape[0]
+        while True:
+            found, _ = cv2.findContours(mask[wy0:wy1], cv2.RETR_EXTERNAL,
+                                        cv2.CHAIN_APPROX_SIMPLE, offset=(0, wy0))
+            boxes = [cv2.boundingRect(contour) for contour in found]
+            top = min((y for _, y, _, _ in boxes), default=wy1)
+            bottom = max((y + h for _, y, _, h in boxes), default=wy0)
+            step = max(wy1 - wy0, 8)
+            grow_up = wy0 > 0 and top == wy0
+            grow_down = wy1 < height and bottom == wy1
+            if not grow_up and not grow_down:
+                return wy0, wy1, found
+            if grow_up:
+                wy0 = max(wy0 - step, 0)
+            if grow_down:
+                wy1 = min(wy1 + step, height)
+
+    def _classify(self, contours, first, valid, areas, moments):
+        """
+        Типы прошедших отбор контуров; признаки считаются только те,
+        которые нужны каталогу.
+        """
+        classifier = self.catalogue.get()
+        selected = [contours[first + index] for index in valid.tolist()]
+        aspects = perimeters = hu = None
+        if classifier.needs_aspect:
+            sides = np.array([cv2.minAreaRect(contour)[1] for contour in selected],
+                             np.float64).reshape(-1, 2)
+            aspects = sides.max(axis=1) / np.maximum(sides.min(axis=1), 1e-6)
+        if classifier.needs_perimeter:
+            perimeters = np.array([cv2.arcLength(contour, True) for contour in selected])
+        if classifier.needs_hu:
+            hu = np.array([cv2.HuMoments(moments[index]).ravel()
+                           for index in valid.tolist()]).reshape(-1, 7)
+        return classifier.classify(areas[valid], aspects, perimeters, hu)
+
+    def _add_parts(self, detection, contours, first, shape, tracker, claimed):
+        """
+        Измеряет контуры contours[first:] и отбирает их векторно. Тип и
+        ориентация определяются только для прошедших отбор деталей, которые
+        не совпали с неподвижным треком.
 
-        thead_2 = cv2.erode(thead_2, kernel, iterations=1)
-        thead_2 = cv2.morphologyEx(thead_2, cv2.MORPH_CLOSE, kernel)
+        Returns:
+            Tuple[np.ndarray, float]: Индексы контуров, ставших деталями,
+                и время определения ориентации.
+        """
+        moments = [cv2.moments(contour) for contour in contours[first:]]
+        if not moments:
+            return np.empty(0, np.intp), 0.0
+        m00 = np.array([M["m00"] for M in moments])
+        m10 = np.array([M["m10"] for M in moments])
+        m01 = np.array([M["m01"] for M in moments])
+        areas = np.array([cv2.contourArea(contour) for contour in contours[first:]])
+        nonzero = m00 != 0
+        divisor = np.where(nonzero, m00, 1.0)
+        cXs = np.where(nonzero, m10 / divisor, 0.0).astype(np.int64)
+        cYs = np.where(nonzero, m01 / divisor, 0.0).astype(np.int64)
+
+        valid = np.flatnonzero((areas > self.MIN_AREA) & (areas < self.MAX_AREA) & (cYs > self.MIN_Y))
+
+        # Сопоставление с треками последовательно (состояние трекера), затем
+        # тип и ориентация деталей, для которых их нужно вычислить (ориентация —
+        # возможно, в пуле потоков), и запись в том же порядке, что и без пула
+        tracks = []
+        pending = []
+        for position, index in enumerate(valid.tolist()):
+            track, still = None, False
+            if tracker is not None:
+                track, still = tracker.match(int(cXs[index]), int(cYs[index]), float(areas[index]),
+                                             claimed, contours[first + index])
+            tracks.append((track, still))
+            if not still:
+                pending.append(position)
+
+        types = self._classify(contours, first, valid[pending], areas, moments)
+        types = dict(zip(pending, types.tolist()))
+
+        orientation_start = time.perf_counter()
+        angles = self._orientations([contours[first + valid[position]] for position in pending], shape)
+        orientation = time.perf_counter() - orientation_start
+        angles = dict(zip(pending, angles))
+
+        for position, index in enumerate(valid.tolist()):
+            track, still = tracks[position]
+            if still:
+                angle, number_type = track.angle, track.number_type
+            else:
+                angle, number_type = angles[position], TYPES[types[position]]
+                if track is not None:
+                    tracker.store(track, angle, number_type)
+            detection.add(contours[first + index], int(cXs[index]), int(cYs[index]),
+                          float(areas[index]), angle, number_type,
+                          track.id if track is not None else None, first + index)
+        return valid + first, orientation
+
+    def _orientations(self, contours, shape):
+        """
+        Ориентации контуров в исходном порядке. При workers > 1 контуры
+        делятся на workers частей и обрабатываются в пуле потоков
+        (cv2 и матричные операции NumPy отпускают GIL).
+        """
+        workers = self.workers
+        if workers <= 1 or len(contours) < self.PARALLEL_MIN_PARTS:
+            return [chord_orientation(contour, shape)[0] for contour in contours]
+
+        step = -(-len(contours) // workers)
+        chunks = [contours[start:start + step] for start in range(0, len(contours), step)]
+        angles = []
+        for chunk in self._map(
+                lambda chunk: [chord_orientation(contour, shape)[0] for contour in chunk], chunks):
+            angles.extend(chunk)
+        return angles
+
+    def _map(self, function, items):
+        """
+        Применяет function к элементам items; при workers > 1 — в пуле потоков.
+        Результаты возвращаются в порядке items.
+        """
+        items = list(items)
+        workers = self.workers
+        if workers <= 1 or len(items) < 2:
+            return [function(item) for item in items]
+
+        if self._pool is None or self._pool_workers != workers:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = ThreadPoolExecutor(workers, thread_name_prefix='image')
+            self._pool_workers = workers
+        return list(self._pool.map(function, items))
+
+    def detect(self, frame: np.ndarray) -> Detection:
+        """
+        Находит детали на кадре без отрисовки и вывода окон.
 
-        self.contours_3, hierarchy = cv2.findContours(
-            thead_2, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        cv2.drawContours(WHITE_frame, self.contours_3, -1, (255, 255, 255), 1)
+        Если задан change_detector, маска и контуры пересчитываются только
+        на изменившихся участках кадра, а детали вне их берутся с прошлого
+        кадра; неизменившийся кадр возвращает прежний результат.
 
-        self.parts = []
-        if self.contours_3 != ():
-            for contour in self.contours_3:
-                M = cv2.moments(contour)
+        Args:
+            frame (np.ndarray): Скорректированное изображение рабочей зоны (оттенки серого).
 
-                if M["m00"] != 0:
-                    cX = int(M["m10"] / M["m00"])
-                    cY = int(M["m01"] / M["m00"])
-                else:
-                    cX, cY = 0, 0
+        Returns:
+            Detection: Найденные детали, их контуры и маска (действительны до следующего кадра).
+        """
+        record = self.profiler.record
+        start = time.perf_counter()
+        detection = self.detection
+
+        # Новый каталог меняет типы: сохранённые результаты недействительны
+        self.catalogue.get()
+        if self.catalogue.version != self._catalogue_version:
+            self._catalogue_version = self.catalogue.version
+            if self.tracker is not None:
+                self.tracker.reset()
+            if self.change_detector is not None:
+                self.change_detector.reset()
+
+        regions = None
+        if self.change_detector is not None:
+            # Участки дальше PART_MARGIN друг от друга: контур попадает
+            # не больше чем в один участок
+            regions = self.change_detector.update(frame, self.context_margin(), self.PART_MARGIN)
+            record('detect.changes', time.perf_counter() - start)
+            if regions is not None and self._boxes is None:
+                regions = None
+        if regions == []:
+            record('detect_contours', time.perf_counter() - start)
+            return detection
+
+        kept, new = np.empty(0, np.intp), None
+        if regions is not None:
+            # Маска обновляется во всех участках, даже если в одном из них
+            # нужен поиск контуров по всей маске
+            found = [self._update_region(frame, region) for region in regions]
+            mask = self._buffer('mask', frame.shape)
+            if all(contours is not None for contours in found):
+                new = [contour for contours in found for contour in contours]
+                boxes = self._boxes
+                outside = np.ones(len(boxes), bool)
+                for x0, y0, x1, y1 in regions:
+                    outside &= ((boxes[:, 0] > x1) | (boxes[:, 1] > y1)
+                                | (boxes[:, 2] < x0) | (boxes[:, 3] < y0))
+                kept = np.flatnonzero(outside)
+        else:
+            mask = self.threshold(frame)
+        if new is None:
+            contours_start = time.perf_counter()
+            new = self._find_contours(mask)
+            record('detect.find_contours', time.perf_counter() - contours_start)
+            kept = np.empty(0, np.intp)
+
+        orientation = 0.0
+        parts_start = time.perf_counter()
+        contours = [self._entries[index] for index in kept] + list(new)
+        detection.reset(mask, contours)
+        tracker = self.tracker
+        claimed = set()
+        # Строка таблицы деталей для каждого контура, -1 — контур не деталь
+        entry_rows = np.full(len(contours), -1, np.int32)
+
+        if len(kept):
+            previous_rows = self._entry_rows[kept]
+            for contour_index, row_index in enumerate(previous_rows.tolist()):
+                if row_index < 0:
+                    continue
+                row = detection.previous.rows[row_index]
+                entry_rows[contour_index] = len(detection.table)
+                detection.add_row(row, contours[contour_index], contour_index)
+                if row['track_id'] >= 0:
+                    claimed.add(int(row['track_id']))
+
+        first_row = len(detection.table)
+        added, orientation = self._add_parts(
+            detection, contours, len(kept), mask.shape, tracker, claimed)
+        entry_rows[added] = np.arange(first_row, first_row + len(added))
+
+        if tracker is not None:
+            tracker.finish(claimed)
+        if self.change_detector is not None:
+            self._entries = contours
+            self._entry_rows = entry_rows
+            self._boxes = np.array([cv2.boundingRect(contour) for contour in contours],
+                                   np.int32).reshape(-1, 4)
+            self._boxes[:, 2:] += self._boxes[:, :2]
+        end = time.perf_counter()
+        record('orientation_detection', orientation)
+        record('detect.parts', end - parts_start)
+        record('detect_contours', end - start)
+        return detection
+
+    def targets(self):
+        """
+        Цели для робота (cX, cY, orientation, number_type) с последнего кадра:
+        детали, которые захват может взять в их ориентации (правила каталога).
+        """
+        table = self.detection.table
+        rows = table.rows
+        pickable = self.catalogue.get().pickable(rows['type'], rows['orientation'])
+        return table.select(pickable).targets()
 
-                area = cv2.contourArea(contour)
-                if 50 < area < 400 and cY > 25:
+    def detect_contours(self, frame):
+        self.reset()
+        detection = self.detect(frame)
 
-                    self.centers.append((cX, cY))
-                    self.counters.append(contour)
+        self.contours_3 = detection.contours
+        self.counters.extend(detection.part_contours)
+        self.parts.extend(detection.parts)
+        self.centers.extend(detection.centers)
+        self.angels.extend(detection.orientations)
+        self.coordinates.extend(detection.coordinates)
 
-                    cv2.drawContours(olny_white, [contour], -1, (0, 255, 0), 1)
+        if self.debug:
+            self.show_debug(frame, detection)
 
-                    roi, angle = self.orientation_detection(
-                        olny_white, contour)
+        return frame, self.coordinates, self.angels
 
-                    if angle == "above":
-                        cv2.circle(olny_white, (cX, cY), 2, (0, 0, 255), -1)
-                    elif angle == "under":
-                        cv2.circle(olny_white, (cX, cY), 2, (255, 0, 0), -1)
+    def show_debug(self, frame: np.ndarray, detection: Detection) -> None:
+        """
+        Отладочная отрисовка: окна с контурами, маской, ROI и ориентацией деталей.
 
-                    # cv2.putText(frame, f"Area: {area}", (cX - 20, cY - 20),
-                    #             cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+        Args:
+            frame (np.ndarray): Изображение, на котором выполнялось обнаружение.
+            detection (Detection): Результат Image.detect.
+        """
+        height, width = frame.shape[:2]
+        WHITE_frame = np.zeros((height, width, 3), np.uint8)
+        olny_white = WHITE_frame.copy()
+        cv2.drawContours(WHITE_frame, detection.contours, -1, (255, 255, 255), 1)
 
-                    self.angels.append(angle)
-                    self.coordinates.append([cX, cY])
+        for part, contour in zip(detection.parts, detection.part_contours):
+            cv2.drawContours(olny_white, [contour], -1, (0, 255, 0), 1)
+            roi, angle = self.orientation_detection(olny_white, contour)
 
-                    self.part_type_definition(
-                        cX, cY, angle, area, number=len(self.coordinates))
+            if part.angle == "above":
+                cv2.circle(olny_white, (part.cX, part.cY), 2, (0, 0, 255), -1)
+            elif part.angle == "under":
+                cv2.circle(olny_white, (part.cX, part.cY), 2, (255, 0, 0), -1)
 
-                    cv2.imshow("ROI", roi)
-        # print(len(self.parts))
+            cv2.imshow("ROI", roi)
         cv2.imshow('result', WHITE_frame)
-        cv2.imshow("Video", thead_2)
+        cv2.imshow("Video", detection.mask)
         cv2.imshow("Video_2", frame)
         cv2.imshow("result_contour", olny_white)
 
-        return frame, self.coordinates, self.angels
-
     def draw_contours(self, frame):
-        cv2.drawContours(frame, self.contours_3, -1, (0, 255, 0), 1)
-        for center, contour, angle in zip(self.coordinates, self.counters, self.angels):
-            if angle == "above":
-                cv2.circle(frame, tuple(center), 2, (0, 0, 255), -1)
-            elif angle == "under":
-                cv2.circle(frame, tuple(center), 2, (255, 0, 0), -1)
-        return frame
+        return draw_parts(frame, self.contours_3, self.detection.table.rows)
 
     def prepare_frames(self, frame):
         self.frame = frame
@@ -167,68 +960,35 @@ class Image:
         self.HSV_frame = cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV)
         self.painted = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
 
+    def part_type(self, area):
+        # Только по площади: остальные признаки каталога не проверяются
+        return TYPES[self.catalogue.get().classify([area])[0]]
+
     def part_type_definition(self, cX, cY, angle, area, number):
-        number_type = "0"
-        if 230 < area < 265:
-            number_type = "4_5"
-        elif 110 < area < 180:
-            number_type = "3_4"
-        elif 60 < area < 100:
-            number_type = "1"
-
-        part = Part(cX, cY, angle, area, number, number_type)
+        part = Part(cX, cY, angle, area, number, self.part_type(area))
         self.parts.append(part)
 
     def orientation_detection(self, frame, contour):
-        dist_result = [0, 0, 0]
         x, y, w, h = cv2.boundingRect(contour)
-        if w > 0 and h > 0:
-            cv2.rectangle(frame, (x-5, y-5),
-                          (x+w+5, y+h+5), (255, 0, 0), 1)
-            if x <= 0:
-                x = 5
-            if y <= 0:
-                y = 5
-            roi = frame[y-5:y+5+h, x-5:x+w+5]
-            height, width, _ = roi.shape
-            if roi is None or roi.size == 0:
-                roi = np.ones((800, 400, 3), dtype=np.uint8) * 255
-            else:
-                roi = cv2.resize(roi, (int(width*10), int(height*10)))
-            height, width, _ = roi.shape
-            coord = []
-
-            for y in range(0, height, 15):
-                for x in range(0, width, 1):
-                    color = roi[y, x]
-                    if color[1] > 240:
-                        coord.append([x, y])
-                        if len(coord) == 2:
-                            dist = coord[1][0] - coord[0][0]
-                            if coord[1][1] != coord[0][1]:
-                                coord = []
-                            elif dist < 50:
-                                coord.pop(1)
-                            else:
-                                cv2.line(
-                                    roi, coord[0], coord[1], (255, 255, 255), 1)
-                                cv2.circle(
-                                    roi, coord[0], 2, (0, 0, 255), -1)
-                                cv2.circle(
-                                    roi, coord[1], 2, (0, 0, 255), -1)
-                                if dist > dist_result[0]:
-                                    dist_result = [dist, coord[0], coord[1]]
-                                coord = []
-        if dist_result[0] != 0:
-            cv2.line(roi, dist_result[1], dist_result[2], (255, 0, 255), 3)
-            cv2.putText(
-                roi, f"distance: {dist_result[0]}", (dist_result[1][0]-20, dist_result[1][1]-20), 1, 1, (255, 0, 255), 2)
+        cv2.rectangle(frame, (x-5, y-5),
+                      (x+w+5, y+h+5), (255, 0, 0), 1)
+
+        angel, (x0, y0, x1, y1), chord = chord_orientation(
+            contour, frame.shape[:2])
+
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            roi = np.ones((800, 400, 3), dtype=np.uint8) * 255
+            return roi, angel
+
+        roi = cv2.resize(roi, None, fx=ORIENTATION_SCALE, fy=ORIENTATION_SCALE,
+                         interpolation=cv2.INTER_NEAREST)
+        height, width = roi.shape[:2]
+        if chord is not None:
+            row, left, right = chord
+            cv2.line(roi, (left, row), (right, row), (255, 0, 255), 3)
+            cv2.putText(roi, f"distance: {right - left}",
+                        (left - 20, row - 20), 1, 1, (255, 0, 255), 2)
             cv2.line(roi, (0, int(height/2)),
                      (width, int(height/2)), (255, 255, 255), 2)
-            if dist_result[1][1] < int(height/2):
-                angel = "under"
-            else:
-                angel = "above"
-                return roi, angel
-        angel = "under"
         return roi, angel
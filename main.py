@@ -2,9 +2,9 @@ import cv2
 import numpy
 import cvzone
 import numpy as np
-import json
 import asyncio
 from Camera_std import Camera
+from rectifier import Rectifier
 
 asyncio
 
@@ -31,6 +31,8 @@ class vision_billet:
 
         self.activate = False
 
+        self.rectifier = Rectifier()
+
     def prepare_frames(self, frame):
 
         self.frame = frame
@@ -172,25 +174,7 @@ class vision_billet:
         pass
 
     def tranform(self, frame):
-        with open('transformation_data.json', 'r') as json_file:
-
-            data = json.load(json_file)
-
-        M = np.array(data['M'])
-        maxWidth = data['maxWidth']
-        maxHeight = data['maxHeight']
-        frame = cv2.warpPerspective(
-            frame, M, (maxWidth, maxHeight))
-
-        with open('calibration_result.json', 'r') as json_file:
-            data = json.load(json_file)
-
-        camera_matrix = np.array(data['camera_matrix'])
-        dist_coefficients = np.array(data['dist_coefficients'])
-
-        frame = cv2.undistort(
-            frame, camera_matrix, dist_coefficients)
-        return frame
+        return self.rectifier.rectify(frame)
 
 
 if __name__ == '__main__':
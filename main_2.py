@@ -1,6 +1,7 @@
 import cv2
 from image import Image  # Ensure this module is implemented correctly
 from Camera_std import Camera  # Ensure this module is implemented correctly
+from calibration_store import calibration_store
 
 if __name__ == '__main__':
     # Uncomment the following line if using a custom camera implementation
@@ -14,6 +15,9 @@ if __name__ == '__main__':
         print("Error: Unable to open video file.")
         exit(1)
 
+    image = Image(calibration=calibration_store)
+    image.debug = True
+
     while True:
         # Read a frame from the video
         ret, frame = video_capture.read()
@@ -21,7 +25,6 @@ if __name__ == '__main__':
             print("End of video or cannot read frame.")
             break
 
-        image = Image(frame)
         frame = image.transform_zone(frame)
         # frame = image.transform_chees(frame)
         frame = image.image_correction(frame)
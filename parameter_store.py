@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Set
+
+
+class ParameterSnapshot(Mapping):
+    """
+    Неизменяемый набор параметров обработки одной версии.
+
+    Снимок можно читать из любого потока: изменения параметров создают
+    новый снимок, старый не меняется. Для каждого ключа хранится версия,
+    в которой он последний раз изменился, поэтому потребитель может
+    пересчитывать кэши только при изменении их входных параметров.
+
+    Attributes:
+        version (int): Версия набора параметров.
+    """
+
+    __slots__ = ('_values', '_versions', 'version')
+
+    def __init__(self, values: Dict[str, Any], versions: Dict[str, int], version: int) -> None:
+        self._values = dict(values)
+        self._versions = dict(versions)
+        self.version = version
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def changed_since(self, version: Optional[int]) -> Set[str]:
+        """
+        Ключи, изменившиеся после версии version (None — все ключи).
+        """
+        if version is None:
+            return set(self._values)
+        return {key for key, key_version in self._versions.items() if key_version > version}
+
+    def __repr__(self) -> str:
+        return f"ParameterSnapshot(version={self.version}, {self._values!r})"
+
+
+class ParameterStore:
+    """
+    Хранилище параметров обработки (video_parametrs.json).
+
+    Интерфейс меняет параметры через update, поток обработки в начале
+    кадра берёт текущий снимок (snapshot) и работает с ним весь кадр,
+    поэтому набор параметров никогда не бывает наполовину обновлённым.
+    Файл записывается в фоновом потоке не чаще одного раза за debounce
+    секунд после последнего изменения: сначала во временный файл рядом,
+    затем os.replace, чтобы на диске всегда был целый файл.
+
+    Attributes:
+        path (str): Путь к JSON-файлу.
+        debounce (float): Пауза после последнего изменения перед записью, секунды.
+        writes (int): Количество записей файла.
+    """
+
+    def __init__(self, path: str = 'video_parametrs.json', debounce: float = 0.5) -> None:
+        """
+        Инициализация объекта ParameterStore.
+
+        Args:
+            path (str): Путь к JSON-файлу с параметрами.
+            debounce (float): Пауза перед записью файла, секунды.
+        """
+        self.path = path
+        self.debounce = debounce
+        self.writes = 0
+
+        with open(path, 'r') as json_file:
+            try:
+                values = json.load(json_file)
+            except json.JSONDecodeError:
+                raise ValueError("Ошибка при чтении файла с данными.")
+        self._snapshot = ParameterSnapshot(values, {key: 0 for key in values}, 0)
+
+        self._dirty = False
+        self._changed_at = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+
+    def snapshot(self) -> ParameterSnapshot:
+        """
+        Текущий снимок параметров. Не блокирует.
+        """
+        return self._snapshot
+
+    def update(self, **values: Any) -> ParameterSnapshot:
+        """
+        Изменяет параметры и планирует запись файла.
+
+        Returns:
+            ParameterSnapshot: Новый снимок (или текущий, если ничего не изменилось).
+        """
+        with self._condition:
+            current = self._snapshot
+            changed = {key: value for key, value in values.items()
+                       if key not in current or current[key] != value}
+            if not changed:
+                return current
+
+            version = current.version + 1
+            versions = dict(current._versions)
+            versions.update((key, version) for key in changed)
+            self._snapshot = ParameterSnapshot({**current._values, **changed}, versions, version)
+
+            self._dirty = True
+            self._changed_at = time.monotonic()
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(
+                    target=self._run, name="parameters", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+            return self._snapshot
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._dirty:
+                    self._condition.wait()
+                if not self._dirty:
+                    return
+                # Запись откладывается, пока параметры продолжают меняться
+                while self._running:
+                    remaining = self._changed_at + self.debounce - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                snapshot = self._snapshot
+                self._dirty = False
+            self._write(snapshot)
+
+    def _write(self, snapshot: ParameterSnapshot) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary = tempfile.mkstemp(
+            prefix='.parameters', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(descriptor, 'w') as json_file:
+                json.dump(dict(snapshot), json_file)
+                json_file.flush()
+                os.fsync(json_file.fileno())
+            # mkstemp создаёт файл с правами 0600: сохраняются права прежнего файла
+            if os.path.exists(self.path):
+                os.chmod(temporary, os.stat(self.path).st_mode & 0o7777)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Не удалось сохранить параметры: {e}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self.writes += 1
+
+    def close(self) -> None:
+        """
+        Записывает несохранённые изменения и останавливает фоновый поток.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,9 +1,228 @@
+import numpy as np
+
+# Коды ориентации совпадают с кодами команд pick и batch (pick_protocol.ORIENTATION_CODES)
+ORIENTATIONS = ("under", "above")
+# Типы деталей; новые типы из каталога добавляются через register_type
+TYPES = ["0", "4_5", "3_4", "1"]
+
+ORIENTATION_CODE = {name: code for code, name in enumerate(ORIENTATIONS)}
+TYPE_CODE = {name: code for code, name in enumerate(TYPES)}
+
+
+def register_type(name: str) -> int:
+    """
+    Возвращает код типа детали, регистрируя новый тип при необходимости.
+    """
+    code = TYPE_CODE.get(name)
+    if code is None:
+        if len(TYPES) > np.iinfo(np.uint8).max:
+            raise ValueError("Слишком много типов деталей.")
+        code = len(TYPES)
+        TYPES.append(name)
+        TYPE_CODE[name] = code
+    return code
+
+
+PART_DTYPE = np.dtype([
+    ('cX', np.int32),
+    ('cY', np.int32),
+    ('area', np.float64),
+    ('orientation', np.uint8),
+    ('type', np.uint8),
+    ('track_id', np.int32),     # -1 — деталь не сопровождается
+    ('contour', np.int32),      # индекс контура в Detection.contours, -1 — нет
+])
+
+
+class PartTable:
+    """
+    Таблица деталей кадра в структурированном массиве NumPy.
+
+    Одна строка на деталь (PART_DTYPE); память выделяется с запасом и
+    переиспользуется между кадрами. Фильтрация, сортировка и подготовка
+    целей для робота выполняются над столбцами целиком.
+
+    Attributes:
+        size (int): Количество деталей.
+    """
+
+    def __init__(self, capacity=64):
+        self._data = np.zeros(capacity, PART_DTYPE)
+        self.size = 0
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Строки таблицы (представление, действительно до изменения таблицы)."""
+        return self._data[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index) -> 'Part':
+        if not -self.size <= index < self.size:
+            raise IndexError(index)
+        return Part.view(self, index % self.size)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield Part.view(self, index)
+
+    def clear(self):
+        self.size = 0
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            data = np.zeros(max(size, 2 * len(self._data)), PART_DTYPE)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+
+    def append(self, cX, cY, area, angle, number_type, track_id=None, contour=-1) -> int:
+        """
+        Добавляет деталь.
+
+        Returns:
+            int: Индекс строки.
+        """
+        self._reserve(self.size + 1)
+        index = self.size
+        self._data[index] = (cX, cY, area, ORIENTATION_CODE.get(angle, 0),
+                             TYPE_CODE.get(number_type, 0),
+                             -1 if track_id is None else track_id, contour)
+        self.size += 1
+        return index
+
+    def append_row(self, row) -> int:
+        """Добавляет строку другой таблицы (np.void с PART_DTYPE)."""
+        self._reserve(self.size + 1)
+        index = self.size
+        self._data[index] = row
+        self.size += 1
+        return index
+
+    def select(self, indices) -> 'PartTable':
+        """
+        Новая таблица из строк с заданными индексами или по булевой маске.
+        """
+        rows = self.rows[indices]
+        table = PartTable(max(len(rows), 1))
+        table._data[:len(rows)] = rows
+        table.size = len(rows)
+        return table
+
+    def sorted_by(self, *fields) -> 'PartTable':
+        """Новая таблица, отсортированная по столбцам (первый — главный)."""
+        order = np.lexsort([self.rows[field] for field in reversed(fields)])
+        return self.select(order)
+
+    def centers(self) -> np.ndarray:
+        """Центры деталей, массив (n, 2)."""
+        rows = self.rows
+        return np.stack((rows['cX'], rows['cY']), axis=1)
+
+    def angles(self) -> list:
+        return np.array(ORIENTATIONS, dtype=object)[self.rows['orientation']].tolist()
+
+    def types(self) -> list:
+        return np.array(TYPES, dtype=object)[self.rows['type']].tolist()
+
+    def targets(self, exclude_unknown=False) -> list:
+        """
+        Цели для робота (cX, cY, orientation, number_type).
+
+        Args:
+            exclude_unknown (bool): Пропускать детали неизвестного типа ("0").
+        """
+        rows = self.rows
+        if exclude_unknown:
+            rows = rows[rows['type'] != TYPE_CODE["0"]]
+        orientations = np.array(ORIENTATIONS, dtype=object)[rows['orientation']]
+        types = np.array(TYPES, dtype=object)[rows['type']]
+        return list(zip(rows['cX'].tolist(), rows['cY'].tolist(),
+                        orientations.tolist(), types.tolist()))
+
+
 class Part:
+    """
+    Деталь: строка PartTable.
+
+    Part(...) создаёт отдельную деталь с собственной таблицей из одной строки;
+    детали из Detection.parts — представления строк таблицы кадра и
+    действительны до следующего кадра. Атрибуты читаются и записываются
+    прямо в таблицу.
+    """
+
+    __slots__ = ('_table', '_index', '_number')
+
+    def __init__(self, cX, cY, angle, area, number, number_type, track_id=None):
+        self._table = PartTable(1)
+        self._index = self._table.append(cX, cY, area, angle, number_type, track_id)
+        self._number = number
+
+    @classmethod
+    def view(cls, table, index):
+        part = cls.__new__(cls)
+        part._table = table
+        part._index = index
+        part._number = None
+        return part
+
+    def _get(self, field):
+        return self._table._data[self._index][field]
+
+    def _set(self, field, value):
+        self._table._data[self._index][field] = value
+
+    @property
+    def cX(self):
+        return int(self._get('cX'))
+
+    @cX.setter
+    def cX(self, value):
+        self._set('cX', value)
+
+    @property
+    def cY(self):
+        return int(self._get('cY'))
+
+    @cY.setter
+    def cY(self, value):
+        self._set('cY', value)
+
+    @property
+    def area(self):
+        return float(self._get('area'))
+
+    @area.setter
+    def area(self, value):
+        self._set('area', value)
+
+    @property
+    def angle(self):
+        return ORIENTATIONS[self._get('orientation')]
+
+    @angle.setter
+    def angle(self, value):
+        self._set('orientation', ORIENTATION_CODE.get(value, 0))
+
+    @property
+    def number_type(self):
+        return TYPES[self._get('type')]
+
+    @number_type.setter
+    def number_type(self, value):
+        self._set('type', TYPE_CODE.get(value, 0))
+
+    @property
+    def track_id(self):
+        # Постоянный номер детали между кадрами (PartTracker); number — индекс на кадре
+        track_id = int(self._get('track_id'))
+        return None if track_id < 0 else track_id
+
+    @property
+    def number(self):
+        """Номер детали на кадре (с 1)."""
+        return self._index + 1 if self._number is None else self._number
 
-    def __init__(self, cX, cY, angle, area, number, number_type):
-        self.cX = cX
-        self.cY = cY
-        self.angle = angle
-        self.area = area
-        self.number = number
-        self.number_type = number_type
+    def __repr__(self):
+        return (f"Part(cX={self.cX}, cY={self.cY}, angle={self.angle!r}, area={self.area}, "
+                f"number={self.number}, number_type={self.number_type!r})")
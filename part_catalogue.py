@@ -0,0 +1,157 @@
+from typing import Any, Dict
+
+import numpy as np
+
+from calibration_store import CalibrationFile
+from part import ORIENTATION_CODE, ORIENTATIONS, register_type
+
+# Признаки с интервалами допустимых значений (границы не входят в интервал)
+RANGE_FEATURES = ('area', 'aspect', 'perimeter')
+
+
+def hu_log(hu: np.ndarray) -> np.ndarray:
+    """Моменты Ху в логарифмической шкале (-sign * log10|h|), форма (..., 7)."""
+    hu = np.asarray(hu, np.float64)
+    return -np.sign(hu) * np.log10(np.abs(hu) + 1e-30)
+
+
+class PartClassifier:
+    """
+    Классификатор деталей по каталогу типов.
+
+    Каталог (part_catalogue.json) компилируется в массивы: границы признаков
+    (n_types, 3), эталонные моменты Ху (n_types, 7) и таблицу допустимых
+    ориентаций захвата. Все пятна кадра классифицируются одной операцией
+    над матрицей (n_blobs, n_types). Если подходят несколько типов,
+    выбирается тип с ближайшими моментами Ху, при равенстве — первый
+    в каталоге. Пятно без подходящего типа получает тип "0".
+    Если каталог задаёт только непересекающиеся интервалы площади (как
+    прежние классы площади), вместо матрицы используется один вызов
+    np.digitize по отсортированным границам.
+
+    Пример записи каталога:
+        {"name": "4_5", "area": [230, 265], "aspect": [1.2, 2.2],
+         "perimeter": null, "hu": [0.17, 0.004, ...], "hu_tolerance": 1.5,
+         "orientations": ["above", "under"]}
+
+    Attributes:
+        names (list): Имена типов в порядке каталога.
+        needs_aspect (bool): Каталогу нужно отношение сторон minAreaRect.
+        needs_perimeter (bool): Каталогу нужен периметр контура.
+        needs_hu (bool): Каталогу нужны моменты Ху.
+        area_edges (np.ndarray | None): Границы интервалов площади для
+            np.digitize; None, если каталог нельзя свести к интервалам площади.
+    """
+
+    def __init__(self, types):
+        self.names = [entry['name'] for entry in types]
+        self.codes = np.array([register_type(name) for name in self.names], np.uint8)
+        count = len(types)
+
+        self.low = np.full((count, len(RANGE_FEATURES)), -np.inf)
+        self.high = np.full((count, len(RANGE_FEATURES)), np.inf)
+        for row, entry in enumerate(types):
+            for column, feature in enumerate(RANGE_FEATURES):
+                bounds = entry.get(feature)
+                if bounds is not None:
+                    self.low[row, column], self.high[row, column] = bounds
+
+        self.has_hu = np.array([entry.get('hu') is not None for entry in types], bool)
+        self.hu = np.zeros((count, 7))
+        self.hu_tolerance = np.full(count, np.inf)
+        for row, entry in enumerate(types):
+            if entry.get('hu') is not None:
+                self.hu[row] = hu_log(entry['hu'])
+                self.hu_tolerance[row] = entry.get('hu_tolerance') or 1.0
+
+        # Допустимые ориентации захвата по коду типа; по умолчанию любые
+        self.pickable_table = np.ones((256, len(ORIENTATIONS)), bool)
+        for code, entry in zip(self.codes.tolist(), types):
+            allowed = entry.get('orientations')
+            if allowed is not None:
+                self.pickable_table[code] = False
+                self.pickable_table[code, [ORIENTATION_CODE[name] for name in allowed]] = True
+
+        self.needs_aspect = bool(np.isfinite(self.low[:, 1]).any() | np.isfinite(self.high[:, 1]).any())
+        self.needs_perimeter = bool(np.isfinite(self.low[:, 2]).any() | np.isfinite(self.high[:, 2]).any())
+        self.needs_hu = bool(self.has_hu.any())
+
+        self.area_edges = self.area_codes = None
+        if not (self.needs_aspect or self.needs_perimeter or self.needs_hu):
+            order = np.argsort(self.low[:, 0], kind='stable')
+            edges = np.column_stack((self.low[order, 0], self.high[order, 0])).ravel()
+            if np.all(np.diff(edges) >= 0):
+                self.area_edges = edges
+                self.area_codes = self.codes[order]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PartClassifier':
+        types = data['types']
+        if not types:
+            raise ValueError("Каталог деталей пуст.")
+        return cls(types)
+
+    def classify(self, areas, aspects=None, perimeters=None, hu=None) -> np.ndarray:
+        """
+        Классифицирует все пятна кадра.
+
+        Args:
+            areas (np.ndarray): Площади контуров, форма (n,).
+            aspects (np.ndarray | None): Отношение длинной стороны minAreaRect к короткой.
+            perimeters (np.ndarray | None): Периметры контуров.
+            hu (np.ndarray | None): Моменты Ху, форма (n, 7).
+            Не переданные признаки не проверяются.
+
+        Returns:
+            np.ndarray: Коды типов (part.TYPES), uint8.
+        """
+        areas = np.asarray(areas, np.float64).reshape(-1)
+        if self.area_edges is not None:
+            return self._classify_areas(areas)
+        match = (areas[:, None] > self.low[:, 0]) & (areas[:, None] < self.high[:, 0])
+        for column, values in ((1, aspects), (2, perimeters)):
+            if values is not None:
+                values = np.asarray(values, np.float64).reshape(-1, 1)
+                match &= (values > self.low[:, column]) & (values < self.high[:, column])
+
+        score = np.zeros(match.shape)
+        if hu is not None and self.needs_hu:
+            distance = np.abs(hu_log(hu)[:, None, :] - self.hu[None]).sum(axis=2)
+            match &= ~self.has_hu | (distance <= self.hu_tolerance)
+            score = np.where(self.has_hu, distance, 0.0)
+
+        score = np.where(match, score, np.inf)
+        best = np.argmin(score, axis=1)
+        found = match[np.arange(len(areas)), best]
+        return np.where(found, self.codes[best], 0).astype(np.uint8)
+
+    def _classify_areas(self, areas: np.ndarray) -> np.ndarray:
+        edges = self.area_edges
+        # Нечётный индекс — площадь в (low, high]; правая граница исключается отдельно
+        index = np.digitize(areas, edges, right=True)
+        inside = (index % 2 == 1) & (areas != edges[np.minimum(index, len(edges) - 1)])
+        result = np.zeros(areas.shape, np.uint8)
+        result[inside] = self.area_codes[(index[inside] - 1) // 2]
+        return result
+
+    def pickable(self, type_codes, orientation_codes) -> np.ndarray:
+        """
+        Может ли захват взять деталь данного типа в данной ориентации.
+
+        Returns:
+            np.ndarray: Булев массив той же формы.
+        """
+        return self.pickable_table[type_codes, orientation_codes]
+
+
+def load_catalogue(path: str = 'part_catalogue.json') -> CalibrationFile:
+    """
+    Каталог деталей, перечитываемый при изменении файла.
+
+    Returns:
+        CalibrationFile: get() возвращает PartClassifier текущего каталога.
+    """
+    return CalibrationFile(path, PartClassifier.from_dict)
+
+
+part_catalogue = load_catalogue()
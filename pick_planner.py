@@ -0,0 +1,181 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from profiler import profiler
+
+
+def _coordinates(item) -> Tuple[float, float]:
+    if hasattr(item, 'cX'):
+        return item.cX, item.cY
+    return item[0], item[1]
+
+
+def _number_type(item):
+    if hasattr(item, 'number_type'):
+        return item.number_type
+    return item[3]
+
+
+def route_length(points: np.ndarray, order: Sequence[int], start=None) -> float:
+    """
+    Длина маршрута (без возврата) по точкам в заданном порядке.
+
+    Args:
+        points (np.ndarray): Координаты, форма (n, 2).
+        order (Sequence[int]): Порядок обхода.
+        start (tuple | None): Начальная точка маршрута.
+
+    Returns:
+        float: Суммарная длина переходов.
+    """
+    path = points[list(order)]
+    if start is not None:
+        path = np.vstack([np.asarray(start, np.float64)[None], path])
+    if len(path) < 2:
+        return 0.0
+    return float(np.hypot(*np.diff(path, axis=0).T).sum())
+
+
+def nearest_neighbour(points: np.ndarray, start=None) -> List[int]:
+    """
+    Жадный маршрут: каждый раз к ближайшей ещё не взятой точке.
+
+    Args:
+        points (np.ndarray): Координаты, форма (n, 2).
+        start (tuple | None): Начальная точка; по умолчанию первая точка.
+
+    Returns:
+        List[int]: Порядок обхода.
+    """
+    count = len(points)
+    if count == 0:
+        return []
+    visited = np.zeros(count, bool)
+    order = []
+    if start is None:
+        current = points[0]
+        visited[0] = True
+        order.append(0)
+    else:
+        current = np.asarray(start, np.float64)
+    for _ in range(count - len(order)):
+        distances = np.hypot(*(points - current).T)
+        distances[visited] = np.inf
+        index = int(np.argmin(distances))
+        visited[index] = True
+        order.append(index)
+        current = points[index]
+    return order
+
+
+def two_opt(points: np.ndarray, order: Sequence[int], start=None, max_passes=10) -> List[int]:
+    """
+    Улучшает маршрут перестановками 2-opt (разворот участка маршрута).
+
+    Маршрут открытый: начинается в start (или в первой точке) и не
+    возвращается назад. Выигрыш всех разворотов для фиксированного начала
+    участка считается одной векторной операцией.
+
+    Args:
+        points (np.ndarray): Координаты, форма (n, 2).
+        order (Sequence[int]): Начальный порядок обхода.
+        start (tuple | None): Начальная точка маршрута.
+        max_passes (int): Максимум полных проходов.
+
+    Returns:
+        List[int]: Улучшенный порядок обхода.
+    """
+    order = list(order)
+    if len(order) < 3:
+        return order
+    # Узел 0 пути — неподвижное начало (start или первая точка)
+    if start is not None:
+        path = np.vstack([np.asarray(start, np.float64)[None], points[order]])
+        nodes = np.array([-1] + order)
+    else:
+        path = points[order].astype(np.float64)
+        nodes = np.array(order)
+    size = len(path)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 1):
+            # Разворот участка i..j для всех j > i
+            j = np.arange(i + 1, size)
+            before = path[i - 1]
+            after = path[np.minimum(j + 1, size - 1)]
+            removed = np.hypot(*(path[i] - before)) + np.hypot(*(path[j] - after).T)
+            added = np.hypot(*(path[j] - before).T) + np.hypot(*(path[i] - after).T)
+            # У последнего узла нет следующего: маршрут открытый
+            added[-1] -= np.hypot(*(path[i] - after[-1]))
+            gains = removed - added
+            best = int(np.argmax(gains))
+            if gains[best] > 1e-9:
+                end = int(j[best])
+                path[i:end + 1] = path[i:end + 1][::-1].copy()
+                nodes[i:end + 1] = nodes[i:end + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+
+    return [int(node) for node in nodes if node >= 0]
+
+
+class PickPlanner:
+    """
+    Порядок захвата деталей, сокращающий путь робота.
+
+    Маршрут строится в координатах рабочей зоны (кадр после transform_zone
+    уже откалиброван): сначала ближайший сосед от последнего положения
+    робота, затем улучшение 2-opt. При group_by_type детали одного типа
+    (одного места сброса) идут подряд, группы — в порядке type_order.
+
+    Attributes:
+        group_by_type (bool): Группировать детали по number_type.
+        type_order (List[str]): Порядок групп; типы, которых нет в списке,
+            идут после в порядке появления.
+        max_passes (int): Максимум проходов 2-opt.
+    """
+
+    def __init__(self, group_by_type=False, type_order=None, max_passes=10):
+        self.group_by_type = group_by_type
+        self.type_order = list(type_order) if type_order else []
+        self.max_passes = max_passes
+
+    def _route(self, items, start):
+        points = np.array([_coordinates(item) for item in items], np.float64).reshape(-1, 2)
+        order = nearest_neighbour(points, start)
+        order = two_opt(points, order, start, self.max_passes)
+        return [items[index] for index in order]
+
+    def plan(self, items: Sequence, start: Optional[Tuple[float, float]] = None) -> list:
+        """
+        Упорядочивает детали для захвата.
+
+        Args:
+            items (Sequence): Объекты Part или кортежи (cX, cY, orientation, number_type).
+            start (tuple | None): Последнее положение робота (PickProtocol.position).
+
+        Returns:
+            list: Те же элементы в порядке захвата.
+        """
+        items = list(items)
+        if len(items) < 2:
+            return items
+        with profiler.stage('plan'):
+            if not self.group_by_type:
+                return self._route(items, start)
+
+            groups = {}
+            for item in items:
+                groups.setdefault(_number_type(item), []).append(item)
+            names = [name for name in self.type_order if name in groups]
+            names += [name for name in groups if name not in names]
+
+            planned = []
+            for name in names:
+                route = self._route(groups[name], start)
+                planned.extend(route)
+                start = _coordinates(route[-1])
+            return planned
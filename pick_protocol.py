@@ -0,0 +1,339 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from profiler import profiler
+
+
+ORIENTATION_CODES = {'under': '0', 'above': '1'}
+ORIENTATION_NAMES = {code: name for name, code in ORIENTATION_CODES.items()}
+
+
+def encode_pick(seq: int, target: tuple) -> str:
+    """
+    Кодирует одну цель в команду pick.
+
+    Формат: pick;<seq>;<y>;<x>;<o> — o кодируется так же, как в batch:
+    0 ("under") или 1 ("above").
+
+    Args:
+        seq (int): Номер команды.
+        target (tuple): Цель (cX, cY, orientation, ...).
+
+    Returns:
+        str: Сообщение с переводом строки в конце.
+    """
+    cX, cY, orientation = target[0], target[1], target[2]
+    return f"pick;{seq};{cY};{cX};{ORIENTATION_CODES.get(orientation, '0')}\n"
+
+
+def decode_pick(line: str) -> Tuple[int, tuple]:
+    """
+    Разбирает сообщение pick (сторона робота и проверка).
+
+    Args:
+        line (str): Сообщение, созданное encode_pick.
+
+    Returns:
+        Tuple[int, tuple]: Номер команды и цель (cX, cY, orientation).
+    """
+    fields = line.rstrip("\n").split(';')
+    if fields[0] != 'pick' or len(fields) != 5:
+        raise ValueError(f"Не сообщение pick: {line[:40]}")
+    return int(fields[1]), (int(fields[3]), int(fields[2]), ORIENTATION_NAMES[fields[4]])
+
+
+def encode_batch(seq: int, targets: Sequence[tuple]) -> str:
+    """
+    Кодирует все цели лотка в одно сообщение.
+
+    Формат: batch;<seq>;<n>;<y>,<x>,<o>,<type>;... — координаты в пикселях
+    зоны, o — 0 ("under") или 1 ("above"), type — Part.number_type.
+
+    Args:
+        seq (int): Номер команды.
+        targets (Sequence[tuple]): Цели (cX, cY, orientation, number_type).
+
+    Returns:
+        str: Сообщение с переводом строки в конце.
+    """
+    codes = ORIENTATION_CODES
+    items = [f"{target[1]},{target[0]},{codes.get(target[2], '0')},{target[3]}"
+             for target in targets]
+    return f"batch;{seq};{len(items)};" + ";".join(items) + "\n"
+
+
+def decode_batch(line: str) -> Tuple[int, List[tuple]]:
+    """
+    Разбирает сообщение batch (сторона робота и проверка).
+
+    Args:
+        line (str): Сообщение, созданное encode_batch.
+
+    Returns:
+        Tuple[int, List[tuple]]: Номер команды и цели (cX, cY, orientation, number_type).
+    """
+    fields = line.rstrip("\n").split(';')
+    if fields[0] != 'batch' or len(fields) < 3:
+        raise ValueError(f"Не сообщение batch: {line[:40]}")
+    seq, count = int(fields[1]), int(fields[2])
+    items = fields[3:3 + count] if count else []
+    if len(items) != count:
+        raise ValueError("Число целей не совпадает с заголовком batch.")
+    names = ORIENTATION_NAMES
+    targets = []
+    for item in items:
+        y, x, orientation, number_type = item.split(',')
+        targets.append((int(x), int(y), names[orientation], number_type))
+    return seq, targets
+
+
+class PendingPick:
+    """
+    Команда захвата, ожидающая подтверждения от робота.
+
+    Attributes:
+        seq (int): Порядковый номер команды.
+        targets (list): Цели команды (cX, cY, orientation, number_type);
+            у команды pick одна цель, у batch — все цели лотка.
+        message (str): Отправленное сообщение.
+        sent_at (float): Время последней отправки (time.monotonic).
+        first_sent_at (float): Время первой отправки.
+        retries (int): Количество повторных отправок.
+        acked (bool): Получено ли подтверждение ACK.
+    """
+
+    def __init__(self, seq, targets, message, now):
+        self.seq = seq
+        self.targets = targets
+        self.message = message
+        self.sent_at = now
+        self.first_sent_at = now
+        self.retries = 0
+        self.acked = False
+
+
+class PickProtocol:
+    """
+    Протокол выдачи команд захвата с номерами и подтверждениями.
+
+    Сообщения разделяются переводом строки.
+    Компьютер зрения -> робот:
+        pick;<seq>;<y>;<x>;<o>                   — одна цель (см. encode_pick)
+        batch;<seq>;<n>;<y>,<x>,<o>,<type>;...   — все цели лотка (см. encode_batch)
+    Робот -> компьютер зрения:
+        ready             — робот готов принимать команды;
+        ack;<seq>         — команда принята в очередь робота;
+        done;<seq>        — захват выполнен;
+        pos;<x>;<y>       — текущее положение робота (необязательно).
+
+    Одновременно может быть не больше max_outstanding команд без DONE.
+    В пакетном режиме (batch=True) команда batch считается одной командой:
+    робот подтверждает её одним ACK и отвечает DONE после всех захватов.
+    Команда без ACK дольше ack_timeout отправляется повторно (до max_retries
+    раз); команда без DONE дольше done_timeout считается потерянной.
+    Этот класс не работает с сетью: Robot передаёт ему входящие строки
+    и отправляет возвращаемые сообщения.
+
+    Attributes:
+        ready (bool): Робот сообщил о готовности.
+        outstanding (Dict[int, PendingPick]): Команды, ожидающие DONE.
+        position (Optional[Tuple[float, float]]): Последнее положение робота.
+    """
+
+    def __init__(self, max_outstanding=2, ack_timeout=1.0, done_timeout=30.0,
+                 max_retries=3, exclusion_radius=8.0, settle_time=1.0,
+                 batch=False, max_batch=256, planner=None):
+        """
+        Инициализация объекта PickProtocol.
+
+        Args:
+            max_outstanding (int): Максимум команд без DONE.
+            ack_timeout (float): Время ожидания ACK до повторной отправки, с.
+            done_timeout (float): Время ожидания DONE на одну цель, с
+                (для batch умножается на число целей).
+            max_retries (int): Максимум повторных отправок одной команды.
+            exclusion_radius (float): Радиус (в пикселях зоны), в котором цель
+                считается той же деталью, что и уже выданная.
+            settle_time (float): Сколько секунд после DONE не выдавать цели рядом
+                с взятой деталью (кадры, снятые до захвата, ещё содержат её).
+            batch (bool): Отправлять все цели лотка одной командой batch.
+            max_batch (int): Максимум целей в одной команде batch.
+            planner (PickPlanner | None): Порядок выдачи целей; по умолчанию
+                цели выдаются в порядке обнаружения.
+        """
+        self.planner = planner
+        self.batch = batch
+        self.max_batch = max_batch
+        self.max_outstanding = max_outstanding
+        self.ack_timeout = ack_timeout
+        self.done_timeout = done_timeout
+        self.max_retries = max_retries
+        self.exclusion_radius = exclusion_radius
+        self.settle_time = settle_time
+
+        self.ready = False
+        self.outstanding: Dict[int, PendingPick] = {}
+        self.position: Optional[Tuple[float, float]] = None
+        self.targets: List[tuple] = []
+        self._planned = False
+
+        self.sent = 0
+        self.completed = 0
+        self.retransmits = 0
+        self.failures = 0
+
+        self._seq = 0
+        self._recent: List[Tuple[float, float, float]] = []
+
+    def reset(self):
+        """Сбрасывает состояние при новом подключении робота."""
+        self.ready = False
+        self.outstanding.clear()
+        self._recent.clear()
+
+    def offer(self, targets: Sequence[tuple]) -> None:
+        """
+        Запоминает свежий список целей (cX, cY, orientation, number_type).
+        Маршрут (planner) строится не здесь, а перед отправкой команды
+        (_ordered): кадры приходят чаще, чем в окне освобождается место.
+        """
+        self.targets = list(targets)
+        self._planned = self.planner is None
+
+    def _ordered(self) -> List[tuple]:
+        """
+        Цели в порядке выдачи. Маршрут от последнего положения робота
+        строится один раз на список целей из offer.
+        """
+        if not self._planned:
+            self.targets = self.planner.plan(self.targets, self.position)
+            self._planned = True
+        return self.targets
+
+    def _excluded(self, target, now) -> bool:
+        radius = self.exclusion_radius ** 2
+        x, y = target[0], target[1]
+        for pending in self.outstanding.values():
+            for target_x, target_y, *_ in pending.targets:
+                if (target_x - x) ** 2 + (target_y - y) ** 2 <= radius:
+                    return True
+        for recent_x, recent_y, until in self._recent:
+            if until > now and (recent_x - x) ** 2 + (recent_y - y) ** 2 <= radius:
+                return True
+        return False
+
+    def next_messages(self, now=None) -> List[str]:
+        """
+        Выдаёт команды для свободных мест в окне.
+
+        Returns:
+            List[str]: Сообщения pick для отправки.
+        """
+        if not self.ready:
+            return []
+        now = time.monotonic() if now is None else now
+        self._recent = [entry for entry in self._recent if entry[2] > now]
+
+        if self.batch:
+            return self._next_batch(now)
+
+        messages = []
+        if len(self.outstanding) >= self.max_outstanding:
+            return messages
+        for target in self._ordered():
+            if len(self.outstanding) >= self.max_outstanding:
+                break
+            if self._excluded(target, now):
+                continue
+            self._seq += 1
+            message = encode_pick(self._seq, target)
+            self.outstanding[self._seq] = PendingPick(self._seq, [target], message, now)
+            self.sent += 1
+            messages.append(message)
+        return messages
+
+    def _next_batch(self, now) -> List[str]:
+        if len(self.outstanding) >= self.max_outstanding:
+            return []
+        targets = [target for target in self._ordered()
+                   if not self._excluded(target, now)][:self.max_batch]
+        if not targets:
+            return []
+        self._seq += 1
+        message = encode_batch(self._seq, targets)
+        self.outstanding[self._seq] = PendingPick(self._seq, targets, message, now)
+        self.sent += 1
+        return [message]
+
+    def handle(self, line: str, now=None) -> None:
+        """
+        Обрабатывает одну строку, полученную от робота.
+
+        Args:
+            line (str): Строка без перевода строки.
+        """
+        now = time.monotonic() if now is None else now
+        fields = line.strip().split(';')
+        kind = fields[0].lower()
+
+        if kind == 'ready':
+            self.ready = True
+        elif kind in ('ack', 'done') and len(fields) > 1:
+            try:
+                seq = int(fields[1])
+            except ValueError:
+                print(f"Некорректный номер команды: {line}")
+                return
+            pending = self.outstanding.get(seq)
+            if pending is None:
+                return
+            if kind == 'ack':
+                if not pending.acked:
+                    pending.acked = True
+                    profiler.record('robot.pick_ack', now - pending.first_sent_at)
+            else:
+                del self.outstanding[seq]
+                self.completed += 1
+                self._recent.extend((target[0], target[1], now + self.settle_time)
+                                    for target in pending.targets)
+                profiler.record('robot.pick_done', now - pending.first_sent_at)
+        elif kind == 'pos' and len(fields) > 2:
+            try:
+                self.position = (float(fields[1]), float(fields[2]))
+            except ValueError:
+                print(f"Некорректное положение робота: {line}")
+        else:
+            print(f"Неизвестное сообщение от робота: {line}")
+
+    def expired(self, now=None) -> List[str]:
+        """
+        Проверяет тайм-ауты.
+
+        Returns:
+            List[str]: Сообщения для повторной отправки.
+        """
+        now = time.monotonic() if now is None else now
+        messages = []
+        for seq, pending in list(self.outstanding.items()):
+            if not pending.acked and now - pending.sent_at > self.ack_timeout:
+                if pending.retries >= self.max_retries:
+                    del self.outstanding[seq]
+                    self.failures += 1
+                    continue
+                pending.retries += 1
+                pending.sent_at = now
+                self.retransmits += 1
+                messages.append(pending.message)
+            elif pending.acked and now - pending.first_sent_at > self.done_timeout * len(pending.targets):
+                del self.outstanding[seq]
+                self.failures += 1
+        return messages
+
+    def statistics(self) -> dict:
+        return {
+            'sent': self.sent,
+            'completed': self.completed,
+            'retransmits': self.retransmits,
+            'failures': self.failures,
+            'outstanding': len(self.outstanding),
+        }
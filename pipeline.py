@@ -0,0 +1,447 @@
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from image import Image, draw_parts
+from profiler import profiler
+
+# Ссылка на кадр в разделяемой памяти: (буфер, имя блока, форма, тип)
+FrameRef = Tuple[int, str, Tuple[int, ...], str]
+
+
+class SharedFrames:
+    """
+    Кольцо кадров в разделяемой памяти между процессами конвейера.
+
+    Блоки памяти создаёт процесс-производитель на первом кадре (и заново при
+    смене размера кадра). По очереди между процессами передаётся только
+    ссылка на буфер (FrameRef), сам кадр не сериализуется. Номера свободных
+    буферов лежат в очереди free: производитель берёт номер перед записью,
+    последний потребитель возвращает его (release). Как CaptureThread отдаёт
+    только последний кадр, производитель не копит очередь: новый кадр
+    занимает буфер ещё не взятого потребителем кадра (acquire_latest).
+
+    Attributes:
+        slots (int): Количество буферов.
+        free (multiprocessing.Queue): Номера свободных буферов.
+    """
+
+    def __init__(self, slots: int, context: Any) -> None:
+        self.slots = slots
+        self.free = context.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self._owned: Dict[int, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+        self._attached: Dict[str, shared_memory.SharedMemory] = {}
+
+    def acquire_latest(self, queued: Any, stop: Any) -> Tuple[Optional[int], Any]:
+        """
+        Номер буфера для нового кадра без ожидания потребителей: если в
+        очереди queued есть ещё не взятый кадр (сообщение (номер, FrameRef,
+        ...)), он пропускается, и его буфер используется заново. Так в очереди
+        остаётся не больше одного кадра, а свободный буфер берётся, только
+        когда потребитель уже забрал предыдущий.
+
+        Returns:
+            Tuple[Optional[int], Any]: Номер буфера (None, если конвейер
+                останавливается) и сообщение пропущенного кадра или None.
+        """
+        while not stop.is_set():
+            try:
+                message = queued.get_nowait()
+                return message[1][0], message
+            except queue.Empty:
+                pass
+            try:
+                return self.free.get_nowait(), None
+            except queue.Empty:
+                pass
+            # Все буферы у потребителей: ждём, пока один вернётся
+            try:
+                return self.free.get(timeout=0.02), None
+            except queue.Empty:
+                continue
+        return None, None
+
+    def buffer(self, slot: int) -> Optional[np.ndarray]:
+        """Массив буфера slot у производителя (None, если ещё не создан)."""
+        owned = self._owned.get(slot)
+        return None if owned is None else owned[1]
+
+    def store(self, slot: int, frame: np.ndarray) -> FrameRef:
+        """
+        Кладёт кадр в буфер slot. Если кадр уже записан прямо в буфер
+        (get_image(dst=buffer(slot))), копирования нет.
+
+        Returns:
+            FrameRef: Ссылка на кадр для потребителя.
+        """
+        owned = self._owned.get(slot)
+        if owned is None or owned[1].shape != frame.shape or owned[1].dtype != frame.dtype:
+            if owned is not None:
+                owned[0].close()
+                owned[0].unlink()
+            block = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+            owned = block, np.ndarray(frame.shape, frame.dtype, buffer=block.buf)
+            self._owned[slot] = owned
+        block, array = owned
+        if not np.shares_memory(frame, array):
+            np.copyto(array, frame)
+        return slot, block.name, array.shape, array.dtype.str
+
+    def view(self, ref: FrameRef) -> np.ndarray:
+        """Кадр по ссылке без копирования (у потребителя)."""
+        _, name, shape, dtype = ref
+        block = self._attached.get(name)
+        if block is None:
+            block = shared_memory.SharedMemory(name=name)
+            self._attached[name] = block
+        return np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+    def release(self, ref: FrameRef) -> None:
+        """Возвращает буфер кадра производителю."""
+        self.free.put(ref[0])
+
+    def close(self, timeout: float = 1.0) -> None:
+        """
+        Закрывает блоки памяти. Производитель сначала ждёт (не дольше timeout),
+        пока потребители вернут все буферы, и удаляет свои блоки.
+        """
+        for block in self._attached.values():
+            block.close()
+        self._attached.clear()
+        if not self._owned:
+            return
+
+        returned = 0
+        deadline = time.monotonic() + timeout
+        while returned < self.slots and time.monotonic() < deadline:
+            try:
+                self.free.get(timeout=max(deadline - time.monotonic(), 0))
+                returned += 1
+            except queue.Empty:
+                break
+        for block, _ in self._owned.values():
+            block.close()
+            block.unlink()
+        self._owned.clear()
+
+
+def _get(source: Any, stop: Any) -> Any:
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _latest(control: Any, parameters: Any) -> Any:
+    # Параметры меняются только между кадрами: берётся последний присланный набор
+    while True:
+        try:
+            parameters = control.get_nowait()
+        except queue.Empty:
+            return parameters
+
+
+def _count(counter: Any) -> None:
+    with counter.get_lock():
+        counter.value += 1
+
+
+def _capture_stage(camera_factory, raw, output, stop, stop_on_empty, dropped):
+    camera = camera_factory()
+    number = 0
+    try:
+        while not stop.is_set():
+            slot, skipped = raw.acquire_latest(output, stop)
+            if slot is None:
+                break
+            if skipped is not None:
+                _count(dropped)
+            frame = camera.get_image(dst=raw.buffer(slot))
+            captured = time.monotonic()
+            if frame is None:
+                raw.free.put(slot)
+                if stop_on_empty:
+                    break
+                continue
+            output.put((number, raw.store(slot, frame), captured))
+            number += 1
+    finally:
+        output.put(None)
+        camera.end()
+        raw.close()
+
+
+def _preprocess_stage(raw, zones, source, output, results, control, stop, parameters,
+                      detectors, dropped):
+    # Номера sequence идут подряд по кадрам, дошедшим до предобработки;
+    # пропуск кадра после неё отмечается в results сообщением (sequence, None)
+    image = Image()
+    image.tracker = None
+    image.change_detector = None
+    sequence = 0
+    try:
+        while True:
+            message = _get(source, stop)
+            if message is None:
+                break
+            number, ref, captured = message
+            start = time.perf_counter()
+            image.set_parameters(_latest(control, parameters))
+            zone = image.image_correction(image.transform_zone(raw.view(ref)))
+            raw.release(ref)
+
+            slot, skipped = zones.acquire_latest(output, stop)
+            if slot is None:
+                break
+            if skipped is not None:
+                _count(dropped)
+                results.put((skipped[0], None))
+            zone_ref = zones.store(slot, zone)
+            output.put((sequence, zone_ref, number, captured, time.perf_counter() - start))
+            sequence += 1
+    finally:
+        for _ in range(detectors):
+            output.put(None)
+        raw.close()
+        zones.close()
+
+
+def _detect_stage(zones, source, results, control, stop, parameters):
+    image = Image()
+    try:
+        while True:
+            message = _get(source, stop)
+            if message is None:
+                break
+            sequence, zone_ref, number, captured, preprocess_time = message
+            start = time.perf_counter()
+            image.set_parameters(_latest(control, parameters))
+            detection = image.detect(zones.view(zone_ref))
+            results.put((sequence, zone_ref, number, captured, detection.table.rows.copy(),
+                         tuple(detection.contours), image.targets(),
+                         preprocess_time, time.perf_counter() - start))
+    finally:
+        results.put(None)
+        zones.close()
+
+
+class PipelineResult:
+    """
+    Результат обработки одного кадра конвейером.
+
+    Attributes:
+        sequence (int): Порядковый номер результата.
+        number (int): Номер кадра камеры с начала захвата (пропущенные
+            конвейером кадры в результаты не попадают).
+        frame (np.ndarray): Скорректированный кадр зоны в разделяемой памяти;
+            действителен до Pipeline.release.
+        rows (np.ndarray): Детали кадра (строки PART_DTYPE).
+        contours (tuple): Контуры кадра.
+        targets (list): Цели для робота (Image.targets).
+        latency (float): Время от захвата кадра до получения результата, секунды.
+    """
+
+    def __init__(self, sequence, number, ref, frame, rows, contours, targets, latency):
+        self.sequence = sequence
+        self.number = number
+        self.ref = ref
+        self.frame = frame
+        self.rows = rows
+        self.contours = contours
+        self.targets = targets
+        self.latency = latency
+
+    def draw(self, frame: np.ndarray) -> np.ndarray:
+        """Рисует контуры и центры деталей результата на кадре."""
+        return draw_parts(frame, self.contours, self.rows)
+
+
+class Pipeline:
+    """
+    Конвейерная обработка кадров в отдельных процессах.
+
+    Захват, предобработка (transform_zone + image_correction) и обнаружение
+    (Image.detect, ориентация, классификация) работают в своих процессах
+    и занимают разные ядра. Кадры между процессами передаются через
+    кольца буферов в разделяемой памяти (SharedFrames), по очередям идут
+    только ссылки и результаты. Обнаружение может выполняться несколькими
+    процессами (detectors); результаты возвращаются в порядке захвата.
+
+    Как и CaptureThread, конвейер не копит очередь: если следующая стадия
+    не успевает, новый кадр занимает буфер самого старого ещё не взятого
+    кадра, а тот пропускается (dropped). Поэтому задержка от захвата до
+    результата не растёт с числом буферов, а цели для робота строятся
+    по свежим кадрам.
+
+    При detectors > 1 у каждого процесса обнаружения своё сопровождение
+    деталей, поэтому track_id не сквозной.
+
+    Attributes:
+        frames (int): Кадров получено.
+        dropped (int): Кадров пропущено, потому что стадии не успевали.
+    """
+
+    def __init__(self, camera_factory: Callable[[], Any], parameters: Any = None,
+                 slots: int = 4, detectors: int = 1, stop_on_empty: bool = False,
+                 context: Any = None) -> None:
+        """
+        Инициализация объекта Pipeline.
+
+        Args:
+            camera_factory (Callable): Создаёт камеру в процессе захвата
+                (у камеры методы get_image(dst=None) и end()).
+            parameters (dict | ParameterSnapshot | None): Параметры обработки.
+            slots (int): Буферов в каждом кольце; ограничивает число кадров в работе.
+            detectors (int): Количество процессов обнаружения.
+            stop_on_empty (bool): Завершать конвейер, когда get_image вернул None.
+            context: Контекст multiprocessing (по умолчанию 'spawn', как на Windows).
+        """
+        if slots < 2:
+            raise ValueError("Кольцу нужно не меньше двух буферов.")
+        self.camera_factory = camera_factory
+        self.parameters = parameters if parameters is not None else {}
+        self.detectors = detectors
+        self.stop_on_empty = stop_on_empty
+        self.frames = 0
+
+        self._context = context or multiprocessing.get_context('spawn')
+        context = self._context
+        # Кадры в работе: буферы колец + по одному в каждой стадии
+        self._raw = SharedFrames(slots, context)
+        self._zones = SharedFrames(slots + detectors, context)
+        self._captured = context.Queue()
+        self._preprocessed = context.Queue()
+        self._results = context.Queue()
+        self._controls = [context.Queue() for _ in range(detectors + 1)]
+        self._stop = context.Event()
+        self._dropped = context.Value('i', 0)
+        self._processes: List[Any] = []
+
+        self._pending: Dict[int, Any] = {}
+        self._next = 0
+        self._running_detectors = detectors
+        self.finished = False
+
+    def start(self) -> 'Pipeline':
+        """
+        Запускает процессы конвейера.
+        """
+        if self._processes:
+            return self
+        # Общий для всех процессов учёт блоков памяти: иначе каждый процесс
+        # заводит свой и при выходе считает чужие блоки утечкой.
+        # resource_tracker есть только на POSIX
+        if os.name == 'posix':
+            resource_tracker.ensure_running()
+        stages = [
+            (_capture_stage, (self.camera_factory, self._raw, self._captured,
+                              self._stop, self.stop_on_empty, self._dropped)),
+            (_preprocess_stage, (self._raw, self._zones, self._captured, self._preprocessed,
+                                 self._results, self._controls[0], self._stop, self.parameters,
+                                 self.detectors, self._dropped)),
+        ]
+        for index in range(self.detectors):
+            stages.append((_detect_stage, (self._zones, self._preprocessed, self._results,
+                                           self._controls[index + 1], self._stop, self.parameters)))
+        for number, (target, args) in enumerate(stages):
+            process = self._context.Process(target=target, args=args, daemon=True,
+                                            name=f"pipeline-{target.__name__[1:-6]}-{number}")
+            process.start()
+            self._processes.append(process)
+        return self
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped.value
+
+    def set_parameters(self, parameters: Any) -> None:
+        """
+        Передаёт новые параметры обработки; процессы применяют их на границе кадра.
+        """
+        self.parameters = parameters
+        for control in self._controls:
+            control.put(parameters)
+
+    def get(self, timeout: Optional[float] = 1.0) -> Optional[PipelineResult]:
+        """
+        Следующий по порядку захвата результат.
+
+        Кадр результата занимает буфер кольца до release.
+
+        Returns:
+            Optional[PipelineResult]: Результат или None, если за timeout
+            результата нет либо конвейер закончил работу (finished).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            while self._next not in self._pending:
+                if self._running_detectors == 0:
+                    self.finished = True
+                    return None
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    message = self._results.get(timeout=remaining)
+                except queue.Empty:
+                    return None
+                if message is None:
+                    self._running_detectors -= 1
+                    # Номера кадров, потерянных при остановке, больше не ждём
+                    if self._running_detectors == 0 and self._pending:
+                        self._next = min(self._pending)
+                    continue
+                self._pending[message[0]] = message
+            message = self._pending.pop(self._next)
+            self._next += 1
+            # Кадр пропущен после предобработки
+            if message[1] is not None:
+                break
+
+        (sequence, ref, number, captured, rows, contours, targets,
+         preprocess_time, detect_time) = message
+        self.frames += 1
+        latency = time.monotonic() - captured
+        profiler.record('pipeline.preprocess', preprocess_time)
+        profiler.record('pipeline.detect', detect_time)
+        profiler.record('pipeline.latency', latency)
+        return PipelineResult(sequence, number, ref, self._zones.view(ref), rows, contours,
+                              targets, latency)
+
+    def release(self, result: PipelineResult) -> None:
+        """
+        Возвращает буфер кадра результата в кольцо.
+        """
+        self._zones.release(result.ref)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Останавливает процессы конвейера.
+        """
+        self._stop.set()
+        # Возвращённые буферы нужны производителям, чтобы удалить блоки памяти
+        while True:
+            try:
+                message = self._results.get(timeout=0.1)
+            except queue.Empty:
+                break
+            if message is not None and message[1] is not None:
+                self._zones.release(message[1])
+        for sequence, message in self._pending.items():
+            if message[1] is not None:
+                self._zones.release(message[1])
+        self._pending.clear()
+
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        self._zones.close()
@@ -0,0 +1,112 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class PixelFormat:
+    """
+    План преобразования кадра на стороне камеры.
+
+    Описывает, какой кадр нужен конвейеру (оттенки серого или BGR, прямая или
+    инвертированная яркость), чтобы кадр преобразовывался один раз прямо при
+    захвате, а не туда и обратно в разных местах.
+
+    Attributes:
+        color (str): Формат кадра: PixelFormat.GRAY или PixelFormat.BGR.
+        inverted (bool): Инвертировать ли яркость.
+        frames (int): Количество обработанных кадров.
+        writes (int): Количество полнокадровых записей (преобразований и копирований).
+        allocations (int): Сколько раз результат потребовал нового массива
+            (не попал ни во входной кадр, ни в буфер dst).
+    """
+
+    GRAY = 'gray'
+    BGR = 'bgr'
+
+    def __init__(self, color: str = GRAY, inverted: bool = False) -> None:
+        """
+        Инициализация объекта PixelFormat.
+
+        Args:
+            color (str): Формат кадра: PixelFormat.GRAY или PixelFormat.BGR.
+            inverted (bool): Инвертировать ли яркость.
+        """
+        if color not in (self.GRAY, self.BGR):
+            raise ValueError(f"Неизвестный формат кадра: {color}")
+        self.color = color
+        self.inverted = inverted
+
+        self.frames = 0
+        self.writes = 0
+        self.allocations = 0
+
+    def convert(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Приводит кадр камеры к нужному формату.
+
+        Преобразование цвета и инверсия выполняются в один буфер: в dst, если он
+        подходит, иначе на месте во входном кадре (входной кадр при этом
+        изменяется). Кадр, который уже в нужном формате, возвращается как есть
+        (или копируется в dst).
+
+        Args:
+            frame (np.ndarray): Кадр, полученный с камеры.
+            dst (Optional[np.ndarray]): Буфер для результата.
+
+        Returns:
+            np.ndarray: Кадр в нужном формате.
+        """
+        self.frames += 1
+        gray = frame.ndim == 2
+
+        if self.color == self.GRAY and not gray:
+            out = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
+            self.writes += 1
+        elif self.color == self.BGR and gray:
+            out = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=dst)
+            self.writes += 1
+        elif self.inverted:
+            target = dst if self._fits(dst, frame) else frame
+            out = cv2.bitwise_not(frame, dst=target)
+            self.writes += 1
+            self._count_allocation(out, frame, dst)
+            return out
+        elif self._fits(dst, frame):
+            np.copyto(dst, frame)
+            self.writes += 1
+            return dst
+        else:
+            return frame
+
+        if self.inverted:
+            cv2.bitwise_not(out, dst=out)
+            self.writes += 1
+        self._count_allocation(out, frame, dst)
+        return out
+
+    @staticmethod
+    def _fits(dst: Optional[np.ndarray], frame: np.ndarray) -> bool:
+        return dst is not None and dst.shape == frame.shape and dst.dtype == frame.dtype
+
+    def _count_allocation(self, out: np.ndarray, frame: np.ndarray,
+                          dst: Optional[np.ndarray]) -> None:
+        if np.may_share_memory(out, frame):
+            return
+        if dst is not None and np.may_share_memory(out, dst):
+            return
+        self.allocations += 1
+
+    def statistics(self) -> dict:
+        """
+        Возвращает счётчики полнокадровых операций в расчёте на кадр.
+
+        Returns:
+            dict: frames, writes_per_frame, allocations_per_frame.
+        """
+        frames = max(self.frames, 1)
+        return {
+            'frames': self.frames,
+            'writes_per_frame': self.writes / frames,
+            'allocations_per_frame': self.allocations / frames,
+        }
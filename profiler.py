@@ -0,0 +1,262 @@
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StageHistogram:
+    """
+    Гистограмма длительностей стадии с фиксированным числом корзин.
+
+    Корзины логарифмические (BUCKETS_PER_DECADE на декаду от MIN_SECONDS до
+    MAX_SECONDS), поэтому память не растёт со временем, а ошибка оценки
+    перцентиля не превышает ширины одной корзины (~12%).
+
+    Attributes:
+        count (int): Количество измерений.
+        total (float): Суммарная длительность в секундах.
+        maximum (float): Максимальная длительность в секундах.
+    """
+
+    MIN_SECONDS = 1e-6
+    MAX_SECONDS = 10.0
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self) -> None:
+        decades = math.log10(self.MAX_SECONDS / self.MIN_SECONDS)
+        self.size = int(decades * self.BUCKETS_PER_DECADE) + 2
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def _index(self, seconds: float) -> int:
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        index = int(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE) + 1
+        return min(index, self.size - 1)
+
+    def upper_bound(self, index: int) -> float:
+        """Верхняя граница корзины в секундах."""
+        return self.MIN_SECONDS * 10 ** (index / self.BUCKETS_PER_DECADE)
+
+    def record(self, seconds: float) -> None:
+        self.counts[self._index(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Оценка перцентиля по верхней границе корзины.
+
+        Args:
+            q (float): Перцентиль от 0 до 100.
+
+        Returns:
+            float: Длительность в секундах (0, если измерений нет).
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(self.upper_bound(index), self.maximum)
+        return self.maximum
+
+    def reset(self) -> None:
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+
+class _Timer:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """
+    Постоянно включённый профилировщик стадий конвейера.
+
+    Каждое измерение — это два вызова time.perf_counter и инкремент счётчика
+    корзины, поэтому его можно оставлять включённым на линии.
+    Измерения приходят из нескольких потоков (захват, обработка, робот,
+    пул Image), поэтому запись и чтение гистограмм идут под одной блокировкой.
+
+    Пример:
+        with profiler.stage('detect_contours'):
+            image.detect(frame)
+
+    Attributes:
+        enabled (bool): Записывать ли измерения.
+        histograms (Dict[str, StageHistogram]): Гистограммы по именам стадий.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def stage(self, name: str) -> _Timer:
+        """
+        Контекстный менеджер, измеряющий длительность блока.
+
+        Args:
+            name (str): Имя стадии.
+        """
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Записывает длительность стадии.
+
+        Args:
+            name (str): Имя стадии.
+            seconds (float): Длительность в секундах.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = StageHistogram()
+            histogram.record(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Сводка по стадиям: количество, среднее и перцентили в миллисекундах.
+
+        Returns:
+            Dict[str, Dict[str, float]]: {стадия: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}.
+        """
+        result = {}
+        with self._lock:
+            for name, histogram in self.histograms.items():
+                count = histogram.count
+                result[name] = {
+                    'count': count,
+                    'mean_ms': histogram.total / count * 1e3 if count else 0.0,
+                    'p50_ms': histogram.percentile(50) * 1e3,
+                    'p95_ms': histogram.percentile(95) * 1e3,
+                    'p99_ms': histogram.percentile(99) * 1e3,
+                    'max_ms': histogram.maximum * 1e3,
+                }
+        return result
+
+    def format(self) -> str:
+        """
+        Текстовая таблица для отображения в интерфейсе.
+
+        Returns:
+            str: По строке на стадию: p50 / p95 / p99 в миллисекундах.
+        """
+        lines = ["Стадия: p50 / p95 / p99, мс"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name}: {stats['p50_ms']:.2f} / "
+                         f"{stats['p95_ms']:.2f} / {stats['p99_ms']:.2f}")
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        Метрики в текстовом формате Prometheus (гистограмма на стадию).
+
+        Returns:
+            str: Текст для эндпоинта /metrics.
+        """
+        name = 'vision_stage_duration_seconds'
+        lines = [f"# HELP {name} Длительность стадии конвейера обработки кадров.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            snapshot = [(stage, histogram, list(histogram.counts), histogram.count, histogram.total)
+                        for stage, histogram in self.histograms.items()]
+        for stage, histogram, counts, count, total in snapshot:
+            cumulative = 0
+            for index, bucket in enumerate(counts):
+                cumulative += bucket
+                if bucket:
+                    lines.append(f'{name}_bucket{{stage="{stage}",'
+                                 f'le="{histogram.upper_bound(index):.9g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.9g}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """
+        Сохраняет сводку в JSON-файл.
+
+        Args:
+            path (str): Путь к файлу.
+        """
+        with open(path, 'w') as json_file:
+            json.dump(self.summary(), json_file, indent=4)
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Запускает локальный HTTP-эндпоинт /metrics в фоновом потоке.
+
+        Args:
+            port (int): Порт.
+            host (str): Адрес; по умолчанию только локальный.
+
+        Returns:
+            ThreadingHTTPServer: Запущенный сервер.
+        """
+        if self._server is not None:
+            return self._server
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = profiler.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever,
+                         name="metrics", daemon=True).start()
+        return self._server
+
+    def shutdown(self) -> None:
+        """
+        Останавливает HTTP-эндпоинт.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset(self) -> None:
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+
+
+profiler = Profiler()
@@ -0,0 +1,138 @@
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from calibration_store import CalibrationStore, calibration_store
+
+
+class Rectifier:
+    """
+    Объединяет перспективное преобразование зоны и устранение дисторсии
+    в один проход cv2.remap.
+
+    Таблицы отображения строятся один раз (initUndistortRectifyMap + матрица M)
+    в формате CV_16SC2 и перестраиваются только при изменении файлов калибровки.
+
+    Attributes:
+        calibration (CalibrationStore): Источник калибровочных данных.
+        undistort (bool): Учитывать ли коэффициенты дисторсии камеры.
+    """
+
+    def __init__(self, calibration: CalibrationStore = calibration_store,
+                 undistort: bool = True) -> None:
+        """
+        Инициализация объекта Rectifier.
+
+        Args:
+            calibration (CalibrationStore): Хранилище калибровочных данных.
+            undistort (bool): Если False, таблицы выполняют только warpPerspective.
+        """
+        self.calibration = calibration
+        self.undistort = undistort
+
+        self._versions: Optional[Tuple[int, int]] = None
+        self._map1: Optional[np.ndarray] = None
+        self._map2: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def maps(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает актуальные таблицы отображения, перестраивая их при необходимости.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: map1 (CV_16SC2) и map2 (CV_16UC1) для cv2.remap.
+        """
+        M, size = self.calibration.transformation()
+        camera_matrix, dist_coefficients = self.calibration.camera()
+        versions = (self.calibration.transformation_file.version,
+                    self.calibration.camera_file.version)
+
+        if versions != self._versions:
+            with self._lock:
+                if versions != self._versions:
+                    self._map1, self._map2 = self._build_maps(
+                        M, size, camera_matrix, dist_coefficients)
+                    self._versions = versions
+        return self._map1, self._map2
+
+    def _build_maps(self, M: np.ndarray, size: Tuple[int, int],
+                    camera_matrix: np.ndarray,
+                    dist_coefficients: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Строит таблицы: пиксель рабочей зоны -> точка исходного кадра.
+
+        Порядок соответствует двухшаговому пути: сначала warpPerspective по M,
+        затем undistort в координатах рабочей зоны. Поэтому сначала берётся
+        карта устранения дисторсии, а затем её точки переводятся в исходный
+        кадр обратной матрицей M.
+        """
+        width, height = size
+        if self.undistort:
+            map_x, map_y = cv2.initUndistortRectifyMap(
+                camera_matrix, dist_coefficients, None, camera_matrix,
+                (width, height), cv2.CV_32FC1)
+        else:
+            map_x, map_y = np.meshgrid(np.arange(width, dtype=np.float32),
+                                       np.arange(height, dtype=np.float32))
+
+        points = np.dstack((map_x, map_y)).reshape(-1, 1, 2)
+        M_inv = np.linalg.inv(M.astype(np.float64))
+        source = cv2.perspectiveTransform(points, M_inv).reshape(height, width, 2)
+
+        return cv2.convertMaps(source[..., 0], source[..., 1], cv2.CV_16SC2)
+
+    def rectify(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Переводит кадр камеры в рабочую зону одним вызовом cv2.remap.
+
+        Args:
+            frame (np.ndarray): Входное изображение в формате NumPy.
+
+        Returns:
+            np.ndarray: Изображение рабочей зоны (maxHeight x maxWidth).
+        """
+        map1, map2 = self.maps()
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    def two_step(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Эталонный двухшаговый путь: warpPerspective, затем undistort.
+
+        Args:
+            frame (np.ndarray): Входное изображение в формате NumPy.
+
+        Returns:
+            np.ndarray: Изображение рабочей зоны.
+        """
+        M, size = self.calibration.transformation()
+        frame = cv2.warpPerspective(frame, M, size)
+        if self.undistort:
+            camera_matrix, dist_coefficients = self.calibration.camera()
+            frame = cv2.undistort(frame, camera_matrix, dist_coefficients)
+        return frame
+
+    def compare(self, frame: np.ndarray, margin: int = 2) -> Tuple[float, float]:
+        """
+        Сравнивает результат rectify с двухшаговым путём.
+
+        Двухшаговый путь интерполирует кадр дважды, поэтому небольшие
+        расхождения на резких перепадах яркости ожидаемы. Край шириной
+        margin пикселей не учитывается: там двухшаговый путь теряет
+        пиксели на границе промежуточного изображения.
+
+        Args:
+            frame (np.ndarray): Входное изображение в формате NumPy.
+            margin (int): Ширина исключаемой рамки в пикселях.
+
+        Returns:
+            Tuple[float, float]: Средняя и максимальная абсолютная разница.
+        """
+        fused = self.rectify(frame).astype(np.int16)
+        reference = self.two_step(frame).astype(np.int16)
+        diff = np.abs(fused - reference)
+        if margin > 0:
+            diff = diff[margin:-margin, margin:-margin]
+        return float(diff.mean()), float(diff.max())
@@ -1,61 +1,469 @@
 import asyncio
 import threading
+import time
+from collections import deque
+
+from pick_protocol import PickProtocol
+from profiler import profiler
+
+
+class RobotSession:
+    """
+    Подключение одного контроллера робота.
+
+    У каждой сессии своя очередь команд, своя корутина отправки и своё
+    состояние протокола, поэтому медленный или отключившийся контроллер
+    не задерживает остальные.
+
+    Attributes:
+        name (str): Имя контроллера (из приветствия hello;<name>).
+        protocol (PickProtocol): Состояние протокола выдачи целей.
+        writer (asyncio.StreamWriter | None): Текущее соединение.
+        queue (deque): Очередь (сообщение, время постановки).
+        sent (int): Количество отправленных команд.
+        dropped (int): Количество выброшенных команд.
+        coalesced (int): Количество команд, заменённых более новыми.
+        connections (int): Сколько раз контроллер подключался.
+        last_seen (float | None): Время последнего сообщения от контроллера (monotonic).
+    """
+
+    def __init__(self, name, protocol, queue_size, policy):
+        self.name = name
+        self.protocol = protocol
+        self.queue_size = queue_size
+        self.policy = policy
+        self.writer = None
+        self.queue = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.connections = 0
+        self.last_seen = None
+
+        self._ready = asyncio.Event()
+        self._sender_task = None
+
+    @property
+    def connected(self):
+        return self.writer is not None
+
+    def healthy(self, timeout, now=None):
+        """
+        Контроллер подключён и присылал данные не позже timeout секунд назад.
+        """
+        now = time.monotonic() if now is None else now
+        return (self.connected and self.last_seen is not None
+                and now - self.last_seen <= timeout)
+
+    def attach(self, writer):
+        """
+        Привязывает сессию к новому соединению (вызывается в цикле сервера).
+        """
+        if self.writer is not None and self.writer is not writer:
+            print(f"Контроллер {self.name} переподключился, прежнее соединение закрыто")
+            self.writer.close()
+        self.writer = writer
+        self.connections += 1
+        self.last_seen = time.monotonic()
+        self.protocol.reset()
+        if self._sender_task is None:
+            self._sender_task = asyncio.create_task(self._sender())
+
+    def detach(self, writer):
+        """
+        Отвязывает сессию от соединения writer, если оно ещё текущее.
+        """
+        if self.writer is writer:
+            self.writer = None
+
+    def _enqueue(self, message, queued_at, reliable=False):
+        # Команды протокола не объединяются: за их доставку отвечают ACK и повторы
+        if self.policy == Robot.COALESCE and not reliable:
+            kind = message.split(';', 1)[0]
+            for index, (pending, _) in enumerate(self.queue):
+                if pending.split(';', 1)[0] == kind:
+                    del self.queue[index]
+                    self.coalesced += 1
+                    break
+        if len(self.queue) >= self.queue_size:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append((message, queued_at))
+        self._ready.set()
+
+    def _dispatch(self):
+        now = time.perf_counter()
+        for message in self.protocol.next_messages():
+            self._enqueue(message, now, reliable=True)
+
+    def _check_timeouts(self):
+        now = time.perf_counter()
+        for message in self.protocol.expired():
+            self._enqueue(message, now, reliable=True)
+        self._dispatch()
+
+    async def _sender(self):
+        while True:
+            await self._ready.wait()
+            while self.queue:
+                message, queued_at = self.queue.popleft()
+                writer = self.writer
+                if writer is None:
+                    self.dropped += 1
+                    continue
+                try:
+                    writer.write(message.encode())
+                    await writer.drain()
+                except Exception as e:
+                    print(f"Ошибка отправки сообщения ({self.name}): {e}")
+                    self.dropped += 1
+                    continue
+                self.sent += 1
+                profiler.record('robot.send', time.perf_counter() - queued_at)
+            self._ready.clear()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+            self._sender_task = None
+
+    def statistics(self, health_timeout):
+        return {
+            'connected': self.connected,
+            'healthy': self.healthy(health_timeout),
+            'connections': self.connections,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'queued': len(self.queue),
+            'protocol': self.protocol.statistics(),
+        }
+
+
+class ZoneRouter:
+    """
+    Распределяет цели между роботами по зонам рабочей области.
+
+    Attributes:
+        zones (dict): {имя робота: (x_min, x_max)} в пикселях зоны;
+            граница x_max не входит в зону.
+    """
+
+    def __init__(self, zones):
+        self.zones = dict(zones)
+
+    def __call__(self, targets):
+        routed = {name: [] for name in self.zones}
+        for target in targets:
+            for name, (x_min, x_max) in self.zones.items():
+                if x_min <= target[0] < x_max:
+                    routed[name].append(target)
+                    break
+        return routed
+
+
+class TypeRouter:
+    """
+    Распределяет цели между роботами по типу детали.
+
+    Attributes:
+        types (dict): {number_type: имя робота}.
+        default (str | None): Робот для типов, которых нет в types;
+            None — такие цели не выдаются.
+    """
+
+    def __init__(self, types, default=None):
+        self.types = dict(types)
+        self.default = default
+
+    def __call__(self, targets):
+        routed = {name: [] for name in self.types.values()}
+        if self.default is not None:
+            routed.setdefault(self.default, [])
+        for target in targets:
+            name = self.types.get(target[3], self.default)
+            if name is not None:
+                routed[name].append(target)
+        return routed
 
 
 class Robot:
-    def __init__(self, host, port):
+    """
+    TCP-сервер для связи с контроллерами роботов.
+
+    Сервер обслуживает несколько контроллеров в одном цикле asyncio.
+    Новое соединение сразу привязывается к сессии DEFAULT (если она не
+    занята другим соединением), поэтому контроллер без приветствия получает
+    команды с момента подключения. Если первое сообщение — hello;<name>,
+    соединение переходит в сессию <name>. Повторное подключение с тем же
+    именем заменяет прежнее соединение и сбрасывает состояние протокола.
+
+    Команды из других потоков (GUI, обработка кадров) передаются в цикл
+    asyncio сервера через call_soon_threadsafe и попадают в ограниченную
+    очередь сессии, поэтому send_message никогда не блокирует вызывающий
+    поток. Отправкой занимается отдельная корутина сессии, которая
+    дожидается drain() после каждой команды и записывает задержку отправки
+    в профилировщик (стадия robot.send).
+
+    Выдача целей для захвата идёт по протоколу PickProtocol: цели от
+    обработки кадров передаются через offer_targets, router распределяет
+    их между сессиями, а следующая команда pick уходит сразу, как только
+    робот сообщил о готовности или освободилось место в окне
+    неподтверждённых команд. В пакетном режиме протокола
+    (PickProtocol(batch=True)) все цели лотка уходят одной командой batch.
+
+    Attributes:
+        queue_size (int): Максимальная длина очереди команд сессии.
+        policy (str): Что делать при переполнении: "drop_oldest" — выбросить
+            самую старую команду; "coalesce" — дополнительно заменять ещё не
+            отправленную команду того же типа (первое поле сообщения) новой.
+        router (callable | None): Функция targets -> {имя робота: targets}
+            (ZoneRouter, TypeRouter). None — все цели единственному роботу,
+            готовому к захвату; если готовы несколько, без router цели
+            не выдаются никому (иначе роботы брали бы одни и те же детали).
+        health_timeout (float): Сколько секунд без сообщений от контроллера
+            сессия считается здоровой.
+        sessions (Dict[str, RobotSession]): Сессии по именам.
+    """
+
+    DROP_OLDEST = 'drop_oldest'
+    COALESCE = 'coalesce'
+    DEFAULT = 'robot'
+
+    def __init__(self, host, port, queue_size=16, policy=DROP_OLDEST, protocol=None,
+                 protocol_factory=PickProtocol, router=None, health_timeout=5.0):
+        """
+        Инициализация объекта Robot.
+
+        Args:
+            protocol (PickProtocol | None): Протокол сессии DEFAULT.
+            protocol_factory (callable): Создаёт протокол для остальных сессий.
+        """
         self.host = host
         self.port = port
-        self.writer = None
+        self.queue_size = queue_size
+        self.policy = policy
+        self.protocol_factory = protocol_factory
+        self.router = router
+        self.health_timeout = health_timeout
+
+        self.sessions = {}
+        if protocol is not None:
+            self.session(self.DEFAULT, protocol)
+        self._targets = []
+        self._unrouted = False
+
+        self.loop = None
+        self.server = None
+        self._watchdog_task = None
+        self._closing = False
+
+    @property
+    def protocol(self):
+        """Протокол сессии DEFAULT (конфигурация с одним роботом)."""
+        return self.session(self.DEFAULT).protocol
+
+    def session(self, name, protocol=None):
+        """
+        Возвращает сессию по имени, создавая её при необходимости.
+
+        Args:
+            name (str): Имя контроллера.
+            protocol (PickProtocol | None): Протокол новой сессии;
+                по умолчанию создаётся protocol_factory.
+        """
+        session = self.sessions.get(name)
+        if session is None:
+            if protocol is None:
+                protocol = self.protocol_factory()
+            session = RobotSession(name, protocol, self.queue_size, self.policy)
+            self.sessions[name] = session
+        return session
+
+    def _attach(self, name, writer):
+        session = self.session(name)
+        session.attach(writer)
+        session.protocol.offer(self._route().get(name, []))
+        return session
 
     async def handle_client(self, reader, writer):
-        self.writer = writer  # Сохраняем объект writer для отправки сообщений
+        # Занятую сессию DEFAULT не перехватываем при подключении: её заменит
+        # первое сообщение, если это не приветствие
+        session = None
+        default = self.sessions.get(self.DEFAULT)
+        if default is None or not default.connected:
+            session = self._attach(self.DEFAULT, writer)
+        greeted = False
+        buffer = ""
         while True:
             try:
                 data = await asyncio.wait_for(reader.read(1024), timeout=1.0)
             except asyncio.exceptions.TimeoutError:
                 print("Таймаут ожидания данных")
                 continue
+            except ConnectionError:
+                break
             if not data:
                 print("Клиент отключился")
                 break
-            message = data.decode()
-            print(f"Получено сообщение от клиента: {message}")
-            if message == "quit":
+            buffer += data.decode()
+            *lines, buffer = buffer.split("\n")
+            lines = [line.strip() for line in lines if line.strip()]
+            if "quit" in lines or buffer.strip() == "quit":
                 break
-            #response = self.process_message(message)
-            #writer.write(response.encode())
-            #await writer.drain()
+            ready = session is not None and session.protocol.ready
+            for line in lines:
+                if not greeted:
+                    greeted = True
+                    fields = line.split(';')
+                    if fields[0].lower() == 'hello' and len(fields) > 1 and fields[1]:
+                        if session is not None:
+                            session.detach(writer)
+                        session = self._attach(fields[1], writer)
+                        print(f"Подключён контроллер {session.name}")
+                        continue
+                    if session is None:
+                        session = self._attach(self.DEFAULT, writer)
+                session.last_seen = time.monotonic()
+                session.protocol.handle(line)
+            if session is not None and session.protocol.ready and not ready and self.router is None:
+                # Число готовых роботов изменилось: цели распределяются заново
+                self._offer(self._targets)
+            elif session is not None:
+                session._dispatch()
         print("Закрытие соединения")
+        if session is not None:
+            session.detach(writer)
         writer.close()
 
     def process_message(self, message):
         # Обработка сообщения по вашему усмотрению
         return "Сообщение получено"
 
-    def send_message(self, message):
-        if self.writer is None:
+    def send_message(self, message, name=None):
+        """
+        Ставит команду в очередь отправки. Безопасно вызывать из любого потока.
+
+        Args:
+            message (str): Команда для робота.
+            name (str | None): Имя контроллера; None — всем подключённым.
+
+        Returns:
+            bool: True, если команда поставлена в очередь.
+        """
+        loop = self.loop
+        if loop is None or not any(session.connected for session in list(self.sessions.values())):
             print("Ошибка: нет активного соединения")
-            return
+            return False
         try:
-            self.writer.write(message.encode())
-            self.writer.drain()
-        except Exception as e:
+            loop.call_soon_threadsafe(
+                self._send, message, name, time.perf_counter())
+        except RuntimeError as e:
             print(f"Ошибка отправки сообщения: {e}")
+            return False
+        return True
 
-    async def start_server(self):
+    def _send(self, message, name, queued_at):
+        for session in self.sessions.values():
+            if session.connected and (name is None or session.name == name):
+                session._enqueue(message, queued_at)
+
+    def offer_targets(self, targets):
+        """
+        Передаёт свежий список целей (cX, cY, orientation, number_type).
+        Безопасно вызывать из любого потока; не блокирует.
+
+        Args:
+            targets (list): Цели с последнего обработанного кадра.
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._offer, list(targets))
+        except RuntimeError:
+            pass
+
+    def _route(self):
+        if self.router is not None:
+            return self.router(self._targets)
+        ready = [name for name, session in self.sessions.items()
+                 if session.connected and session.protocol.ready]
+        if len(ready) > 1:
+            if not self._unrouted:
+                print(f"Несколько готовых контроллеров ({', '.join(ready)}) без router: "
+                      f"цели не выдаются")
+                self._unrouted = True
+            return {}
+        self._unrouted = False
+        return {name: self._targets for name in self.sessions}
+
+    def _offer(self, targets):
+        self._targets = targets
+        routed = self._route()
+        for name, session in self.sessions.items():
+            session.protocol.offer(routed.get(name, []))
+            session._dispatch()
+
+    async def _watchdog(self):
         while True:
+            await asyncio.sleep(0.1)
+            for session in list(self.sessions.values()):
+                session._check_timeouts()
+
+    def statistics(self):
+        """
+        Возвращает счётчики и состояние каждой сессии.
+
+        Returns:
+            dict: {имя: connected, healthy, connections, sent, dropped,
+                coalesced, queued и счётчики протокола}.
+        """
+        return {name: session.statistics(self.health_timeout)
+                for name, session in list(self.sessions.items())}
+
+    def close_socket(self):
+        """
+        Останавливает сервер. Безопасно вызывать из любого потока.
+        """
+        self._closing = True
+        if self.loop is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._close)
+            except RuntimeError:
+                pass
+
+    def _close(self):
+        for session in self.sessions.values():
+            session.close()
+        if self.server is not None:
+            self.server.close()
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+
+    async def start_server(self):
+        self.loop = asyncio.get_running_loop()
+        self._watchdog_task = asyncio.create_task(self._watchdog())
+        while not self._closing:
             try:
-                server = await asyncio.start_server(self.handle_client, self.host, self.port)
+                self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
 
                 print(f"Сервер слушает на {self.host}:{self.port}")
 
-                async with server:
-                    await server.serve_forever()
+                async with self.server:
+                    await self.server.serve_forever()
+            except asyncio.CancelledError:
+                if self._closing:
+                    break
+                raise
             except Exception as e:
                 print(f"Ошибка сервера: {e}")
                 print("Повторная попытка запуска сервера через 5 секунд...")
                 await asyncio.sleep(5)
+        self.loop = None
 
 
 def run_server():
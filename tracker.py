@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class Track:
+    """
+    Деталь, сопровождаемая между кадрами.
+
+    Attributes:
+        id (int): Постоянный номер детали.
+        cX, cY (int): Центр на последнем кадре.
+        area (float): Площадь на последнем кадре.
+        contour (np.ndarray | None): Контур, по которому вычислены
+            сохранённые ориентация и тип.
+        angle (str | None): Сохранённая ориентация ("above"/"under").
+        number_type (str | None): Сохранённый тип детали.
+        hits (int): Сколько кадров подряд деталь найдена на месте.
+        missed (int): Сколько кадров подряд деталь не найдена.
+    """
+
+    def __init__(self, id, cX, cY, area, contour=None):
+        self.id = id
+        self.cX = cX
+        self.cY = cY
+        self.area = area
+        self.contour = contour
+        self.angle = None
+        self.number_type = None
+        self.hits = 0
+        self.missed = 0
+
+
+class PartTracker:
+    """
+    Сопоставление деталей между кадрами по положению центра.
+
+    Треки хранятся в пространственной сетке с ячейкой radius, поэтому поиск
+    кандидата для детали просматривает только 3x3 соседние ячейки. Деталь,
+    контур которой совпадает с контуром трека точка в точку и которая была
+    видна на предыдущем кадре, считается неподвижной: её ориентация и тип
+    берутся из трека без повторного вычисления. Ориентация и тип зависят
+    только от контура, поэтому результат тот же, что и без трекера;
+    любое изменение контура (даже на один пиксель) вызывает пересчёт.
+
+    Attributes:
+        radius (float): Максимальное смещение центра между кадрами, пиксели.
+        max_missed (int): Сколько кадров хранить трек пропавшей детали.
+        tracks (Dict[int, Track]): Активные треки по номерам.
+        reused (int): Сколько раз результаты взяты из трека.
+        computed (int): Сколько раз ориентация и тип вычислялись заново.
+    """
+
+    def __init__(self, radius=10.0, max_missed=2):
+        self.radius = radius
+        self.max_missed = max_missed
+
+        self.tracks: Dict[int, Track] = {}
+        self.reused = 0
+        self.computed = 0
+
+        self._next_id = 1
+        self._grid: Dict[Tuple[int, int], List[Track]] = {}
+
+    def reset(self):
+        """Удаляет все треки (например, после смены параметров обработки)."""
+        self.tracks.clear()
+        self._grid.clear()
+
+    def _cell(self, x, y):
+        return int(x // self.radius), int(y // self.radius)
+
+    def _nearest(self, cX, cY, claimed) -> Optional[Track]:
+        gx, gy = self._cell(cX, cY)
+        best, best_distance = None, self.radius ** 2
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for track in self._grid.get((gx + dx, gy + dy), ()):
+                    if track.id in claimed:
+                        continue
+                    distance = (track.cX - cX) ** 2 + (track.cY - cY) ** 2
+                    if distance <= best_distance:
+                        best, best_distance = track, distance
+        return best
+
+    @staticmethod
+    def _same_contour(track, contour) -> bool:
+        return (contour is not None and track.contour is not None
+                and track.contour.shape == contour.shape
+                and np.array_equal(track.contour, contour))
+
+    def match(self, cX, cY, area, claimed, contour=None) -> Tuple[Track, bool]:
+        """
+        Находит трек для детали текущего кадра или заводит новый.
+
+        Args:
+            cX, cY (int): Центр детали.
+            area (float): Площадь детали.
+            claimed (set): Номера треков, уже занятых на этом кадре.
+            contour (np.ndarray | None): Контур детали; без контура
+                сохранённые результаты не используются.
+
+        Returns:
+            Tuple[Track, bool]: Трек и признак того, что его сохранённые
+                ориентацию и тип можно использовать.
+        """
+        track = self._nearest(cX, cY, claimed)
+        if track is None:
+            track = Track(self._next_id, cX, cY, area, contour)
+            self._next_id += 1
+            self.tracks[track.id] = track
+            claimed.add(track.id)
+            return track, False
+
+        claimed.add(track.id)
+        still = (track.missed == 0 and track.angle is not None
+                 and self._same_contour(track, contour))
+        if still:
+            track.hits += 1
+            self.reused += 1
+        else:
+            track.hits = 0
+            track.cX, track.cY, track.area = cX, cY, area
+            track.contour = contour
+        track.missed = 0
+        return track, still
+
+    def store(self, track, angle, number_type):
+        """Сохраняет вычисленные ориентацию и тип детали в трек."""
+        track.angle = angle
+        track.number_type = number_type
+        self.computed += 1
+
+    def finish(self, claimed):
+        """
+        Завершает кадр: стареют треки без детали, сетка перестраивается.
+
+        Args:
+            claimed (set): Номера треков, найденных на кадре.
+        """
+        for track_id in list(self.tracks):
+            if track_id not in claimed:
+                track = self.tracks[track_id]
+                track.missed += 1
+                track.hits = 0
+                if track.missed > self.max_missed:
+                    del self.tracks[track_id]
+        self._grid.clear()
+        for track in self.tracks.values():
+            self._grid.setdefault(self._cell(track.cX, track.cY), []).append(track)